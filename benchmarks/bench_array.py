@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Benchmark do passo da simulação: Simulation (objetos) x ArraySimulation (NumPy)
+
+Mede o tempo médio de Simulation.step com metade caçadores e metade animais.
+O mundo cresce com o número de entidades, como em bench_spatial, e as duas
+simulações partem da mesma semente, então devem terminar no mesmo estado.
+
+Uso: python benchmarks/bench_array.py [N ...]
+"""
+
+import math
+import os
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from array_simulation import ArraySimulation
+from game import Animal, Hunter, Simulation
+
+
+def build_simulation(cls, count, seed=0):
+    """Cria a simulação e a povoa com count entidades espalhadas pelo mundo"""
+    scale = max(1.0, math.sqrt(count / 20))
+    sim = cls(int(1024 * scale), int(768 * scale), seed=seed)
+    sim.max_animals_lost = math.inf  # O benchmark não deve parar por fim de jogo
+    rng = sim.rng
+    for _ in range(count // 2):
+        sim.add_hunter(Hunter(rng.uniform(0, sim.width), rng.uniform(0, sim.height), rng))
+    for _ in range(count - count // 2):
+        sim.add_animal(Animal(rng.uniform(0, sim.width), rng.uniform(0, sim.height), "onça", rng))
+    sim.retarget_hunters()
+    return sim
+
+
+def time_steps(sim, ticks):
+    """Tempo médio (ms) de um passo e o estado final resumido"""
+    start = time.perf_counter()
+    for _ in range(ticks):
+        sim.step((1, 0))
+    elapsed = (time.perf_counter() - start) / ticks * 1000
+    return elapsed, (sim.score, sim.animals_saved, sim.animals_lost, len(sim.hunters), len(sim.animals))
+
+
+def main(argv):
+    sizes = [int(arg) for arg in argv] or [1000, 10000, 50000]
+    ticks = 60
+    print(f"{'entidades':>10} {'objetos (ms)':>13} {'arrays (ms)':>12} {'passos/s':>9} {'ganho':>8}")
+    for count in sizes:
+        object_ms, object_state = time_steps(build_simulation(Simulation, count), ticks)
+        array_ms, array_state = time_steps(build_simulation(ArraySimulation, count), ticks)
+        assert object_state == array_state, "os dois backends devem chegar ao mesmo estado"
+        print(f"{count:>10} {object_ms:>13.2f} {array_ms:>12.2f} {1000 / array_ms:>9.0f} {object_ms / array_ms:>7.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Passos por segundo dos ambientes: VectorEnv x CaiporaEnv separados
+
+Antes de medir, confere que a VectorEnv dá as mesmas observações,
+recompensas e flags com Simulation e com ArraySimulation (reset e alguns
+passos com as mesmas ações). Com N partidas, compara uma VectorEnv de N
+ambientes (com cada uma das simulações) com N CaiporaEnv avançadas uma a
+uma. As ações são sorteadas com semente fixa.
+
+Uso: python benchmarks/bench_env.py [N] [PASSOS]
+"""
+
+import os
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import numpy as np
+
+from array_simulation import ArraySimulation
+from env import ACTIONS, CaiporaEnv, VectorEnv
+from game import Simulation
+
+
+def check_backends(count, steps, actions):
+    """Falha se reset() e step() da VectorEnv diferem entre Simulation e ArraySimulation"""
+    envs = [VectorEnv(count, simulation=simulation) for simulation in (Simulation, ArraySimulation)]
+    results = [env.reset(seed=0)[0] for env in envs]
+    for step in range(steps + 1):
+        plain, arrays = results
+        for name in plain:
+            assert np.array_equal(plain[name], arrays[name]), f"observação {name} difere no passo {step}"
+        if step < steps:
+            results = [env.step(actions[step]) for env in envs]
+            for index, name in enumerate(("recompensas", "terminated", "truncated"), 1):
+                assert np.array_equal(results[0][index], results[1][index]), f"{name} diferem no passo {step}"
+            results = [result[0] for result in results]
+
+
+def time_vector(count, steps, actions, simulation=Simulation):
+    env = VectorEnv(count, simulation=simulation)
+    env.reset(seed=0)
+    start = time.perf_counter()
+    for step in range(steps):
+        env.step(actions[step])
+    return time.perf_counter() - start
+
+
+def time_separate(count, steps, actions):
+    envs = [CaiporaEnv(seed=i) for i in range(count)]
+    for env in envs:
+        env.reset()
+    start = time.perf_counter()
+    for step in range(steps):
+        for env, action in zip(envs, actions[step].tolist()):
+            if env.step(action)[2:4] != (False, False):
+                env.reset()
+    return time.perf_counter() - start
+
+
+def main(argv):
+    count = int(argv[0]) if argv else 1000
+    steps = int(argv[1]) if len(argv) > 1 else 100
+    actions = np.random.default_rng(0).integers(0, len(ACTIONS), (steps, count))
+    total = count * steps
+    print(f"{count} partidas x {steps} passos")
+    check_backends(min(count, 16), steps, actions)
+    print("Simulation e ArraySimulation dão as mesmas observações")
+    vector = time_vector(count, steps, actions)
+    arrays = time_vector(count, steps, actions, ArraySimulation)
+    separate = time_separate(count, steps, actions)
+    print(f"{'VectorEnv':<22} {total / vector:>10.0f} passos/s")
+    print(f"{'VectorEnv (arrays)':<22} {total / arrays:>10.0f} passos/s ({arrays / vector:.1f}x o tempo)")
+    print(f"{'CaiporaEnv separadas':<22} {total / separate:>10.0f} passos/s ({separate / vector:.1f}x o tempo)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Memória por entidade (tracemalloc) e pausas do coletor de lixo numa sessão longa
+
+Mede quantos bytes cada Hunter e Animal ocupa e roda uma sessão sem janela,
+com a Caipora perseguindo caçadores, com e sem o reaproveitamento de
+entidades dos pools da Simulation.
+
+Uso: python benchmarks/bench_memory.py [PASSOS]
+"""
+
+import gc
+import math
+import os
+import sys
+import time
+import tracemalloc
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from balance import chase_bot
+from game import Animal, Hunter, Simulation
+
+
+def bytes_per_entity(factory, count=10000):
+    """Memória alocada por entidade, medida com tracemalloc"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    entities = [factory(i) for i in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del entities
+    return (after - before) / count
+
+
+class GCTimer:
+    """Conta as coletas do gc e soma o tempo gasto nelas"""
+
+    def __init__(self):
+        self.collections = 0
+        self.paused = 0.0
+        self.longest = 0.0
+        self.started = None
+
+    def __call__(self, phase, info):
+        if phase == "start":
+            self.started = time.perf_counter()
+        elif self.started is not None:
+            pause = time.perf_counter() - self.started
+            self.collections += 1
+            self.paused += pause
+            self.longest = max(self.longest, pause)
+
+
+def session(ticks, pool_limit, seed=0):
+    """Roda a sessão e devolve (estatísticas do gc, entidades criadas, reaproveitadas)"""
+    sim = Simulation(seed=seed)
+    sim.max_animals_lost = math.inf
+    sim.hunter_spawn_ticks = sim.animal_spawn_ticks = 20  # Muitos spawns e remoções
+    sim.hunter_pool.limit = sim.animal_pool.limit = pool_limit
+    timer = GCTimer()
+    gc.collect()
+    gc.callbacks.append(timer)
+    try:
+        for _ in range(ticks):
+            sim.step(chase_bot(sim))
+    finally:
+        gc.callbacks.remove(timer)
+    created = sim.hunter_pool.created + sim.animal_pool.created
+    reused = sim.hunter_pool.reused + sim.animal_pool.reused
+    return timer, created, reused
+
+
+def main(argv):
+    ticks = int(argv[0]) if argv else 20000
+    print(f"Hunter: {bytes_per_entity(lambda i: Hunter(i, i)):.0f} bytes/entidade")
+    print(f"Animal: {bytes_per_entity(lambda i: Animal(i, i, 'onça')):.0f} bytes/entidade")
+    print(f"\nSessão de {ticks} passos")
+    print(f"{'pool':>8} {'criadas':>8} {'reusadas':>9} {'coletas':>8} {'gc (ms)':>8} {'maior (ms)':>11}")
+    for label, limit in (("sem", 0), ("com", 256)):
+        timer, created, reused = session(ticks, limit)
+        print(f"{label:>8} {created:>8} {reused:>9} {timer.collections:>8} "
+              f"{timer.paused * 1000:>8.1f} {timer.longest * 1000:>11.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Benchmark da escolha de alvo dos caçadores: min() sobre a lista x NearestIndex
+
+Mede o custo de redefinir o alvo de todos os caçadores de uma vez (o pico
+que acontece quando vários perdem o alvo no mesmo quadro).
+
+Uso: python benchmarks/bench_nearest.py [N ...]
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from bench_spatial import build_scene, time_frame
+from spatial import NearestIndex
+
+
+def retarget_linear(hunters, animals):
+    """Como Hunter.find_nearest_animal sem índice"""
+    return [hunter.find_nearest_animal(animals) for hunter in hunters]
+
+
+def retarget_indexed(hunters, index):
+    """Consulta em lote no índice de vizinho mais próximo"""
+    return index.nearest_many([(hunter.x, hunter.y) for hunter in hunters])
+
+
+def main(argv):
+    sizes = [int(arg) for arg in argv] or [10, 100, 1000, 10000]
+    print(f"{'entidades':>10} {'lista (ms)':>12} {'índice (ms)':>12} {'ganho':>8}")
+    for count in sizes:
+        _, hunters, animals = build_scene(count)
+        index = NearestIndex()
+        for order, animal in enumerate(animals):
+            index.add(animal, animal.x, animal.y, order)
+        linear_ms, linear = time_frame(retarget_linear, hunters, animals)
+        indexed_ms, indexed = time_frame(retarget_indexed, hunters, index)
+        assert linear == indexed, "o índice deve escolher os mesmos alvos"
+        print(f"{count:>10} {linear_ms:>12.3f} {indexed_ms:>12.3f} {linear_ms / indexed_ms:>7.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
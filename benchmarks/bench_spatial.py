@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Benchmark das consultas de colisão e proximidade: laços aninhados x grade espacial
+
+Mede, por quadro, o custo dos quatro testes de Simulation.update_entities
+(caçador-animal, Caipora-caçador, Caipora-animal e raio de medo) com
+10, 100, 1.000 e 10.000 entidades. A área do mundo cresce com o número de
+entidades para manter a densidade parecida com a do jogo.
+
+Uso: python benchmarks/bench_spatial.py [N ...]
+"""
+
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from game import Animal, Caipora, Hunter
+from spatial import SpatialHash
+
+
+def build_scene(count, seed=0):
+    """Cria metade caçadores e metade animais espalhados pelo mundo"""
+    random.seed(seed)
+    scale = max(1.0, math.sqrt(count / 20))
+    width, height = int(1024 * scale), int(768 * scale)
+    hunters = [Hunter(random.uniform(0, width), random.uniform(0, height)) for _ in range(count // 2)]
+    animals = [Animal(random.uniform(0, width), random.uniform(0, height), "onça") for _ in range(count - count // 2)]
+    for entity in hunters + animals:
+        entity.rect.x, entity.rect.y = entity.x, entity.y
+    return Caipora(width // 2, height // 2), hunters, animals
+
+
+def brute_force_frame(caipora, hunters, animals):
+    """Consultas como eram feitas antes: todos contra todos"""
+    hits = 0
+    for hunter in hunters:
+        hits += caipora.rect.colliderect(hunter.rect)
+        for animal in animals:
+            hits += hunter.rect.colliderect(animal.rect)
+    for animal in animals:
+        hits += caipora.rect.colliderect(animal.rect)
+        for hunter in hunters:
+            if ((animal.x - hunter.x) ** 2 + (animal.y - hunter.y) ** 2) ** 0.5 < Animal.FEAR_RADIUS:
+                hits += 1
+                break
+    return hits
+
+
+def grid_frame(caipora, hunters, animals, hunter_grid, animal_grid):
+    """Mesmas consultas usando as grades reconstruídas no quadro"""
+    hits = 0
+    animal_grid.build(animals)
+    hunter_grid.build(hunters)
+    for hunter in hunters:
+        for i in animal_grid.query_rect(hunter.rect):
+            hits += hunter.rect.colliderect(animals[i].rect)
+    for i in hunter_grid.query_rect(caipora.rect):
+        hits += caipora.rect.colliderect(hunters[i].rect)
+    for animal in animals:
+        for i in hunter_grid.query_radius(animal.x, animal.y, Animal.FEAR_RADIUS):
+            hunter = hunters[i]
+            if ((animal.x - hunter.x) ** 2 + (animal.y - hunter.y) ** 2) ** 0.5 < Animal.FEAR_RADIUS:
+                hits += 1
+                break
+    for i in animal_grid.query_rect(caipora.rect):
+        hits += caipora.rect.colliderect(animals[i].rect)
+    return hits
+
+
+def time_frame(func, *args, budget=1.0):
+    """Tempo médio (ms) de um quadro, repetindo até gastar o orçamento"""
+    runs, start = 0, time.perf_counter()
+    result = func(*args)
+    runs += 1
+    while time.perf_counter() - start < budget and runs < 200:
+        func(*args)
+        runs += 1
+    return (time.perf_counter() - start) / runs * 1000, result
+
+
+def main(argv):
+    sizes = [int(arg) for arg in argv] or [10, 100, 1000, 10000]
+    print(f"{'entidades':>10} {'laços (ms)':>12} {'grade (ms)':>12} {'ganho':>8}")
+    for count in sizes:
+        caipora, hunters, animals = build_scene(count)
+        brute_ms, brute_hits = time_frame(brute_force_frame, caipora, hunters, animals)
+        grids = SpatialHash(linear_limit=0), SpatialHash(linear_limit=0)  # Sempre a grade, mesmo com poucas entidades
+        grid_ms, grid_hits = time_frame(grid_frame, caipora, hunters, animals, *grids)
+        assert brute_hits == grid_hits, "a grade deve encontrar as mesmas colisões"
+        print(f"{count:>10} {brute_ms:>12.3f} {grid_ms:>12.3f} {brute_ms / grid_ms:>7.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Tempo de inicialização: do início do main.py até o primeiro quadro
+
+Cada rodada abre o jogo num processo novo (python src/main.py --no-wait
+--frames 1, no driver de vídeo dummy do SDL), que grava os tempos das etapas
+(importações, subsistemas do pygame, janela, Game()) e o tempo até o primeiro
+quadro. O relatório mostra a mediana e o mínimo de cada etapa e o tempo de
+parede do processo inteiro. Como na suíte de benchmarks, os resultados podem
+ser gravados como linha de base e comparados depois.
+
+Uso: python benchmarks/bench_startup.py [--runs N] [--save base.json]
+                                        [--compare base.json] [--threshold 0.15]
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+MAIN = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src", "main.py")
+
+
+def run_once(report_path):
+    """Abre e fecha o jogo uma vez; devolve (relatório da inicialização, tempo de parede em ms)"""
+    env = dict(os.environ, SDL_VIDEODRIVER="dummy")
+    start = time.perf_counter()
+    subprocess.run([sys.executable, MAIN, "--no-wait", "--frames", "1", "--startup-report", report_path],
+                   env=env, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, check=True)
+    wall = (time.perf_counter() - start) * 1000
+    with open(report_path, encoding="utf-8") as source:
+        return json.load(source), wall
+
+
+def measure(runs):
+    """Mediana e mínimo, em ms, de cada etapa, do primeiro quadro e do processo, em runs rodadas"""
+    samples = {}
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "startup.json")
+        for _ in range(runs):
+            report, wall = run_once(path)
+            for stage in report['stages']:
+                samples.setdefault(stage['name'], []).append(stage['ms'])
+            samples.setdefault('primeiro quadro', []).append(report['first_frame_ms'])
+            samples.setdefault('processo', []).append(wall)
+    return {name: {'median_ms': statistics.median(values), 'min_ms': min(values)}
+            for name, values in samples.items()}
+
+
+def compare(results, baseline, threshold):
+    """Etapas cuja mediana piorou mais que threshold em relação à linha de base"""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get('results', {}).get(name)
+        if base is not None and base['median_ms'] > 0 and result['median_ms'] > base['median_ms'] * (1 + threshold):
+            regressions.append((name, base['median_ms'], result['median_ms']))
+    return regressions
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Tempo de inicialização do jogo")
+    parser.add_argument("--runs", type=int, default=10, help="processos abertos")
+    parser.add_argument("--save", help="grava os resultados como linha de base (JSON)")
+    parser.add_argument("--compare", help="linha de base (JSON) para comparar")
+    parser.add_argument("--threshold", type=float, default=0.15, help="piora tolerada da mediana (0.15 = 15%%)")
+    args = parser.parse_args(argv)
+
+    results = measure(args.runs)
+    print(f"{'etapa':<28} {'mediana (ms)':>13} {'mínimo (ms)':>12}")
+    for name, result in results.items():
+        print(f"{name:<28} {result['median_ms']:>13.1f} {result['min_ms']:>12.1f}")
+
+    status = 0
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as source:
+            regressions = compare(results, json.load(source), args.threshold)
+        for name, old, new in regressions:
+            print(f"REGRESSÃO {name}: {old:.1f} -> {new:.1f} ms (+{(new / old - 1) * 100:.0f}%)")
+        if not regressions:
+            print(f"sem regressões acima de {args.threshold:.0%} em relação a {args.compare}")
+        status = 1 if regressions else 0
+    if args.save:
+        meta = {'python': platform.python_version(), 'platform': platform.platform(), 'runs': args.runs}
+        with open(args.save, "w", encoding="utf-8") as output:
+            json.dump({'meta': meta, 'results': results}, output, indent=2)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Suíte de benchmarks de atualização e desenho: game.py x game_compact.py
+
+Cada cenário parte de uma semente fixa com N caçadores, M animais e K efeitos
+e mede, quadro a quadro, Game.update_entities (atualização) e Game.draw
+(desenho, no driver de vídeo dummy do SDL, sem janela). O relatório mostra a
+mediana e o p99 do custo por quadro. Os resultados podem ser gravados como
+linha de base em JSON e comparados em execuções seguintes: um cenário cuja
+mediana piora além do limite é marcado como regressão.
+
+Uso: python benchmarks/bench_suite.py [--quick] [--frames F] [--save base.json]
+                                      [--compare base.json] [--threshold 0.15]
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import statistics
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import pygame
+
+import game
+import game_compact
+
+MODULES = {"game": game, "game_compact": game_compact}
+FULL = [(n, m, k) for n in (10, 100, 400) for m in (10, 100) for k in (0, 200)]
+QUICK = [(10, 10, 0), (100, 100, 200)]
+# A Caipora anda em círculo (uma direção a cada 20 passos) para cruzar com as entidades
+PATTERN = [(1, 0), (1, 1), (0, 1), (-1, 1), (-1, 0), (-1, -1), (0, -1), (1, -1)]
+
+
+def scenario_name(module, hunters, animals, effects):
+    return f"{module}/N{hunters}xM{animals}xK{effects}"
+
+
+def add_effects(module, sim, count):
+    """Completa os efeitos vivos até count, espalhados pelo mundo"""
+    rng = sim.rng
+    while len(sim.effects) < count:
+        x, y = rng.randint(0, sim.width), rng.randint(0, sim.height)
+        kind = rng.choice(["expulsion", "save"])
+        if module is game:
+            sim.add_effect(x, y, kind)
+        else:
+            timer, radius = (30, 10) if kind == "expulsion" else (60, 5)
+            sim.effects.append({'type': kind, 'x': x, 'y': y, 'timer': timer, 'radius': radius})
+
+
+def build_game(module, hunters, animals, effects, seed=0):
+    """Jogo em andamento com a simulação povoada pelo cenário"""
+    g = module.Game(time_scale=None)
+    # O mundo, que pode ser maior que a tela, com os mesmos obstáculos do jogo
+    obstacles = {'obstacles': g.sim.obstacles} if module is game else {}
+    sim = module.Simulation(g.sim.width, g.sim.height, seed=seed, **obstacles)
+    sim.max_animals_lost = math.inf  # O benchmark não deve parar por fim de jogo
+    rng = sim.rng
+    for _ in range(hunters - len(sim.hunters)):
+        hunter = module.Hunter(rng.uniform(0, sim.width), rng.uniform(0, sim.height), rng)
+        if module is game:
+            sim.add_hunter(hunter)
+        else:
+            sim.hunters.append(hunter)
+    for _ in range(animals - len(sim.animals)):
+        animal = module.Animal(rng.uniform(0, sim.width), rng.uniform(0, sim.height), "onça", rng)
+        if module is game:
+            sim.add_animal(animal)
+        else:
+            sim.animals.append(animal)
+    add_effects(module, sim, effects)
+    g.sim = sim
+    g.game_state = "playing"
+    return g
+
+
+def percentile(values, fraction):
+    """Percentil por posição na lista ordenada (sem interpolação)"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, round(fraction * (len(ordered) - 1)))]
+
+
+def summarize(times):
+    """Mediana e p99, em ms, dos tempos por quadro (em segundos)"""
+    return {'median_ms': round(statistics.median(times) * 1000, 4),
+            'p99_ms': round(percentile(times, 0.99) * 1000, 4)}
+
+
+def run_scenario(module, hunters, animals, effects, frames, warmup=10):
+    """Tempos de atualização e desenho de cada quadro do cenário"""
+    g = build_game(module, hunters, animals, effects)
+    update, render = [], []
+    for frame in range(warmup + frames):
+        add_effects(module, g.sim, effects)  # Mantém K efeitos vivos (fora da medição)
+        inputs = PATTERN[frame // 20 % len(PATTERN)]
+        start = time.perf_counter()
+        g.update_entities(inputs)
+        middle = time.perf_counter()
+        g.draw()
+        end = time.perf_counter()
+        if frame >= warmup:
+            update.append(middle - start)
+            render.append(end - middle)
+    return {'update': summarize(update), 'render': summarize(render),
+            'entities': {'hunters': len(g.sim.hunters), 'animals': len(g.sim.animals)}}
+
+
+def compare(results, baseline, threshold):
+    """Cenários cuja mediana piorou mais que threshold em relação à linha de base"""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get('results', {}).get(name)
+        if base is None:
+            continue
+        for phase in ("update", "render"):
+            old, new = base[phase]['median_ms'], result[phase]['median_ms']
+            if old > 0 and new > old * (1 + threshold):
+                regressions.append((name, phase, old, new))
+    return regressions
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Benchmarks de atualização e desenho")
+    parser.add_argument("--quick", action="store_true", help="só dois cenários pequenos")
+    parser.add_argument("--frames", type=int, default=120, help="quadros medidos por cenário")
+    parser.add_argument("--modules", nargs="+", default=list(MODULES), choices=list(MODULES))
+    parser.add_argument("--save", help="grava os resultados como linha de base (JSON)")
+    parser.add_argument("--compare", help="linha de base (JSON) para comparar")
+    parser.add_argument("--threshold", type=float, default=0.15, help="piora tolerada da mediana (0.15 = 15%%)")
+    args = parser.parse_args(argv)
+
+    results = {}
+    print(f"{'cenário':<28} {'atualização med/p99 (ms)':>25} {'desenho med/p99 (ms)':>22}")
+    for name in args.modules:
+        for hunters, animals, effects in (QUICK if args.quick else FULL):
+            key = scenario_name(name, hunters, animals, effects)
+            result = results[key] = run_scenario(MODULES[name], hunters, animals, effects, args.frames)
+            update, render = result['update'], result['render']
+            print(f"{key:<28} {update['median_ms']:>12.3f} / {update['p99_ms']:>9.3f} "
+                  f"{render['median_ms']:>10.3f} / {render['p99_ms']:>9.3f}")
+    pygame.quit()
+
+    status = 0
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as source:
+            regressions = compare(results, json.load(source), args.threshold)
+        for name, phase, old, new in regressions:
+            print(f"REGRESSÃO {name} {phase}: {old:.3f} -> {new:.3f} ms (+{(new / old - 1) * 100:.0f}%)")
+        if not regressions:
+            print(f"sem regressões acima de {args.threshold:.0%} em relação a {args.compare}")
+        status = 1 if regressions else 0
+    if args.save:
+        meta = {'python': platform.python_version(), 'pygame': pygame.version.ver,
+                'platform': platform.platform(), 'frames': args.frames}
+        with open(args.save, "w", encoding="utf-8") as output:
+            json.dump({'meta': meta, 'results': results}, output, indent=2)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
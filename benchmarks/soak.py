@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Teste de longa duração: roda a Simulation sem janela e acompanha a memória
+
+A Caipora persegue caçadores (o bot de balance.py) e o jogo não termina
+por animais perdidos. A cada minuto simulado o MemoryMonitor guarda uma
+amostra; no fim o script compara a memória rastreada no início e no fim.
+
+Uso: python benchmarks/soak.py [HORAS_SIMULADAS] [relatorio.json]
+"""
+
+import math
+import os
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from balance import chase_bot
+from game import Simulation
+from memory import MemoryMonitor
+
+
+def main(argv):
+    hours = float(argv[0]) if argv else 1.0
+    output = argv[1] if len(argv) > 1 else None
+    sim = Simulation(seed=0)
+    sim.max_animals_lost = math.inf
+    monitor = MemoryMonitor(trace=True)
+    minute = 60 * Simulation.TICK_RATE
+    total = int(hours * 60 * minute)
+
+    start = time.perf_counter()
+    for tick in range(1, total + 1):
+        sim.step(chase_bot(sim))
+        if tick % minute == 0:
+            sample = monitor.sample(sim)
+            if tick % (60 * minute) == 0:
+                print(f"{tick // minute:>6} min  entidades={sample['entities']}  "
+                      f"rastreada={sample['traced_kb']} KB  pico RSS={sample['peak_rss_kb']} KB")
+    elapsed = time.perf_counter() - start
+
+    samples = list(monitor.samples)
+    if samples:
+        first, last = samples[len(samples) // 10], samples[-1]  # Ignora o aquecimento
+        print(f"\n{total} passos em {elapsed:.1f} s ({total / elapsed:.0f} passos/s)")
+        print(f"memória rastreada: {first['traced_kb']} KB -> {last['traced_kb']} KB; "
+              f"orçamento: {sim.budget.report()}")
+    if output:
+        monitor.dump(sim, output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,600 @@
+"""
+Backend opcional em NumPy: caçadores e animais guardados como estrutura de arrays
+
+ArraySimulation aplica as mesmas regras de game.Simulation, mas atualiza todas
+as entidades com operações em lote. Com a mesma semente (e as mesmas entradas),
+as duas simulações produzem exatamente os mesmos estados.
+"""
+
+import functools
+import heapq
+
+import pygame
+
+try:
+    import numpy as np
+except ImportError:  # NumPy é opcional: só este backend depende dele
+    np = None
+
+from game import Animal, Hunter, Simulation
+from profiler import profiler
+
+HUNTER_SIZE = 35
+ANIMAL_SIZE = 25
+NO_TARGET = -1
+NOBODY = 2 ** 62  # Índice "infinito" para buscas de mínimo
+DIRECTIONS = [-1, 0, 1]
+
+# Chaves de célula: (coluna + OFFSET) * STRIDE + (linha + OFFSET)
+CELL_OFFSET = 1 << 20
+CELL_STRIDE = 1 << 21
+NEIGHBORS = tuple(np.array(values) for values in ([-1, 0, 1], [-1] * 3, [1] * 3)) if np is not None else None
+
+
+def rect_coords(values):
+    """Coordenadas inteiras como pygame.Rect as calcula (arredonda para longe do zero)"""
+    whole = np.trunc(values)
+    return (whole + np.sign(values) * (np.abs(values - whole) >= 0.5)).astype(np.int64)
+
+
+def rects_overlap(ax, ay, aw, ah, bx, by, bw, bh):
+    """Equivalente vetorizado de pygame.Rect.colliderect"""
+    return (ax < bx + bw) & (ay < by + bh) & (bx < ax + aw) & (by < ay + ah)
+
+
+@functools.lru_cache(maxsize=None)
+def ring_offsets(ring):
+    """Trechos de coluna (coluna, primeira linha, última linha) do anel de Chebyshev ring"""
+    if ring == 0:
+        return np.array([0]), np.array([0]), np.array([0])
+    middle = np.arange(-ring + 1, ring)
+    ox = np.concatenate(([-ring, ring], middle, middle))
+    low = np.concatenate(([-ring, -ring], np.full(middle.size, -ring), np.full(middle.size, ring)))
+    high = np.concatenate(([ring, ring], np.full(middle.size, -ring), np.full(middle.size, ring)))
+    return ox, low, high
+
+
+class PointGrid:
+    """Pontos agrupados por célula, para consultas de vizinhança em lote
+
+    ids guarda, para cada ponto, o índice da entidade de origem.
+    """
+
+    def __init__(self, px, py, cell, ids=None):
+        self.cell = cell
+        self.px, self.py = px, py
+        self.ids = np.arange(len(px)) if ids is None else ids
+        cx, cy = self.cells(px, py)
+        keys = cx * CELL_STRIDE + cy
+        self.order = np.argsort(keys, kind="stable")
+        self.sorted_keys = keys[self.order]
+        self.bounds = (cx.min(), cy.min(), cx.max(), cy.max()) if len(px) else None
+
+    def cells(self, x, y):
+        """Chaves de coluna e linha dos pontos"""
+        return (np.floor_divide(x, self.cell).astype(np.int64) + CELL_OFFSET,
+                np.floor_divide(y, self.cell).astype(np.int64) + CELL_OFFSET)
+
+    def lookup(self, qcx, qcy, segments):
+        """Pares (consulta, ponto) nos trechos de coluna deslocados a partir de cada consulta
+
+        Células da mesma coluna têm chaves consecutivas, então cada trecho
+        custa uma única busca binária por extremidade.
+        """
+        ox, low, high = segments
+        column = (qcx[:, None] + ox) * CELL_STRIDE + qcy[:, None]
+        lo = np.searchsorted(self.sorted_keys, (column + low).ravel(), "left")
+        counts = np.searchsorted(self.sorted_keys, (column + high).ravel(), "right") - lo
+        total = int(counts.sum())
+        queries = np.repeat(np.repeat(np.arange(len(qcx)), len(ox)), counts)
+        starts = np.repeat(lo - (np.cumsum(counts) - counts), counts)
+        return queries, self.order[np.arange(total) + starts]
+
+    def pairs(self, qx, qy):
+        """Pares (consulta, ponto) em que o ponto está na célula da consulta ou numa vizinha
+
+        Os pares saem agrupados por consulta, em ordem crescente.
+        """
+        if not len(qx) or not len(self.px):
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty
+        return self.lookup(*self.cells(qx, qy), NEIGHBORS)
+
+    def nearest(self, qx, qy, allowed=None):
+        """Id do ponto permitido mais próximo de cada consulta, buscando em anéis de células
+
+        Empates ficam com o menor id; sem pontos permitidos o resultado é NO_TARGET.
+        """
+        best = np.full(len(qx), NO_TARGET, dtype=np.int64)
+        if not len(qx) or not len(self.px):
+            return best
+        best_d2 = np.full(len(qx), np.inf)
+        qcx, qcy = self.cells(qx, qy)
+        min_cx, min_cy, max_cx, max_cy = self.bounds
+        last_ring = np.maximum.reduce([qcx - min_cx, max_cx - qcx, qcy - min_cy, max_cy - qcy])
+        active = np.arange(len(qx))
+        ring = 0
+        while active.size:
+            q, p = self.lookup(qcx[active], qcy[active], ring_offsets(ring))
+            if allowed is not None:
+                keep = allowed[p]
+                q, p = q[keep], p[keep]
+            if q.size:
+                q = active[q]
+                dx, dy = qx[q] - self.px[p], qy[q] - self.py[p]
+                d2, ids = dx * dx + dy * dy, self.ids[p]
+                # Melhor candidato de cada consulta neste anel
+                order = np.lexsort((ids, d2, q))
+                q, d2, ids = q[order], d2[order], ids[order]
+                head = np.flatnonzero(np.r_[True, q[1:] != q[:-1]])
+                q, d2, ids = q[head], d2[head], ids[head]
+                better = (d2 < best_d2[q]) | ((d2 == best_d2[q]) & (ids < best[q]))
+                best[q[better]], best_d2[q[better]] = ids[better], d2[better]
+            # Pontos de anéis mais externos estão a pelo menos ring * cell de distância
+            done = (best_d2[active] < (ring * self.cell) ** 2) | (last_ring[active] <= ring)
+            active = active[~done]
+            ring += 1
+        return best
+
+
+class EntityArrays:
+    """Estrutura de arrays com capacidade crescente; cada campo é um array NumPy"""
+
+    FIELDS = {}
+
+    def __init__(self, capacity=64):
+        self.count = 0
+        self.data = {name: np.zeros(capacity, dtype) for name, dtype in self.FIELDS.items()}
+
+    def __len__(self):
+        return self.count
+
+    def __getattr__(self, name):
+        data = self.__dict__.get("data")
+        if data is not None and name in data:
+            return data[name][:self.count]
+        raise AttributeError(name)
+
+    def append_row(self, **values):
+        """Adiciona uma entidade, dobrando a capacidade quando necessário"""
+        capacity = len(next(iter(self.data.values())))
+        if self.count == capacity:
+            for name, array in self.data.items():
+                grown = np.zeros(capacity * 2, array.dtype)
+                grown[:capacity] = array
+                self.data[name] = grown
+        for name, value in values.items():
+            self.data[name][self.count] = value
+        self.count += 1
+
+    def keep(self, mask):
+        """Mantém só as entidades marcadas, preservando a ordem; devolve o novo índice de cada uma"""
+        remap = np.cumsum(mask) - 1
+        kept = int(mask.sum())
+        for name, array in self.data.items():
+            array[:kept] = array[:self.count][mask]
+        self.count = kept
+        return remap
+
+
+class HunterArrays(EntityArrays):
+    """Caçadores em estrutura de arrays"""
+
+    FIELDS = {
+        "x": np.float64, "y": np.float64, "prev_x": np.float64, "prev_y": np.float64,
+        "speed": np.float64, "dir_x": np.float64, "dir_y": np.float64,
+        "rect_x": np.int64, "rect_y": np.int64,
+        "fleeing": np.bool_, "flee_timer": np.int64, "target": np.int64, "slot": np.int64,
+    } if np is not None else {}
+
+    def append(self, hunter, target=NO_TARGET):
+        """Copia um Hunter recém-criado para os arrays"""
+        self.append_row(x=hunter.x, y=hunter.y, prev_x=hunter.prev_x, prev_y=hunter.prev_y,
+                        speed=hunter.speed, dir_x=hunter.direction_x, dir_y=hunter.direction_y,
+                        rect_x=hunter.rect.x, rect_y=hunter.rect.y, fleeing=hunter.is_fleeing,
+                        flee_timer=hunter.flee_timer, target=target, slot=hunter.ai_slot)
+
+
+class AnimalArrays(EntityArrays):
+    """Animais em estrutura de arrays"""
+
+    FIELDS = {
+        "x": np.float64, "y": np.float64, "prev_x": np.float64, "prev_y": np.float64,
+        "speed": np.float64, "dir_x": np.float64, "dir_y": np.float64,
+        "rect_x": np.int64, "rect_y": np.int64,
+        "caught": np.bool_, "saved": np.bool_, "fear": np.int64,
+        "removal_timer": np.int64, "move_timer": np.int64, "kind": np.int64, "slot": np.int64,
+    } if np is not None else {}
+
+    def __init__(self, capacity=64):
+        super().__init__(capacity)
+        self.kinds = []  # Tipos de animal, indexados pelo campo kind
+
+    def append(self, animal, move_timer=0):
+        """Copia um Animal recém-criado para os arrays, com move_timer passos já contados para trocar de rumo"""
+        if animal.animal_type not in self.kinds:
+            self.kinds.append(animal.animal_type)
+        self.append_row(x=animal.x, y=animal.y, prev_x=animal.prev_x, prev_y=animal.prev_y,
+                        speed=animal.speed, dir_x=animal.direction_x, dir_y=animal.direction_y,
+                        rect_x=animal.rect.x, rect_y=animal.rect.y, caught=animal.is_caught,
+                        saved=animal.is_saved, fear=animal.fear_level,
+                        removal_timer=animal.removal_timer, move_timer=move_timer,
+                        kind=self.kinds.index(animal.animal_type), slot=animal.ai_slot)
+
+
+class ArraySimulation(Simulation):
+    """Simulation com caçadores e animais em arrays NumPy e atualização em lote
+
+    Pontuação, Caipora, efeitos e spawns (agendados na roda de tempo)
+    continuam sendo os da Simulation; as entidades criadas por ela são
+    copiadas para os arrays, onde os timers de cada uma são contadores
+    atualizados em lote.
+    """
+
+    CAPTURE_CELL = 64  # Maior que os retângulos de caçador e animal
+    TARGET_CELL = 128  # Células da busca de alvo mais próximo
+
+    def __init__(self, width=1024, height=768, seed=None, rng=None, obstacles=None, level=None, stats=None):
+        if np is None:
+            raise ImportError("ArraySimulation requer NumPy: pip install numpy")
+        if obstacles:
+            raise ValueError("ArraySimulation ainda não trata obstáculos: use a Simulation")
+        super().__init__(width, height, seed, rng, level=level, stats=stats)
+
+    def spawn_initial_entities(self):
+        """Cria as entidades iniciais como objetos, copiados para os arrays"""
+        self.hunters, self.animals = HunterArrays(), AnimalArrays()
+        super().spawn_initial_entities()
+
+    def add_animal(self, animal):
+        """Adiciona um animal aos arrays, num balde do escalonador da IA
+
+        Os timers dos arrays contam passos a cada atualização; a troca de rumo
+        começa defasada pelo balde, como a agendada pela Simulation.
+        """
+        self.ai.assign(animal)
+        self.animals.append(animal, animal.ai_slot * Animal.WANDER_TICKS // self.ai.period)
+
+    def add_hunter(self, hunter):
+        """Adiciona um caçador aos arrays, num balde do escalonador da IA"""
+        self.ai.assign(hunter)
+        self.hunters.append(hunter)
+
+    def thinking(self, slot, x, y, bucket=None):
+        """Máscara das entidades (baldes slot, posições x, y) que decidem com o balde bucket ativo"""
+        left, top, right, bottom = self.ai.window(self.caipora)
+        bucket = self.ai.active if bucket is None else bucket
+        return (slot == bucket) | ((x > left) & (x < right) & (y > top) & (y < bottom))
+
+    def save_previous_positions(self):
+        """Guarda as posições do passo anterior para a interpolação do desenho"""
+        self.caipora.prev_x, self.caipora.prev_y = self.caipora.x, self.caipora.y
+        for store in (self.hunters, self.animals):
+            store.prev_x[:] = store.x
+            store.prev_y[:] = store.y
+
+    def eligible_animals(self):
+        """Animais que ainda podem ser alvo (nem capturados nem salvos)"""
+        return ~self.animals.caught & ~self.animals.saved
+
+    def valid_targets(self):
+        """Máscara dos caçadores cujo alvo atual ainda pode ser capturado"""
+        target = self.hunters.target
+        has = target >= 0
+        safe = np.where(has, target, 0)
+        return has & self.eligible_animals()[safe] if len(self.animals) else has & False
+
+    def target_grid(self):
+        """Grade com os animais que ainda podem ser alvo"""
+        eligible = np.flatnonzero(self.eligible_animals())
+        return PointGrid(self.animals.x[eligible], self.animals.y[eligible], self.TARGET_CELL, eligible)
+
+    def retarget_hunters(self):
+        """Escolhe, em lote, o animal mais próximo para os caçadores sem alvo válido (que decidem no próximo passo)"""
+        hunters = self.hunters
+        upcoming = self.thinking(hunters.slot, hunters.x, hunters.y, self.ai.bucket(self.ticks + 1))
+        ids = np.flatnonzero(~hunters.fleeing & ~self.valid_targets() & upcoming)
+        if ids.size:
+            hunters.target[ids] = self.target_grid().nearest(hunters.x[ids], hunters.y[ids])
+
+    def chase(self, ids, start, think=None):
+        """Move os caçadores ids em direção ao alvo, a partir do estado do início do passo
+
+        Só quem está na máscara think (todos, sem ela) ou parado refaz a direção.
+        """
+        hunters, animals = self.hunters, self.animals
+        start_x, start_y, start_dir_x, start_dir_y = start
+        dir_x, dir_y = start_dir_x[ids], start_dir_y[ids]
+        target = hunters.target[ids]
+        aiming = target >= 0
+        if think is not None:
+            aiming &= think[ids] | ((dir_x == 0) & (dir_y == 0))
+        has = np.flatnonzero(aiming)
+        dx = animals.x[target[has]] - start_x[ids][has]
+        dy = animals.y[target[has]] - start_y[ids][has]
+        distance = np.sqrt(dx * dx + dy * dy)
+        moving = distance > 0
+        dir_x[has[moving]] = dx[moving] / distance[moving]
+        dir_y[has[moving]] = dy[moving] / distance[moving]
+        hunters.dir_x[ids], hunters.dir_y[ids] = dir_x, dir_y
+        hunters.x[ids] = start_x[ids] + dir_x * hunters.speed[ids]
+        hunters.y[ids] = start_y[ids] + dir_y * hunters.speed[ids]
+        hunters.rect_x[ids] = rect_coords(hunters.x[ids])
+        hunters.rect_y[ids] = rect_coords(hunters.y[ids])
+
+    def capture_pairs(self, grid, ids):
+        """Pares (caçador, animal) com retângulos sobrepostos, agrupados por caçador"""
+        hunters, animals = self.hunters, self.animals
+        q, p = grid.pairs(hunters.rect_x[ids], hunters.rect_y[ids])
+        pair_h, pair_a = ids[q], grid.ids[p]
+        hit = rects_overlap(hunters.rect_x[pair_h], hunters.rect_y[pair_h], HUNTER_SIZE, HUNTER_SIZE,
+                            animals.rect_x[pair_a], animals.rect_y[pair_a], ANIMAL_SIZE, ANIMAL_SIZE)
+        return pair_h[hit], pair_a[hit]
+
+    def update_hunters(self):
+        """Move os caçadores e resolve capturas com o mesmo resultado do laço da Simulation"""
+        hunters, animals = self.hunters, self.animals
+        order = np.arange(len(hunters))
+        start = (hunters.x.copy(), hunters.y.copy(), hunters.dir_x.copy(), hunters.dir_y.copy())
+        valid = self.valid_targets()
+
+        # Caçadores em fuga
+        fleeing = hunters.fleeing.copy()
+        hunters.flee_timer[fleeing] -= 1
+        hunters.fleeing[fleeing & (hunters.flee_timer <= 0)] = False
+        hunters.x[fleeing] += hunters.dir_x[fleeing] * (hunters.speed[fleeing] * 2)
+        hunters.y[fleeing] += hunters.dir_y[fleeing] * (hunters.speed[fleeing] * 2)
+        hunters.rect_x[fleeing] = rect_coords(hunters.x[fleeing])
+        hunters.rect_y[fleeing] = rect_coords(hunters.y[fleeing])
+
+        # Caçadores perseguindo o alvo escolhido no fim do passo anterior
+        self.ai.begin(self.ticks)
+        deciding = ~fleeing & self.thinking(hunters.slot, start[0], start[1])
+        self.chase(order[~fleeing], start, deciding)
+
+        # Cada animal é capturado pelo caçador de menor índice que o alcança
+        catchable = np.flatnonzero(~animals.caught)
+        grid = PointGrid(animals.rect_x[catchable], animals.rect_y[catchable], self.CAPTURE_CELL, catchable)
+        pair_h, pair_a = self.capture_pairs(grid, order)
+        first = np.full(len(animals), NOBODY, dtype=np.int64)
+        np.minimum.at(first, pair_a, pair_h)
+
+        # Só quem decide neste passo troca de alvo: o que outro capturou antes ou o que
+        # já não valia no início do passo (de quem ficou sem decidir na última troca em lote)
+        target = hunters.target
+        stolen = deciding & (target >= 0)
+        stolen[stolen] = first[target[stolen]] < order[stolen]
+        lost = deciding & ~valid
+        if stolen.any() or lost.any():
+            self.resolve_stolen_targets(np.flatnonzero(stolen | lost), lost, first, pair_h, pair_a, deciding,
+                                        start, grid)
+
+        caught = first < NOBODY
+        if caught.any():
+            animals.caught[caught] = True
+            self.animals_lost += int(caught.sum())
+            if self.animals_lost >= self.max_animals_lost:
+                self.game_over = True
+
+    def resolve_stolen_targets(self, stolen, lost, first, pair_h, pair_a, deciding, start, grid):
+        """Refaz, em ordem de índice, os caçadores cujo alvo outro capturou antes
+
+        No laço sequencial esses caçadores escolheriam outro alvo antes de se
+        mover; cada correção pode mudar quem captura cada animal, então os
+        caçadores seguintes que miram os animais afetados são reavaliados.
+        Os marcados em lost começam o passo sem alvo válido e também escolhem
+        um; só os marcados em deciding (sem fuga e decidindo neste passo)
+        trocam de alvo.
+        """
+        hunters = self.hunters
+        targets = self.target_grid()
+
+        # Pares também ordenados por animal; alive marca os que ainda valem
+        by_animal = np.lexsort((pair_h, pair_a))
+        sorted_a, sorted_h = pair_a[by_animal], pair_h[by_animal]
+        slot = np.empty_like(by_animal)
+        slot[by_animal] = np.arange(by_animal.size)
+        alive = np.ones(by_animal.size, dtype=bool)
+        added = {}
+
+        # Caçadores agrupados pelo alvo do início do passo
+        chasers = np.flatnonzero(deciding & (hunters.target >= 0))
+        by_target = chasers[np.argsort(hunters.target[chasers], kind="stable")]
+        sorted_targets = hunters.target[by_target]
+
+        heap = stolen.tolist()
+        while heap:
+            j = heapq.heappop(heap)
+            target = hunters.target[j]
+            if not lost[j] and (target < 0 or first[target] >= j):
+                continue
+            lost[j] = False
+
+            ids = np.array([j])
+            allowed = first[targets.ids] >= j
+            hunters.target[j] = targets.nearest(start[0][ids], start[1][ids], allowed)[0]
+            self.chase(ids, start)
+
+            lo, hi = np.searchsorted(pair_h, j, "left"), np.searchsorted(pair_h, j, "right")
+            alive[slot[lo:hi]] = False
+            _, new_a = self.capture_pairs(grid, ids)
+            for a in new_a.tolist():
+                added.setdefault(a, []).append(j)
+
+            for a in set(pair_a[lo:hi].tolist()) | set(new_a.tolist()):
+                a_lo, a_hi = np.searchsorted(sorted_a, a, "left"), np.searchsorted(sorted_a, a, "right")
+                rest = sorted_h[a_lo:a_hi][alive[a_lo:a_hi]]
+                catcher = min(added.get(a, []) + rest[:1].tolist() + [NOBODY])
+                if catcher != first[a]:
+                    first[a] = catcher
+                    t_lo = np.searchsorted(sorted_targets, a, "left")
+                    t_hi = np.searchsorted(sorted_targets, a, "right")
+                    for k in by_target[t_lo:t_hi].tolist():
+                        if k > j:
+                            heapq.heappush(heap, k)
+
+    def expel_hunters(self):
+        """Caçadores tocados pela Caipora começam a fugir (em ordem de índice)"""
+        hunters, rect = self.hunters, self.caipora.rect
+        touched = rects_overlap(rect.x, rect.y, rect.width, rect.height,
+                                hunters.rect_x, hunters.rect_y, HUNTER_SIZE, HUNTER_SIZE)
+        for i in np.flatnonzero(touched & ~hunters.fleeing):
+            hunters.fleeing[i] = True
+            hunters.flee_timer[i] = Hunter.FLEE_TICKS
+            vec = pygame.math.Vector2(1, 0).rotate(self.rng.uniform(0, 360))
+            hunters.dir_x[i], hunters.dir_y[i] = vec.x, vec.y
+            half = HUNTER_SIZE // 2
+            self.add_effect(int(hunters.rect_x[i]) + half, int(hunters.rect_y[i]) + half, 'expulsion')
+
+    def update_animals(self):
+        """Atualiza todos os animais em lote"""
+        animals, caipora = self.animals, self.caipora
+        caught = animals.caught.copy()
+        animals.removal_timer[caught] += 1
+
+        # Animais salvos seguem a Caipora
+        saved = np.flatnonzero(animals.saved & ~caught)
+        dx, dy = caipora.x - animals.x[saved], caipora.y - animals.y[saved]
+        distance = np.sqrt(dx * dx + dy * dy)
+        far = distance > 60
+        ids = saved[far]
+        animals.x[ids] += (dx[far] / distance[far]) * animals.speed[ids] * 0.5
+        animals.y[ids] += (dy[far] / distance[far]) * animals.speed[ids] * 0.5
+
+        # Animais livres: troca de direção a cada segundo
+        free = np.flatnonzero(~caught & ~animals.saved)
+        animals.move_timer[free] += 1
+        for i in free[animals.move_timer[free] >= Animal.WANDER_TICKS]:
+            animals.dir_x[i] = self.rng.choice(DIRECTIONS)
+            animals.dir_y[i] = self.rng.choice(DIRECTIONS)
+            animals.move_timer[i] = 0
+
+        # Com ameaça na sua célula do mapa de medo, cada animal foge descendo o gradiente
+        # (só os que decidem neste passo olham o mapa; os outros não estão com medo)
+        thinks = self.thinking(animals.slot[free], animals.x[free], animals.y[free])
+        deciding = free[(animals.fear[free] > 0) | thinks]
+        threat, gx, gy = self.sample_fear(self.fear_values(), animals.x[deciding] + ANIMAL_SIZE / 2,
+                                          animals.y[deciding] + ANIMAL_SIZE / 2)
+        scared = threat > 0
+        distance = np.sqrt(gx * gx + gy * gy)
+        fleeing = scared & (distance > 0)
+        ids = deciding[fleeing]
+        animals.dir_x[ids] = -gx[fleeing] / distance[fleeing]
+        animals.dir_y[ids] = -gy[fleeing] / distance[fleeing]
+        gain = np.minimum(Animal.MAX_FEAR_GAIN, threat[scared] + 1)
+        animals.fear[deciding[scared]] = np.minimum(100, animals.fear[deciding[scared]] + gain)
+        animals.fear[deciding[~scared]] = np.maximum(0, animals.fear[deciding[~scared]] - 1)
+
+        multiplier = np.where(animals.fear[free] > 50, 2, 1)
+        animals.x[free] += animals.dir_x[free] * animals.speed[free] * multiplier
+        animals.y[free] += animals.dir_y[free] * animals.speed[free] * multiplier
+
+        # Mantém dentro do mundo (mesmos limites de Animal.update)
+        alive = ~caught
+        animals.x[alive] = np.maximum(0, np.minimum(self.width - ANIMAL_SIZE, animals.x[alive]))
+        animals.y[alive] = np.maximum(0, np.minimum(self.height - ANIMAL_SIZE, animals.y[alive]))
+        animals.rect_x[alive] = rect_coords(animals.x[alive])
+        animals.rect_y[alive] = rect_coords(animals.y[alive])
+
+    def splat(self, x, y, radius, weight):
+        """Células e pesos que InfluenceMap.splat somaria para cada ponto (x, y)"""
+        fear_map = self.fear_map
+        kernel = np.array(fear_map.kernel(radius), dtype=np.int64)
+        cols = np.floor_divide(x, fear_map.cell).astype(np.int64)[:, None] + kernel[:, 0]
+        rows = np.floor_divide(y, fear_map.cell).astype(np.int64)[:, None] + kernel[:, 1]
+        inside = (cols >= 0) & (cols < fear_map.cols) & (rows >= 0) & (rows < fear_map.rows)
+        weights = np.broadcast_to(kernel[:, 2] * weight, cols.shape)
+        return (rows * fear_map.cols + cols)[inside], weights[inside]
+
+    def fear_values(self):
+        """Valores do mapa de medo do passo, como os de InfluenceMap.rebuild (somados de uma vez)"""
+        fear_map, hunters, caipora = self.fear_map, self.hunters, self.caipora
+        cells, weights = self.splat(hunters.x + HUNTER_SIZE / 2, hunters.y + HUNTER_SIZE / 2,
+                                    Animal.FEAR_RADIUS, fear_map.THREAT)
+        guard_cells, guard_weights = self.splat(np.array([caipora.x + caipora.width / 2]),
+                                                np.array([caipora.y + caipora.height / 2]),
+                                                caipora.protection_radius, -fear_map.PROTECTION)
+        # Os pesos são inteiros pequenos: a soma em float64 é exata
+        values = np.bincount(np.concatenate((cells, guard_cells)), np.concatenate((weights, guard_weights)),
+                             fear_map.cols * fear_map.rows)
+        return values.astype(np.int64)
+
+    def sample_fear(self, values, x, y):
+        """(valor, gradiente x, gradiente y) de cada ponto, como InfluenceMap.sample"""
+        fear_map = self.fear_map
+        cols, rows = fear_map.cols, fear_map.rows
+        col = np.clip(np.floor_divide(x, fear_map.cell).astype(np.int64), 0, cols - 1)
+        row = np.clip(np.floor_divide(y, fear_map.cell).astype(np.int64), 0, rows - 1)
+        i = row * cols + col
+        gx = values[np.where(col + 1 < cols, i + 1, i)] - values[np.where(col > 0, i - 1, i)]
+        gy = values[np.where(row + 1 < rows, i + cols, i)] - values[np.where(row > 0, i - cols, i)]
+        return values[i], gx, gy
+
+    def save_animals(self):
+        """Animais tocados pela Caipora são salvos (em ordem de índice)"""
+        animals, rect = self.animals, self.caipora.rect
+        touched = rects_overlap(rect.x, rect.y, rect.width, rect.height,
+                                animals.rect_x, animals.rect_y, ANIMAL_SIZE, ANIMAL_SIZE)
+        half = ANIMAL_SIZE // 2
+        for i in np.flatnonzero(touched & ~animals.caught & ~animals.saved):
+            animals.saved[i] = True
+            self.animals_saved += 1
+            self.score += 50
+            self.add_effect(int(animals.rect_x[i]) + half, int(animals.rect_y[i]) + half, 'save')
+
+    def remove_entities(self):
+        """Remove animais capturados há mais de 2 segundos e caçadores que fugiram ou se perderam"""
+        animals, hunters = self.animals, self.hunters
+        gone = animals.caught & (animals.removal_timer > Animal.REMOVAL_TICKS)
+        if gone.any():
+            keep = ~gone
+            remap = animals.keep(keep)
+            target = hunters.target
+            has = target >= 0
+            still = has & keep[np.maximum(target, 0)]
+            hunters.target[:] = np.where(still, remap[np.maximum(target, 0)], NO_TARGET)
+
+        outside = ((hunters.x < -100) | (hunters.x > self.width + 100) |
+                   (hunters.y < -100) | (hunters.y > self.height + 100))
+        fled = outside & hunters.fleeing
+        margin = self.budget.stray_margin
+        stray = ~hunters.fleeing & ((hunters.x < -margin) | (hunters.x > self.width + margin) |
+                                    (hunters.y < -margin) | (hunters.y > self.height + margin))
+        if fled.any() or stray.any():
+            escaped = int(fled.sum())
+            hunters.keep(~(fled | stray))
+            if escaped:
+                self.hunters_caught += escaped
+                self.score += 100 * escaped
+            if stray.any():
+                self.budget.evict('hunters', int(stray.sum()))
+
+    def snapshot(self):
+        """Estado da partida nos mesmos tipos simples de Simulation.snapshot"""
+        hunters, animals = self.hunters, self.animals
+        return (self.ticks, self.score, self.animals_saved, self.hunters_caught, self.animals_lost,
+                self.game_over, float(self.caipora.x), float(self.caipora.y),
+                list(zip(hunters.x.tolist(), hunters.y.tolist(), hunters.fleeing.tolist(),
+                         hunters.flee_timer.tolist())),
+                list(zip(animals.x.tolist(), animals.y.tolist(), animals.caught.tolist(),
+                         animals.saved.tolist(), animals.fear.tolist())),
+                list(self.effects))
+
+    def update_entities(self):
+        """Atualiza todas as entidades com operações em lote (nas mesmas fases do perfilador)"""
+        with profiler.phase("hunters"):
+            self.update_hunters()
+        with profiler.phase("collisions"):
+            self.expel_hunters()
+        with profiler.phase("animals"):
+            self.update_animals()
+        with profiler.phase("collisions"):
+            self.save_animals()
+        with profiler.phase("cleanup"):
+            self.remove_entities()
+        with profiler.phase("spawn"):
+            self.update_spawners()
+        with profiler.phase("effects"):
+            self.update_effects()
+        with profiler.phase("cleanup"):
+            self.retarget_hunters()
@@ -0,0 +1,202 @@
+"""
+Balanceamento por Monte Carlo: milhares de partidas sem janela num pool de processos
+
+Cada conjunto de parâmetros sobrescreve constantes de balanceamento das
+classes do jogo (veja PARAMETERS) e é jogado por uma Caipora automática em
+muitas partidas com sementes diferentes. As partidas são independentes, então
+são distribuídas entre processos em lotes; cada resultado é gravado numa linha
+do arquivo JSONL assim que chega, e no fim os resultados são agregados por
+conjunto: tempo de sobrevivência, animais perdidos, pontuação e caçadores
+expulsos.
+
+Uso: python src/balance.py [--episodes N] [--workers W] [--bot chase|patrol|idle]
+                           [--grid fear_radius=60,80,100 ...] [--sets conjuntos.json]
+                           [--max-seconds S] [--output resultados.jsonl]
+"""
+
+import argparse
+import contextlib
+import itertools
+import json
+import multiprocessing
+import os
+import statistics
+import sys
+import time
+
+from game import Animal, Hunter, Simulation
+
+# Nome do parâmetro -> (classe, constante) que ele sobrescreve
+PARAMETERS = {
+    'max_animals_lost': (Simulation, 'MAX_ANIMALS_LOST'),
+    'hunter_spawn_interval': (Simulation, 'HUNTER_SPAWN_INTERVAL'),
+    'animal_spawn_interval': (Simulation, 'ANIMAL_SPAWN_INTERVAL'),
+    'hunter_speed': (Hunter, 'SPEED_RANGE'),
+    'flee_ticks': (Hunter, 'FLEE_TICKS'),
+    'animal_speed': (Animal, 'SPEED_RANGE'),
+    'fear_radius': (Animal, 'FEAR_RADIUS'),
+}
+
+METRICS = ('survival_s', 'animals_lost', 'score', 'hunters_caught', 'animals_saved')
+
+
+def chase_bot(sim):
+    """Direção da Caipora rumo ao caçador mais próximo"""
+    caipora = sim.caipora
+    hunters = [h for h in sim.hunters if not h.is_fleeing]
+    if not hunters:
+        return 0, 0
+    target = min(hunters, key=lambda h: (h.x - caipora.x) ** 2 + (h.y - caipora.y) ** 2)
+    dx, dy = target.x - caipora.x, target.y - caipora.y
+    return (dx > 5) - (dx < -5), (dy > 5) - (dy < -5)
+
+
+def patrol_bot(sim):
+    """Roteiro fixo: a Caipora anda em círculo, mudando de direção a cada 40 passos"""
+    directions = ((1, 0), (1, 1), (0, 1), (-1, 1), (-1, 0), (-1, -1), (0, -1), (1, -1))
+    return directions[sim.ticks // 40 % len(directions)]
+
+
+def idle_bot(sim):
+    """Caipora parada: referência de quanto o jogo dura sem defesa"""
+    return 0, 0
+
+
+BOTS = {'chase': chase_bot, 'patrol': patrol_bot, 'idle': idle_bot}
+
+
+@contextlib.contextmanager
+def balanced(params):
+    """Aplica os parâmetros às constantes das classes e restaura os valores ao sair"""
+    previous = {}
+    try:
+        for name, value in params.items():
+            cls, constant = PARAMETERS[name]
+            previous[name] = getattr(cls, constant)
+            setattr(cls, constant, tuple(value) if isinstance(value, list) else value)
+        yield
+    finally:
+        for name, value in previous.items():
+            cls, constant = PARAMETERS[name]
+            setattr(cls, constant, value)
+
+
+def run_episode(task):
+    """Joga uma partida; task é (conjunto, parâmetros, semente, bot, passos máximos)"""
+    name, params, seed, bot, max_ticks = task
+    policy = BOTS[bot]
+    with balanced(params):
+        sim = Simulation(seed=seed)
+        while not sim.game_over and sim.ticks < max_ticks:
+            sim.step(policy(sim))
+    return {'set': name, 'seed': seed, 'ticks': sim.ticks, 'survival_s': sim.time,
+            'game_over': sim.game_over, 'animals_lost': sim.animals_lost, 'score': sim.score,
+            'hunters_caught': sim.hunters_caught, 'animals_saved': sim.animals_saved}
+
+
+def run_batch(tasks):
+    """Joga um lote de partidas no mesmo processo (menos comunicação entre processos)"""
+    return [run_episode(task) for task in tasks]
+
+
+def batches(tasks, size):
+    """Divide as tarefas em lotes de até size partidas"""
+    iterator = iter(tasks)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+
+def parameter_grid(specs):
+    """Conjuntos com todas as combinações de "nome=v1,v2,..." (intervalos como "1.5:2.5")"""
+    axes = []
+    for spec in specs:
+        name, values = spec.split("=", 1)
+        if name not in PARAMETERS:
+            raise ValueError(f"parâmetro desconhecido: {name} (conhecidos: {', '.join(PARAMETERS)})")
+        parsed = [[float(part) for part in value.split(":")] if ":" in value else json.loads(value)
+                  for value in values.split(",")]
+        axes.append([(name, value) for value in parsed])
+    sets = {}
+    for combination in itertools.product(*axes):
+        label = " ".join(f"{name}={value}" for name, value in combination)
+        sets[label or "padrão"] = dict(combination)
+    return sets
+
+
+def summarize(results):
+    """Média, mediana e p10/p90 de cada métrica, por conjunto de parâmetros"""
+    by_set = {}
+    for result in results:
+        by_set.setdefault(result['set'], []).append(result)
+    summary = {}
+    for name, episodes in by_set.items():
+        entry = {'episodes': len(episodes),
+                 'game_over_rate': sum(e['game_over'] for e in episodes) / len(episodes)}
+        for metric in METRICS:
+            values = sorted(e[metric] for e in episodes)
+            entry[metric] = {'mean': statistics.fmean(values), 'median': statistics.median(values),
+                             'p10': values[int(0.1 * (len(values) - 1))],
+                             'p90': values[int(0.9 * (len(values) - 1))]}
+        summary[name] = entry
+    return summary
+
+
+def run(sets, episodes, bot="chase", max_seconds=600, workers=None, output=None, batch_size=8, seed=0):
+    """Joga episodes partidas de cada conjunto e devolve o resumo
+
+    Os resultados chegam fora de ordem (o primeiro lote que terminar) e, com
+    output, cada um vira uma linha JSON gravada na hora.
+    """
+    max_ticks = round(max_seconds * Simulation.TICK_RATE)
+    tasks = [(name, params, seed + episode, bot, max_ticks)
+             for name, params in sets.items() for episode in range(episodes)]
+    workers = workers or os.cpu_count() or 1
+    results = []
+    stream = open(output, "w", encoding="utf-8") if output else None
+    try:
+        with multiprocessing.Pool(workers) as pool:
+            for batch in pool.imap_unordered(run_batch, batches(tasks, batch_size)):
+                results.extend(batch)
+                if stream:
+                    for result in batch:
+                        stream.write(json.dumps(result, ensure_ascii=False) + "\n")
+                    stream.flush()
+    finally:
+        if stream:
+            stream.close()
+    return summarize(results)
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Balanceamento por Monte Carlo")
+    parser.add_argument("--episodes", type=int, default=200, help="partidas por conjunto")
+    parser.add_argument("--workers", type=int, default=None, help="processos (padrão: núcleos)")
+    parser.add_argument("--bot", default="chase", choices=list(BOTS))
+    parser.add_argument("--grid", nargs="*", default=[], help='combinações, ex.: fear_radius=60,80 flee_ticks=90,120')
+    parser.add_argument("--sets", help='JSON {"nome": {"parâmetro": valor}}')
+    parser.add_argument("--max-seconds", type=float, default=600, help="duração máxima de uma partida")
+    parser.add_argument("--seed", type=int, default=0, help="semente da primeira partida de cada conjunto")
+    parser.add_argument("--output", default="balanceamento.jsonl", help="resultados, um por linha")
+    args = parser.parse_args(argv)
+
+    sets = parameter_grid(args.grid)
+    if args.sets:
+        with open(args.sets, encoding="utf-8") as source:
+            sets = json.load(source)
+
+    start = time.perf_counter()
+    summary = run(sets, args.episodes, args.bot, args.max_seconds, args.workers, args.output, seed=args.seed)
+    elapsed = time.perf_counter() - start
+    total = sum(entry['episodes'] for entry in summary.values())
+    print(f"{total} partidas em {elapsed:.1f} s ({total / elapsed:.1f} partidas/s)\n")
+    print(f"{'conjunto':<40} {'sobrevivência (s)':>18} {'perdidos':>9} {'pontos':>8} {'expulsos':>9} {'game over':>10}")
+    for name, entry in summary.items():
+        print(f"{name:<40} {entry['survival_s']['median']:>18.1f} {entry['animals_lost']['mean']:>9.2f} "
+              f"{entry['score']['mean']:>8.0f} {entry['hunters_caught']['mean']:>9.2f} {entry['game_over_rate']:>9.0%}")
+    with open(os.path.splitext(args.output)[0] + "_resumo.json", "w", encoding="utf-8") as output:
+        json.dump(summary, output, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
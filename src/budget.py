@@ -0,0 +1,41 @@
+"""
+Orçamento de entidades: limites por tipo e despejo das que se perderam fora do mundo
+"""
+
+import math
+
+
+class EntityBudget:
+    """Limites de quantidade por tipo de entidade e regra de despejo
+
+    Uma entidade é "perdida" quando está a mais de stray_margin pixels fora do
+    mundo; caçadores sem alvo seguem na última direção e nunca voltariam.
+    """
+
+    DEFAULT_CAPS = {'hunters': 60, 'animals': 40}
+
+    def __init__(self, caps=None, stray_margin=400):
+        self.caps = dict(self.DEFAULT_CAPS, **(caps or {}))
+        self.stray_margin = stray_margin
+        self.denied = dict.fromkeys(self.caps, 0)  # Spawns recusados por tipo
+        self.evicted = dict.fromkeys(self.caps, 0)  # Entidades despejadas por tipo
+
+    def allows(self, kind, count):
+        """Indica se cabe mais uma entidade do tipo, com count já existentes"""
+        if count < self.caps.get(kind, math.inf):
+            return True
+        self.denied[kind] = self.denied.get(kind, 0) + 1
+        return False
+
+    def is_stray(self, x, y, width, height):
+        """Indica se o ponto (x, y) está longe demais do mundo width x height"""
+        margin = self.stray_margin
+        return x < -margin or x > width + margin or y < -margin or y > height + margin
+
+    def evict(self, kind, count=1):
+        """Registra entidades despejadas"""
+        self.evicted[kind] = self.evicted.get(kind, 0) + count
+
+    def report(self):
+        """Limites, spawns recusados e despejos, por tipo"""
+        return {'caps': dict(self.caps), 'denied': dict(self.denied), 'evicted': dict(self.evicted)}
@@ -0,0 +1,38 @@
+"""
+Câmera: a parte do mundo que aparece na tela
+"""
+
+import pygame
+
+
+class Camera:
+    """Janela do tamanho da tela sobre um mundo maior, presa às bordas do mundo
+
+    (x, y) é o canto superior esquerdo da visão em coordenadas do mundo, sempre
+    inteiro, para que os sprites caiam em pixels exatos ao subtrair o deslocamento.
+    """
+
+    def __init__(self, view_size, world_size):
+        self.width, self.height = view_size
+        self.world_width, self.world_height = world_size
+        self.x = self.y = 0
+
+    @property
+    def offset(self):
+        """Deslocamento a subtrair das coordenadas do mundo para chegar às da tela"""
+        return self.x, self.y
+
+    @property
+    def rect(self):
+        """Área visível, em coordenadas do mundo"""
+        return pygame.Rect(self.x, self.y, self.width, self.height)
+
+    def follow(self, x, y):
+        """Centraliza a visão no ponto (x, y) do mundo, sem passar das bordas"""
+        self.x = max(0, min(self.world_width - self.width, round(x) - self.width // 2))
+        self.y = max(0, min(self.world_height - self.height, round(y) - self.height // 2))
+
+    def sees(self, x, y, width, height, margin=0):
+        """Indica se o retângulo (x, y, width, height) do mundo, alargado por margin, aparece na tela"""
+        return (x + width + margin > self.x and x - margin < self.x + self.width and
+                y + height + margin > self.y and y - margin < self.y + self.height)
@@ -0,0 +1,132 @@
+"""
+Efeitos visuais (ondas de expulsão e estrelas de salvamento) em um pool de capacidade fixa
+"""
+
+import pygame
+
+from sprites import atlas
+
+EXPULSION, SAVE = 0, 1
+KIND_NAMES = {'expulsion': EXPULSION, 'save': SAVE}
+DURATION = (30, 60)  # Passos de vida por tipo
+START_RADIUS = (10, 5)
+GROWTH = (2, 1)  # Crescimento do raio por passo
+
+RING_OFFSETS = (0, 10, 20)  # Ondas concêntricas da expulsão
+RING_FADE = 50  # Cada onda externa some quando a intensidade cai abaixo de i * RING_FADE
+# Maior distância entre o centro de um efeito e a borda do que ele desenha (estrela no fim da vida)
+MAX_EXTENT = max(START_RADIUS[EXPULSION] + GROWTH[EXPULSION] * DURATION[EXPULSION] + RING_OFFSETS[-1],
+                 2 * (START_RADIUS[SAVE] + GROWTH[SAVE] * DURATION[SAVE])) + 2
+
+# Estrela de 10 pontas alternando raio externo (2r) e interno (r), com o vetor unitário de cada ponta
+UNIT_STAR = []
+for _i in range(5):
+    _outer = pygame.math.Vector2(1, 0).rotate(_i * 144 - 90)
+    _inner = pygame.math.Vector2(1, 0).rotate(_i * 144 + 72 - 90)
+    UNIT_STAR += [(2, _outer.x, _outer.y), (1, _inner.x, _inner.y)]
+
+
+class EffectPool:
+    """Efeitos em listas paralelas pré-alocadas, sem objetos por efeito
+
+    Os efeitos vivos ocupam as posições [0, count). Cada um guarda só o passo
+    em que expira: o tempo restante e o raio saem daí, e a remoção é agendada
+    na roda de tempo (timers), então nada é atualizado a cada passo. Quem
+    expira é trocado pelo último vivo (swap-remove), então a ordem entre
+    efeitos não é mantida. Com o pool cheio, novos efeitos são descartados e
+    contados em dropped.
+    """
+
+    def __init__(self, timers, capacity=4096):
+        self.timers = timers
+        self.capacity = capacity
+        self.kind = [0] * capacity
+        self.x = [0] * capacity
+        self.y = [0] * capacity
+        self.expires = [0] * capacity
+        self.ids = [0] * capacity
+        self.slot_of = {}  # Id do efeito -> posição nas listas
+        self.next_id = 0
+        self.count = 0
+        self.dropped = 0
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        """(tipo, x, y, timer, raio) de cada efeito vivo; timer são os passos restantes"""
+        now = self.timers.now
+        for i in range(self.count):
+            kind, timer = self.kind[i], self.expires[i] - now
+            yield kind, self.x[i], self.y[i], timer, START_RADIUS[kind] + GROWTH[kind] * (DURATION[kind] - timer)
+
+    def add(self, x, y, effect_type):
+        """Adiciona um efeito ('expulsion' ou 'save') centrado em (x, y)"""
+        if self.count == self.capacity:
+            self.dropped += 1
+            return
+        kind = KIND_NAMES[effect_type]
+        i = self.count
+        self.kind[i], self.x[i], self.y[i] = kind, x, y
+        self.ids[i] = self.next_id
+        self.slot_of[self.next_id] = i
+        self.expires[i] = self.timers.schedule(DURATION[kind], "effects", self.expire, self.next_id).due
+        self.next_id += 1
+        self.count += 1
+
+    def expire(self, effect_id):
+        """Remove o efeito effect_id (agendado por add)"""
+        i = self.slot_of.pop(effect_id, None)
+        if i is None:
+            return  # Já saiu com clear
+        last = self.count - 1
+        if i != last:
+            self.kind[i], self.x[i], self.y[i] = self.kind[last], self.x[last], self.y[last]
+            self.expires[i], self.ids[i] = self.expires[last], self.ids[last]
+            self.slot_of[self.ids[i]] = i
+        self.count = last
+
+    def clear(self):
+        """Remove todos os efeitos"""
+        self.slot_of.clear()
+        self.count = 0
+
+    def draw(self, screen, view=None):
+        """Desenha os efeitos a partir de sprites por raio e devolve as áreas desenhadas
+
+        view é a área visível do mundo (a da câmera): efeitos fora dela são
+        pulados e os demais são deslocados para as coordenadas da tela.
+        """
+        rects = []
+        if view is None:
+            view = screen.get_rect()
+        left, top = view.left - MAX_EXTENT, view.top - MAX_EXTENT
+        right, bottom = view.right + MAX_EXTENT, view.bottom + MAX_EXTENT
+        for kind, x, y, timer, radius in self:
+            if not (left < x < right and top < y < bottom):
+                continue
+            x, y = int(x) - view.x, int(y) - view.y
+            if kind == EXPULSION:
+                intensity = int(255 * (timer / 30))
+                rings = sum(1 for i in range(len(RING_OFFSETS)) if intensity - i * RING_FADE > 0)
+                if rings:
+                    margin = radius + RING_OFFSETS[rings - 1] + 2
+                    rects.append(atlas.blit(screen, pygame.Rect(x, y, 0, 0), ('rings', radius, rings),
+                                            margin, paint_rings, radius, rings))
+            elif timer > 0:
+                rects.append(atlas.blit(screen, pygame.Rect(x, y, 0, 0), ('star', radius),
+                                        2 * radius + 2, paint_star, radius))
+        return rects
+
+
+def paint_rings(screen, rect, radius, rings):
+    """Ondas de choque concêntricas"""
+    for offset in RING_OFFSETS[:rings]:
+        pygame.draw.circle(screen, (255, 100, 100), rect.topleft, radius + offset, 3)
+
+
+def paint_star(screen, rect, radius):
+    """Estrela dourada de raio externo 2 * radius"""
+    x, y = rect.topleft
+    points = [(x + radius * factor * ux, y + radius * factor * uy) for factor, ux, uy in UNIT_STAR]
+    pygame.draw.polygon(screen, (255, 215, 0), points)
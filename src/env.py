@@ -0,0 +1,206 @@
+"""
+Ambientes no estilo gym (reset/step) para treinar e avaliar controladores da Caipora
+
+CaiporaEnv joga uma partida; VectorEnv avança N partidas independentes numa
+única chamada e devolve as observações empacotadas em arrays NumPy contíguos,
+pré-alocados e reaproveitados a cada passo. Não há janela nem desenho: cada
+ambiente é uma Simulation (ou uma ArraySimulation, com simulation=), e as
+regras são exatamente as do jogo.
+
+As partidas de uma VectorEnv são avançadas uma a uma, num laço em Python: o
+que ela economiza em relação a N CaiporaEnv é só o empacotamento das
+observações. Com as quantidades de entidades do jogo, a ArraySimulation
+é mais lenta que a Simulation (python benchmarks/bench_env.py mede as duas).
+
+A ação é um inteiro de 0 a 8 (a direção da Caipora, codificada como em
+replay.encode_input). A recompensa de um passo é a variação da pontuação
+menos LOST_PENALTY por animal perdido. A partida termina (terminated) no game
+over e é truncada (truncated) ao atingir max_seconds simulados.
+"""
+
+import random
+
+try:
+    import numpy as np
+except ImportError:  # NumPy é opcional: só os ambientes dependem dele
+    np = None
+
+from budget import EntityBudget
+from game import Simulation
+from replay import decode_input
+
+ACTIONS = [decode_input(code) for code in range(9)]
+LOST_PENALTY = 100
+
+# Colunas das observações de cada entidade; a última indica se a linha é uma entidade (1) ou enchimento (0)
+HUNTER_FIELDS = ("x", "y", "fleeing", "present")
+ANIMAL_FIELDS = ("x", "y", "caught", "saved", "fear", "present")
+
+
+def observation_arrays(num_envs, max_hunters, max_animals):
+    """Arrays de observação zerados para num_envs ambientes"""
+    return {
+        'caipora': np.zeros((num_envs, 2), np.float32),
+        'hunters': np.zeros((num_envs, max_hunters, len(HUNTER_FIELDS)), np.float32),
+        'animals': np.zeros((num_envs, max_animals, len(ANIMAL_FIELDS)), np.float32),
+    }
+
+
+def pack_observations(sims, out):
+    """Copia o estado das simulações para os arrays de out
+
+    Os valores de todas as entidades vivas vão para uma lista só, convertida
+    de uma vez e espalhada nos arrays (zerados antes) por índice; o
+    enchimento das linhas vazias sai de graça. Entidades além da capacidade
+    dos arrays ficam de fora.
+    """
+    if sims and not isinstance(sims[0].hunters, list):
+        return pack_arrays(sims, out)
+    max_hunters, max_animals = out['hunters'].shape[1], out['animals'].shape[1]
+    caipora, hunters, animals, hunter_counts, animal_counts = [], [], [], [], []
+    for sim in sims:
+        caipora.append((sim.caipora.x, sim.caipora.y))
+        rows = sim.hunters[:max_hunters]
+        hunter_counts.append(len(rows))
+        hunters += [(h.x, h.y, h.is_fleeing, 1.0) for h in rows]
+        rows = sim.animals[:max_animals]
+        animal_counts.append(len(rows))
+        animals += [(a.x, a.y, a.is_caught, a.is_saved, a.fear_level, 1.0) for a in rows]
+    out['caipora'][...] = caipora
+    scatter(out['hunters'], hunters, hunter_counts)
+    scatter(out['animals'], animals, animal_counts)
+    return out
+
+
+def pack_arrays(sims, out):
+    """pack_observations para simulações com as entidades em arrays (ArraySimulation)
+
+    As colunas já existem como arrays: cada simulação vira um bloco de
+    linhas, sem passar por objetos Python entidade a entidade.
+    """
+    out['caipora'][...] = [(sim.caipora.x, sim.caipora.y) for sim in sims]
+    for name, fields in (('hunters', HUNTER_FIELDS), ('animals', ANIMAL_FIELDS)):
+        limit = out[name].shape[1]
+        blocks = [array_rows(getattr(sim, name), fields, limit) for sim in sims]
+        scatter(out[name], np.concatenate(blocks), [len(block) for block in blocks])
+    return out
+
+
+def array_rows(entities, fields, limit):
+    """Até limit linhas (entidades x fields) de uma estrutura de arrays, com a coluna present em 1"""
+    count = min(len(entities), limit)
+    rows = np.ones((count, len(fields)), np.float32)
+    for column, field in enumerate(fields[:-1]):  # Os campos dos arrays têm os nomes das colunas
+        rows[:, column] = getattr(entities, field)[:count]
+    return rows
+
+
+def scatter(array, rows, counts):
+    """Zera array (N, capacidade, campos) e põe as linhas de cada ambiente no começo do seu bloco"""
+    array.fill(0)
+    if not len(rows):
+        return
+    counts = np.asarray(counts)
+    envs = np.repeat(np.arange(len(counts)), counts)
+    slots = np.arange(len(rows)) - np.repeat(np.cumsum(counts) - counts, counts)
+    array[envs, slots] = rows
+
+
+class VectorEnv:
+    """N partidas independentes avançadas numa chamada, com reinício automático
+
+    Quando uma partida termina, step() devolve a recompensa e as flags do
+    último passo e já a reinicia com a próxima semente; a observação
+    devolvida é a da partida nova. info traz, por ambiente, a pontuação e a
+    duração (em passos) da partida que acabou de terminar (-1 se nenhuma).
+    """
+
+    def __init__(self, num_envs, seed=0, max_seconds=600, max_hunters=None, max_animals=None,
+                 simulation=Simulation):
+        if np is None:
+            raise ImportError("os ambientes requerem NumPy: pip install numpy")
+        self.num_envs = num_envs
+        self.simulation = simulation
+        self.max_ticks = round(max_seconds * simulation.TICK_RATE)
+        self.max_hunters = max_hunters or EntityBudget.DEFAULT_CAPS['hunters']
+        self.max_animals = max_animals or EntityBudget.DEFAULT_CAPS['animals']
+        self.next_seed = seed
+        self.sims = []
+        self.observations = observation_arrays(num_envs, self.max_hunters, self.max_animals)
+        self.rewards = np.zeros(num_envs, np.float32)
+        self.terminated = np.zeros(num_envs, np.bool_)
+        self.truncated = np.zeros(num_envs, np.bool_)
+        self.final_score = np.full(num_envs, -1, np.int64)
+        self.final_ticks = np.full(num_envs, -1, np.int64)
+
+    def new_simulation(self):
+        """Partida nova com a próxima semente"""
+        sim = self.simulation(seed=self.next_seed)
+        self.next_seed += 1
+        return sim
+
+    def reset(self, seed=None):
+        """Reinicia todas as partidas; devolve (observações, info)"""
+        if seed is not None:
+            self.next_seed = seed
+        self.sims = [self.new_simulation() for _ in range(self.num_envs)]
+        return pack_observations(self.sims, self.observations), {'seeds': [sim.seed for sim in self.sims]}
+
+    def step(self, actions):
+        """Aplica uma ação por partida; devolve (observações, recompensas, terminated, truncated, info)"""
+        rewards, terminated, truncated = self.rewards, self.terminated, self.truncated
+        final_score, final_ticks = self.final_score, self.final_ticks
+        final_score.fill(-1)
+        final_ticks.fill(-1)
+        max_ticks = self.max_ticks
+        if hasattr(actions, "tolist"):
+            actions = actions.tolist()  # Inteiros Python indexam ACTIONS mais rápido que escalares NumPy
+        for i, (sim, action) in enumerate(zip(self.sims, actions)):
+            score, lost = sim.score, sim.animals_lost
+            sim.step(ACTIONS[action])
+            rewards[i] = (sim.score - score) - LOST_PENALTY * (sim.animals_lost - lost)
+            terminated[i] = sim.game_over
+            truncated[i] = not sim.game_over and sim.ticks >= max_ticks
+            if terminated[i] or truncated[i]:
+                final_score[i], final_ticks[i] = sim.score, sim.ticks
+                self.sims[i] = self.new_simulation()
+        info = {'final_score': final_score, 'final_ticks': final_ticks}
+        return pack_observations(self.sims, self.observations), rewards, terminated, truncated, info
+
+
+class CaiporaEnv:
+    """Uma partida com a interface reset/step; as observações são arrays sem a dimensão de lote
+
+    Depois que a partida termina, step() não muda mais nada: chame reset().
+    """
+
+    def __init__(self, seed=None, max_seconds=600, max_hunters=None, max_animals=None,
+                 simulation=Simulation):
+        if np is None:
+            raise ImportError("os ambientes requerem NumPy: pip install numpy")
+        self.simulation = simulation
+        self.max_ticks = round(max_seconds * simulation.TICK_RATE)
+        self.next_seed = random.randrange(2 ** 32) if seed is None else seed
+        self.buffers = observation_arrays(1, max_hunters or EntityBudget.DEFAULT_CAPS['hunters'],
+                                          max_animals or EntityBudget.DEFAULT_CAPS['animals'])
+        self.observation = {name: array[0] for name, array in self.buffers.items()}
+        self.sim = None
+
+    def reset(self, seed=None):
+        """Começa uma partida nova (com seed, ou com a próxima da sequência); devolve (observação, info)"""
+        if seed is not None:
+            self.next_seed = seed
+        self.sim = self.simulation(seed=self.next_seed)
+        self.next_seed += 1
+        pack_observations((self.sim,), self.buffers)
+        return self.observation, {'seed': self.sim.seed}
+
+    def step(self, action):
+        """Aplica a ação; devolve (observação, recompensa, terminated, truncated, info)"""
+        sim = self.sim
+        score, lost = sim.score, sim.animals_lost
+        sim.step(ACTIONS[action])
+        reward = float((sim.score - score) - LOST_PENALTY * (sim.animals_lost - lost))
+        pack_observations((sim,), self.buffers)
+        truncated = not sim.game_over and sim.ticks >= self.max_ticks
+        return self.observation, reward, sim.game_over, truncated, {'score': sim.score, 'ticks': sim.ticks}
@@ -1,34 +1,456 @@
 import pygame
 import sys
+import itertools
+import json
+import math
 import random
+import time
 
-class Game:
-    """Classe principal que controla o jogo da Caipora"""
+from budget import EntityBudget
+from camera import Camera
+from effects import EffectPool
+from influence import InfluenceMap
+from layers import Compositor, Panel
+from levels import Level, Preloader, level_names, load_level
+from memory import MemoryMonitor
+from pool import EntityPool, remove_where
+from profiler import profiler
+from replay import InputRecorder
+from scheduler import AIScheduler
+from spatial import NearestIndex, SpatialHash
+from sprites import atlas
+from startup import startup
+from text import fonts, render_text, text_cache
+from timers import TimerWheel
+from timestep import FixedTimestep, interpolated_rect
+
+def stat_property(name):
+    """Atributo da Simulation guardado no placar observável"""
+    return property(lambda self: getattr(self.stats, name),
+                    lambda self, value: setattr(self.stats, name, value))
+
+
+class Stats:
+    """Placar da partida; cada mudança incrementa version e avisa os observadores"""
+    
+    FIELDS = ("score", "animals_saved", "hunters_caught", "animals_lost")
     
     def __init__(self):
-        pygame.init()
+        self.version = 0
+        self.observers = []  # Funções chamadas com (campo, valor) a cada mudança
+        for field in self.FIELDS:
+            object.__setattr__(self, field, 0)
+    
+    def __setattr__(self, name, value):
+        changed = name in self.FIELDS and getattr(self, name) != value
+        object.__setattr__(self, name, value)
+        if changed:
+            self.version += 1
+            for observer in self.observers:
+                observer(name, value)
+
+
+class Simulation:
+    """Estado e regras do jogo, sem janela, fonte ou relógio"""
+    
+    # Cada passo equivale a 1/60 s simulado; velocidades são em pixels por passo
+    TICK_RATE = 60
+    HUNTER_SPAWN_INTERVAL = 5.0  # Segundos simulados entre caçadores
+    ANIMAL_SPAWN_INTERVAL = 10.0  # Segundos simulados entre animais
+    MAX_ANIMALS_LOST = 5  # Game over ao perder esse número de animais
+    
+    score = stat_property("score")
+    animals_saved = stat_property("animals_saved")
+    hunters_caught = stat_property("hunters_caught")
+    animals_lost = stat_property("animals_lost")
+    
+    def __init__(self, width=1024, height=768, seed=None, rng=None, obstacles=None, level=None, stats=None):
+        self.width = width
+        self.height = height
+        self.ticks = 0  # Passos simulados desde o início
+        
+        # Fase (um Level): quantidades iniciais, cadências de spawn e velocidades;
+        # sem fase, valem as constantes das classes (as que o balance.py ajusta)
+        self.level = level or self.default_level()
+        
+        # Obstáculos (um ObstacleMap): ninguém os atravessa e os caçadores contornam
+        # pelos campos de fluxo compartilhados; sem obstáculos, tudo anda em linha reta
+        self.obstacles = obstacles or None
+        self.paths = obstacles.flow_fields() if self.obstacles else None
+        
+        # Todos os sorteios da partida saem de rng; com a mesma semente e as mesmas
+        # entradas, a partida se repete (sem semente, uma é sorteada e fica em self.seed)
+        if rng is None:
+            if seed is None:
+                seed = random.randrange(2 ** 32)
+            rng = random.Random(seed)
+        self.seed = seed
+        self.rng = rng
+        
+        # Pontuação e estatísticas (stats continua o placar da fase anterior);
+        # a fase é vencida ao expulsar goal caçadores nela
+        self.stats = stats or Stats()
+        self.max_animals_lost = self.MAX_ANIMALS_LOST
+        self.game_over = False
+        self.goal = self.hunters_caught + self.level.goal if self.level.goal else None
+        
+        # Entidades do jogo (as removidas voltam aos pools e são reaproveitadas)
+        self.budget = EntityBudget()
+        self.hunter_pool = EntityPool(Hunter)
+        self.animal_pool = EntityPool(Animal)
+        self.caipora = Caipora(self.width // 2, self.height // 2)
+        self.hunters = []
+        self.animals = []
+        
+        # Tudo o que acontece daqui a n passos (fim da fuga, troca de rumo, remoção,
+        # spawns, fim dos efeitos) fica agendado aqui, em vez de em contadores por entidade
+        self.timers = TimerWheel()
+        self.expired_animals = set()  # Capturados cuja remoção venceu neste passo
+        
+        # Spawns agendados (intervalos em passos, convertidos de segundos)
+        self.hunter_spawn_ticks = self.seconds_to_ticks(self.level.hunter_spawn_interval)
+        self.animal_spawn_ticks = self.seconds_to_ticks(self.level.animal_spawn_interval)
+        self.timers.schedule(self.hunter_spawn_ticks, "spawn", self.hunter_spawner)
+        self.timers.schedule(self.animal_spawn_ticks, "spawn", self.animal_spawner)
+        
+        # Efeitos visuais
+        self.effects = EffectPool(self.timers)  # Efeitos visuais temporários
+        
+        # Grades espaciais reconstruídas a cada passo
+        self.hunter_grid = SpatialHash()
+        self.animal_grid = SpatialHash()
+        
+        # Ameaça dos caçadores e proteção da Caipora, lidas pelos animais (refeito a cada passo)
+        self.fear_map = InfluenceMap(self.width, self.height)
+        
+        # Animais que ainda podem ser alvo de caçadores (nem capturados nem salvos)
+        self.targets = NearestIndex()
+        self.animal_serial = 0  # Ordem de criação, usada como desempate
+        
+        # Decisões de quem está longe da Caipora espalhadas em baldes, uma fração por passo
+        self.ai = AIScheduler()
+        
+        # Gerar entidades iniciais
+        self.spawn_initial_entities()
+        self.retarget_hunters()
+    
+    @classmethod
+    def default_level(cls):
+        """Fase com as constantes das classes, igual à primeira fase do jogo sem os obstáculos"""
+        return Level(hunters=2, animals=8, max_animals=10, hunter_spawn_interval=cls.HUNTER_SPAWN_INTERVAL,
+                     animal_spawn_interval=cls.ANIMAL_SPAWN_INTERVAL, hunter_speed=Hunter.SPEED_RANGE,
+                     animal_speed=Animal.SPEED_RANGE)
+    
+    @property
+    def level_complete(self):
+        """Indica se a meta de caçadores expulsos da fase foi atingida (fases sem meta não acabam)"""
+        return self.goal is not None and self.hunters_caught >= self.goal
+    
+    @property
+    def time(self):
+        """Tempo simulado decorrido, em segundos"""
+        return self.ticks / self.TICK_RATE
+    
+    def seconds_to_ticks(self, seconds):
+        """Converte segundos simulados em número de passos"""
+        return round(seconds * self.TICK_RATE)
+    
+    def add_effect(self, x, y, effect_type):
+        """Adiciona efeito visual"""
+        self.effects.add(x, y, effect_type)
+    
+    def update_effects(self):
+        """Remove os efeitos visuais que expiram neste passo"""
+        self.timers.fire("effects")
+    
+    def spawn_initial_entities(self):
+        """Cria caçadores e animais iniciais da fase"""
+        rng, level = self.rng, self.level
+        for i in range(level.animals):
+            x, y = rng.randint(50, self.width - 50), rng.randint(50, self.height - 50)
+            while (abs(x - self.caipora.x) < 100 and abs(y - self.caipora.y) < 100) or self.blocked(x, y, Animal):
+                x, y = rng.randint(50, self.width - 50), rng.randint(50, self.height - 50)
+            self.add_animal(self.animal_pool.acquire(x, y, rng.choice(level.animal_types), rng, level.animal_speed))
+        
+        for _ in range(level.hunters):
+            self.spawn_hunter()
+    
+    def blocked(self, x, y, kind):
+        """Indica se uma entidade da classe kind em (x, y) ficaria sobre um obstáculo"""
+        return self.obstacles is not None and self.obstacles.blocks(x, y, kind.width, kind.height)
+    
+    def slide(self, entity):
+        """Desfaz o movimento do passo que pôs a entidade sobre um obstáculo
+
+        Tenta manter o deslocamento em um eixo só, para que ela escorregue ao
+        longo do obstáculo em vez de parar.
+        """
+        if not self.blocked(entity.x, entity.y, entity) or self.blocked(entity.prev_x, entity.prev_y, entity):
+            return  # Livre, ou já estava preso num obstáculo e precisa poder sair
+        if not self.blocked(entity.x, entity.prev_y, entity):
+            entity.y = entity.prev_y
+        elif not self.blocked(entity.prev_x, entity.y, entity):
+            entity.x = entity.prev_x
+        else:
+            entity.x, entity.y = entity.prev_x, entity.prev_y
+        entity.rect.x, entity.rect.y = entity.x, entity.y
+    
+    def add_animal(self, animal):
+        """Adiciona um animal à floresta e ao índice de alvos
+
+        As trocas de rumo ao acaso ficam defasadas pelo balde de cada animal,
+        em vez de caírem todas no mesmo passo.
+        """
+        self.ai.assign(animal)
+        delay = Animal.WANDER_TICKS - animal.ai_slot * Animal.WANDER_TICKS // self.ai.period
+        animal.wander_event = self.timers.schedule(delay, "animals", self.wander, animal)
+        self.animals.append(animal)
+        self.targets.add(animal, animal.x, animal.y, self.animal_serial)
+        self.animal_serial += 1
+    
+    def wander(self, animal):
+        """Sorteia um novo rumo para o animal e agenda a próxima troca"""
+        if animal.is_caught or animal.is_saved:
+            return  # Capturados e salvos não voltam a vagar
+        animal.wander()
+        animal.wander_event = self.timers.schedule(Animal.WANDER_TICKS, "animals", self.wander, animal)
+    
+    def retarget_hunters(self):
+        """Escolhe, em lote, o animal mais próximo para os caçadores sem alvo válido
+
+        Só entram os que decidem no próximo passo (pelo balde dele), que já
+        saem andando atrás do alvo novo; os outros esperam a vez.
+        """
+        upcoming, (left, top, right, bottom) = self.ai.bucket(self.ticks + 1), self.ai.window(self.caipora)
+        hunters = [h for h in self.hunters if not h.is_fleeing and
+                   (h.ai_slot == upcoming or (left < h.x < right and top < h.y < bottom)) and
+                   not h.has_valid_target()]
+        targets = self.targets.nearest_many([(h.x, h.y) for h in hunters])
+        for hunter, target in zip(hunters, targets):
+            hunter.target_animal = target
+    
+    def spawn_hunter(self):
+        """Spawna um novo caçador na borda da tela, se o orçamento permitir"""
+        if not self.budget.allows('hunters', len(self.hunters)):
+            return
+        rng = self.rng
+        positions = [(rng.randint(0, self.width), -50), (self.width + 50, rng.randint(0, self.height)), 
+                    (rng.randint(0, self.width), self.height + 50), (-50, rng.randint(0, self.height))]
+        x, y = rng.choice(positions)
+        self.add_hunter(self.hunter_pool.acquire(x, y, rng, self.level.hunter_speed))
+    
+    def add_hunter(self, hunter):
+        """Põe um caçador na partida, num balde do escalonador da IA"""
+        self.ai.assign(hunter)
+        self.hunters.append(hunter)
+    
+    def move_caipora(self, dx, dy):
+        """Move a Caipora mantendo-a dentro da tela"""
+        self.caipora.move(dx, dy)
+        self.caipora.x = max(0, min(self.width - self.caipora.width, self.caipora.x))
+        self.caipora.y = max(0, min(self.height - self.caipora.height, self.caipora.y))
+        if self.obstacles is not None:
+            self.slide(self.caipora)
+        self.caipora.update_rect()
+    
+    def save_previous_positions(self):
+        """Guarda as posições do passo anterior para a interpolação do desenho"""
+        for entity in [self.caipora] + self.hunters + self.animals:
+            entity.prev_x, entity.prev_y = entity.x, entity.y
+    
+    def step(self, inputs=(0, 0)):
+        """Avança a simulação um passo; inputs é a direção (dx, dy) da Caipora"""
+        if self.game_over:
+            return
+        
+        self.ticks += 1
+        self.timers.advance()
+        self.save_previous_positions()
+        self.move_caipora(*inputs)
+        self.update_entities()
+    
+    def has_left(self, hunter):
+        """Indica se o caçador fugiu da tela ou se perdeu longe dela sem alvo"""
+        if hunter.is_fleeing:
+            return (hunter.x < -100 or hunter.x > self.width + 100 or
+                    hunter.y < -100 or hunter.y > self.height + 100)
+        return self.budget.is_stray(hunter.x, hunter.y, self.width, self.height)
+    
+    def entity_counts(self):
+        """Quantidade de entidades vivas e guardadas nos pools, por tipo"""
+        return {'hunters': len(self.hunters), 'animals': len(self.animals), 'effects': len(self.effects),
+                'hunter_pool': len(self.hunter_pool), 'animal_pool': len(self.animal_pool)}
+    
+    def snapshot(self):
+        """Estado da partida em tipos simples (posições em float), igual entre backends com a mesma semente e entradas"""
+        return (self.ticks, self.score, self.animals_saved, self.hunters_caught, self.animals_lost,
+                self.game_over, float(self.caipora.x), float(self.caipora.y),
+                [(float(h.x), float(h.y), h.is_fleeing, h.flee_timer) for h in self.hunters],
+                [(float(a.x), float(a.y), a.is_caught, a.is_saved, a.fear_level) for a in self.animals],
+                list(self.effects))
+    
+    def update_spawners(self):
+        """Dispara os spawns agendados para este passo"""
+        self.timers.fire("spawn")
+    
+    def hunter_spawner(self):
+        """Spawna um caçador e agenda o próximo"""
+        self.spawn_hunter()
+        self.timers.schedule(self.hunter_spawn_ticks, "spawn", self.hunter_spawner)
+    
+    def animal_spawner(self):
+        """Spawna um animal e agenda o próximo; com a floresta cheia, tenta de novo no passo seguinte"""
+        if len(self.animals) < self.level.max_animals and self.budget.allows('animals', len(self.animals)):
+            self.spawn_animal()
+            self.timers.schedule(self.animal_spawn_ticks, "spawn", self.animal_spawner)
+        else:
+            self.timers.schedule(1, "spawn", self.animal_spawner)
+    
+    def spawn_animal(self):
+        """Spawna um animal num lugar livre da floresta"""
+        x = self.rng.randint(50, self.width - 50)
+        y = self.rng.randint(50, self.height - 50)
+        while self.blocked(x, y, Animal):
+            x, y = self.rng.randint(50, self.width - 50), self.rng.randint(50, self.height - 50)
+        animal_type = self.rng.choice(self.level.animal_types)
+        self.add_animal(self.animal_pool.acquire(x, y, animal_type, self.rng, self.level.animal_speed))
+    
+    def update_entities(self):
+        """Atualiza todas as entidades (cada etapa é uma fase do perfilador)"""
+        # Atualiza caçadores
+        with profiler.phase("hunters"):
+            self.animal_grid.build(self.animals)
+            obstacles = self.obstacles
+            caipora = self.caipora
+            self.ai.begin(self.ticks)
+            active, (left, top, right, bottom) = self.ai.active, self.ai.window(caipora)
+            for hunter in self.hunters:
+                think = hunter.ai_slot == active or (left < hunter.x < right and top < hunter.y < bottom)
+                hunter.update(self.animals, self.targets, self.paths, think)
+                if obstacles is not None:
+                    self.slide(hunter)
+                
+                # Verifica se caçador capturou animal
+                for i in self.animal_grid.query_rect(hunter.rect):
+                    animal = self.animals[i]
+                    if hunter.rect.colliderect(animal.rect) and not animal.is_caught:
+                        animal.is_caught = True
+                        animal.caught_by_hunter = True
+                        animal.removal_event = self.timers.schedule(Animal.REMOVAL_TICKS, "cleanup",
+                                                                    self.expired_animals.add, animal)
+                        self.targets.discard(animal)
+                        self.animals_lost += 1
+                        if self.animals_lost >= self.max_animals_lost:
+                            self.game_over = True
+            
+            # Fugas que terminam neste passo (depois do último movimento de fuga)
+            self.timers.fire("hunters")
+        
+        # Verifica colisão da Caipora com caçadores
+        with profiler.phase("collisions"):
+            self.hunter_grid.build(self.hunters)
+            for i in self.hunter_grid.query_rect(self.caipora.rect):
+                hunter = self.hunters[i]
+                if self.caipora.rect.colliderect(hunter.rect) and not hunter.is_fleeing:
+                    hunter.start_fleeing(self.timers)
+                    self.add_effect(hunter.rect.centerx, hunter.rect.centery, 'expulsion')
+        
+        # Atualiza animais (cada um só lê a sua célula do mapa de medo)
+        with profiler.phase("animals"):
+            self.fear_map.rebuild(self.hunters, self.caipora, Animal.FEAR_RADIUS)
+            self.timers.fire("animals")  # Trocas de rumo ao acaso, na ordem da lista
+            for animal in self.animals:
+                think = (animal.fear_level > 0 or animal.ai_slot == active or
+                         (left < animal.x < right and top < animal.y < bottom))
+                animal.update(caipora, self.fear_map, (self.width, self.height), think)
+                if obstacles is not None:
+                    self.slide(animal)
+        
+        # Verifica se animais foram salvos pela Caipora
+        with profiler.phase("collisions"):
+            self.animal_grid.build(self.animals)
+            for i in self.animal_grid.query_rect(self.caipora.rect):
+                animal = self.animals[i]
+                if (self.caipora.rect.colliderect(animal.rect) and 
+                    not animal.is_caught and not animal.is_saved):
+                    animal.is_saved = True
+                    self.targets.discard(animal)
+                    self.animals_saved += 1
+                    self.score += 50
+                    self.add_effect(animal.rect.centerx, animal.rect.centery, 'save')
+        
+        with profiler.phase("cleanup"):
+            for animal in self.animals:
+                if animal in self.targets:
+                    self.targets.move(animal, animal.x, animal.y)
+            
+            # Remove animais capturados após um tempo (e esquece quem ainda os tinha como alvo,
+            # já que o objeto volta ao pool e pode reaparecer como outro animal)
+            self.timers.fire("cleanup")
+            expired = self.expired_animals
+            if expired:
+                remove_where(self.animals, expired.__contains__, self.animal_pool)
+                for hunter in self.hunters:
+                    if hunter.target_animal in expired:
+                        hunter.target_animal = None
+                expired.clear()
+            
+            # Remove caçadores que fugiram da tela e os que se perderam longe dela
+            gone = remove_where(self.hunters, self.has_left, self.hunter_pool)
+            if gone:
+                escaped = sum(1 for hunter in gone if hunter.is_fleeing)
+                if escaped:
+                    self.hunters_caught += escaped
+                    self.score += 100 * escaped
+                if escaped < len(gone):
+                    self.budget.evict('hunters', len(gone) - escaped)
+        
+        # Spawn de novos caçadores e animais
+        with profiler.phase("spawn"):
+            self.update_spawners()
+        
+        # Atualiza efeitos visuais
+        with profiler.phase("effects"):
+            self.update_effects()
+        
+        # Caçadores que perderam o alvo já saem do passo com um novo
+        with profiler.phase("cleanup"):
+            self.retarget_hunters()
+
+
+class Game:
+    """Camada de janela, entrada e desenho sobre a Simulation"""
+    
+    MEMORY_SAMPLE_TICKS = 3600  # Uma amostra de memória por minuto simulado
+    WORLD_SIZE = (2048, 1536)  # O mundo é maior que a tela; a câmera segue a Caipora
+    CULL_SLACK = 8  # Folga do recorte: a posição desenhada é interpolada e anda até um passo
+    BANNER_TICKS = 180  # Passos em que o título da fase fica na tela
+    
+    def __init__(self, time_scale=1.0, dirty_rects=True, memory_dump=None, seed=None, record=None,
+                 world_size=None, memory_trace=False):
+        # Só o vídeo (janela, eventos e teclado): o jogo não usa som nem joystick,
+        # e o módulo de fontes é iniciado pela primeira fonte pedida
+        with startup.stage("pygame.display.init"):
+            pygame.display.init()
         
         # Configurações da tela
         self.width = 1024
         self.height = 768
-        self.screen = pygame.display.set_mode((self.width, self.height))
-        pygame.display.set_caption("Caipora: Guardiã da Amazônia")
+        self.world_width, self.world_height = world_size or self.WORLD_SIZE
+        with startup.stage("janela"):
+            self.screen = pygame.display.set_mode((self.width, self.height))
+            pygame.display.set_caption("Caipora: Guardiã da Amazônia")
         
-        # Clock para controlar FPS
+        # Clock para controlar FPS e passo fixo da simulação
+        # (time_scale=None roda a simulação sem limite, para testes de longa duração)
         self.clock = pygame.time.Clock()
         self.fps = 60
+        self.timestep = FixedTimestep(Simulation.TICK_RATE, time_scale)
         
         # Estado do jogo
         self.running = True
         self.game_state = "menu"  # "menu", "playing", "paused", "game_over"
         
-        # Pontuação e estatísticas
-        self.score = 0
-        self.animals_saved = 0
-        self.hunters_caught = 0
-        self.animals_lost = 0
-        self.max_animals_lost = 5  # Game over se perder 5 animais
-        
         # Cores
         self.colors = {
             'forest_green': (34, 139, 34),
@@ -41,87 +463,115 @@ class Game:
             'orange': (255, 165, 0)
         }
         
-        # Entidades do jogo
-        self.caipora = Caipora(self.width // 2, self.height // 2)
-        self.hunters = []
-        self.animals = []
+        # Camadas da tela de jogo; o fundo do mundo todo não muda durante a fase e fica em cache
+        # (dirty_rects envia ao display só as áreas que mudaram; F2 alterna)
+        self.layers = Compositor(dirty_rects)
+        self.layers.add("background", self.paint_background, static=True,
+                        size=(self.world_width, self.world_height))
+        self.layers.add("influence", self.draw_influence).visible = False  # F6 mostra o mapa de medo
+        self.layers.add("entities", self.draw_entities)
+        self.layers.add("effects", self.draw_effects)
+        self.layers.add("hud", self.draw_game_ui)
+        self.layers.add("profiler", self.draw_profiler)  # F4 liga o perfilador; F5 exporta
         
-        # Font para textos
-        self.font = pygame.font.Font(None, 36)
-        self.small_font = pygame.font.Font(None, 24)
+        # Fases (src/fases); a próxima é preparada numa thread enquanto a atual é jogada
+        self.levels = level_names()
+        self.preloader = Preloader()
         
-        # Timer para spawn
-        self.hunter_spawn_timer = 0
-        self.animal_spawn_timer = 0
+        # Simulação (entidades, pontuação e regras) da fase atual; record grava a última
+        # fase jogada (semente e entradas) para ser reproduzida com replay.py
+        self.camera = Camera((self.width, self.height), (self.world_width, self.world_height))
+        self.record = record
+        self.recorder = None
+        self.assets = None  # Chave do fundo e dos sprites da fase ainda em preparação na thread
+        with startup.stage("fase inicial"):
+            self.start_phase(0, seed)
         
-        # Efeitos visuais
-        self.effects = []  # Lista de efeitos visuais temporários
+        # Memória: F3 mostra o relatório; memory_dump grava o relatório em JSON ao sair;
+        # com memory_trace, os dois trazem as linhas que mais alocaram (tracemalloc)
+        self.memory = MemoryMonitor(trace=memory_trace)
+        self.memory_dump = memory_dump
         
-        # Gerar entidades iniciais
-        self.spawn_initial_entities()
+        # Painéis da interface, refeitos só quando o placar muda
+        self.stats_panel = Panel((300, 120), self.paint_stats_panel, alpha=180)
+        self.controls_panel = Panel((220, 50), self.paint_controls_panel, alpha=150, background=(200, 50))
+        self.tip_panel = None  # Medido pelo texto, então criado no primeiro quadro de jogo
+        self.game_over_panel = Panel((self.width, self.height), self.paint_game_over)
+        self.banner_panel = Panel((480, 50), self.paint_banner_panel, alpha=180)
     
-    def add_effect(self, x, y, effect_type):
-        """Adiciona efeito visual"""
-        timers = {'expulsion': 30, 'save': 60}
-        radii = {'expulsion': 10, 'save': 5}
-        self.effects.append({'type': effect_type, 'x': x, 'y': y, 'timer': timers[effect_type], 'radius': radii[effect_type]})
+    def load_phase(self, index):
+        """(fase, mapa de obstáculos, None): só o que a simulação da fase index precisa"""
+        level = load_level(self.levels[index])
+        return level, level.obstacle_map(self.world_width, self.world_height), None
     
-    def update_effects(self):
-        """Atualiza efeitos visuais"""
-        for effect in self.effects[:]:
-            effect['timer'] -= 1
-            if effect['timer'] <= 0:
-                self.effects.remove(effect)
-            else:
-                effect['radius'] += 2 if effect['type'] == 'expulsion' else 1
+    def prepare_phase(self, index):
+        """(fase, mapa de obstáculos, fundo desenhado) da fase index; roda na thread de pré-carregamento"""
+        level, obstacles, _ = self.load_phase(index)
+        return level, obstacles, self.prepare_assets(level, obstacles)
     
-    def draw_effects(self):
-        """Desenha efeitos visuais"""
-        for effect in self.effects:
-            x, y = int(effect['x']), int(effect['y'])
-            
-            if effect['type'] == 'expulsion':
-                # Ondas de choque
-                alpha = int(255 * (effect['timer'] / 30))
-                for i in range(3):
-                    radius = effect['radius'] + (i * 10)
-                    intensity = max(0, alpha - (i * 50))
-                    if intensity > 0:
-                        pygame.draw.circle(self.screen, (255, 100, 100), (x, y), radius, 3)
-            
-            elif effect['type'] == 'save':
-                # Estrela dourada
-                if effect['timer'] > 0:
-                    r = effect['radius']
-                    star_points = [(x + r * 2 * pygame.math.Vector2(1, 0).rotate(i * 144 - 90).x,
-                                   y + r * 2 * pygame.math.Vector2(1, 0).rotate(i * 144 - 90).y) for i in range(5)]
-                    inner_points = [(x + r * pygame.math.Vector2(1, 0).rotate(i * 144 + 72 - 90).x,
-                                    y + r * pygame.math.Vector2(1, 0).rotate(i * 144 + 72 - 90).y) for i in range(5)]
-                    
-                    points = []
-                    for i in range(5):
-                        points.extend([star_points[i], inner_points[i]])
-                    
-                    if len(points) >= 6:
-                        pygame.draw.polygon(self.screen, (255, 215, 0), points)
+    def prepare_assets(self, level, obstacles):
+        """Fundo desenhado da fase, com os sprites dela já no atlas
+
+        Nada aqui mexe na janela nem no estado do jogo: o fundo é desenhado numa
+        superfície própria, já no formato da tela, e os sprites novos vão para o atlas.
+        """
+        display = pygame.display.get_surface()
+        size = (self.world_width, self.world_height)
+        background = pygame.Surface(size, 0, display) if display is not None else pygame.Surface(size)
+        self.paint_background(background, obstacles)
+        Hunter.preload()
+        for animal_type in level.animal_types:
+            Animal.preload(animal_type)
+        return background
     
-    def spawn_initial_entities(self):
-        """Cria caçadores e animais iniciais"""
-        for i in range(8):
-            x, y = random.randint(50, self.width - 50), random.randint(50, self.height - 50)
-            while abs(x - self.caipora.x) < 100 and abs(y - self.caipora.y) < 100:
-                x, y = random.randint(50, self.width - 50), random.randint(50, self.height - 50)
-            self.animals.append(Animal(x, y, random.choice(["onça", "arara", "tamanduá", "boto", "macaco"])))
-        
-        for _ in range(2):
-            self.spawn_hunter()
+    def preload_phase(self, index):
+        """Começa a preparar a fase index em segundo plano"""
+        if index < len(self.levels):
+            self.preloader.request(index, self.prepare_phase, index)
     
-    def spawn_hunter(self):
-        """Spawna um novo caçador na borda da tela"""
-        positions = [(random.randint(0, self.width), -50), (self.width + 50, random.randint(0, self.height)), 
-                    (random.randint(0, self.width), self.height + 50), (-50, random.randint(0, self.height))]
-        x, y = random.choice(positions)
-        self.hunters.append(Hunter(x, y))
+    def start_phase(self, index, seed=None, stats=None):
+        """Troca para a fase index (com o placar stats, se ela continua a partida) e pede a seguinte
+
+        Se a fase já foi preparada em segundo plano, a troca só troca referências.
+        Senão (a primeira, ao abrir o jogo), só a fase e a navegação são carregadas
+        aqui; o fundo e os sprites ficam para a thread e entram quando ficarem prontos.
+        """
+        level, self.obstacles, background = self.preloader.take(index, self.load_phase, index)
+        self.level_index = index
+        self.sim = Simulation(self.world_width, self.world_height, seed, obstacles=self.obstacles,
+                              level=level, stats=stats)
+        if self.assets is not None:
+            self.preloader.discard(self.assets)  # De uma fase que já saiu
+            self.assets = None
+        if background is not None:
+            self.layers["background"].cache = background  # Já desenhado, no tamanho do mundo
+        else:
+            self.layers["background"].invalidate()  # Desenhado no primeiro quadro, se a thread não chegar antes
+            self.assets = ("assets", index)
+            self.preloader.request(self.assets, self.prepare_assets, level, self.obstacles)
+        if self.record:
+            self.recorder = InputRecorder(self.sim)
+        self.banner_until = self.sim.ticks + self.BANNER_TICKS
+        self.preload_phase(index + 1)
+    
+    def draw_profiler(self, screen):
+        """Desenha a sobreposição do perfilador, se ligado"""
+        rect = profiler.draw_overlay(screen)
+        return [rect] if rect else []
+    
+    def export_profile(self, name="perfil"):
+        """Grava os tempos do perfilador em CSV e em trace do Chrome"""
+        profiler.export_csv(f"{name}.csv")
+        profiler.export_chrome_trace(f"{name}_trace.json")
+        print(f"Perfil gravado em {name}.csv e {name}_trace.json")
+    
+    def draw_influence(self, screen):
+        """Sobrepõe o mapa de medo (ameaça dos caçadores e proteção da Caipora) na área da câmera"""
+        return self.sim.fear_map.draw(screen, self.camera.rect)
+    
+    def draw_effects(self, screen):
+        """Desenha efeitos visuais e devolve as áreas desenhadas"""
+        return self.sim.effects.draw(screen, self.camera.rect)
     
     def handle_events(self):
         """Trata eventos do jogo"""
@@ -138,12 +588,21 @@ class Game:
                     self.game_state = "playing"
                 elif event.key == pygame.K_r and self.game_state == "game_over":
                     self.restart_game()
+                elif event.key == pygame.K_F3:
+                    print(json.dumps(self.memory.report(self.sim), ensure_ascii=False, indent=2))
+                elif event.key == pygame.K_F2:
+                    # Alterna entre flip completo e retângulos sujos, para comparar
+                    self.layers.dirty_rects = not self.layers.dirty_rects
+                elif event.key == pygame.K_F4:
+                    profiler.toggle()
+                elif event.key == pygame.K_F5 and profiler.rows:
+                    self.export_profile()
+                elif event.key == pygame.K_F6:
+                    layer = self.layers["influence"]
+                    layer.visible = not layer.visible
     
     def handle_movement(self):
-        """Trata movimento da Caipora"""
-        if self.game_state != "playing":
-            return
-            
+        """Lê o teclado e devolve a direção (dx, dy) da Caipora"""
         keys = pygame.key.get_pressed()
         dx = dy = 0
         
@@ -156,103 +615,85 @@ class Game:
         if keys[pygame.K_DOWN] or keys[pygame.K_s]:
             dy = 1
         
-        self.caipora.move(dx, dy)
-        
-        # Mantém Caipora dentro da tela
-        self.caipora.x = max(0, min(self.width - self.caipora.width, self.caipora.x))
-        self.caipora.y = max(0, min(self.height - self.caipora.height, self.caipora.y))
-        self.caipora.update_rect()
+        return dx, dy
     
-    def update_entities(self):
-        """Atualiza todas as entidades"""
+    def update_entities(self, inputs):
+        """Avança a simulação enquanto o jogo está em andamento"""
         if self.game_state != "playing":
             return
         
-        # Atualiza caçadores
-        for hunter in self.hunters[:]:
-            hunter.update(self.animals)
-            
-            # Verifica colisão com Caipora
-            if self.caipora.rect.colliderect(hunter.rect) and not hunter.is_fleeing:
-                hunter.start_fleeing()
-                self.add_effect(hunter.rect.centerx, hunter.rect.centery, 'expulsion')
-            
-            # Verifica se caçador capturou animal
-            for animal in self.animals[:]:
-                if hunter.rect.colliderect(animal.rect) and not animal.is_caught:
-                    animal.is_caught = True
-                    animal.caught_by_hunter = True
-                    self.animals_lost += 1
-                    if self.animals_lost >= self.max_animals_lost:
-                        self.game_state = "game_over"
-        
-        # Atualiza animais
-        for animal in self.animals:
-            animal.update(self.caipora, self.hunters)
-            
-            # Verifica se animal foi salvo pela Caipora
-            if (self.caipora.rect.colliderect(animal.rect) and 
-                not animal.is_caught and not animal.is_saved):
-                animal.is_saved = True
-                self.animals_saved += 1
-                self.score += 50
-                self.add_effect(animal.rect.centerx, animal.rect.centery, 'save')
-        
-        # Remove animais capturados após um tempo e caçadores que fugiram
-        self.animals = [a for a in self.animals if not a.should_remove()]
-        
-        # Remove caçadores que fugiram da tela
-        for hunter in self.hunters[:]:
-            if (hunter.x < -100 or hunter.x > self.width + 100 or 
-                hunter.y < -100 or hunter.y > self.height + 100):
-                if hunter.is_fleeing:
-                    self.hunters.remove(hunter)
-                    self.hunters_caught += 1
-                    self.score += 100
-        
-        # Spawn novos caçadores
-        self.hunter_spawn_timer += 1
-        if self.hunter_spawn_timer > 300:  # A cada 5 segundos
-            self.spawn_hunter()
-            self.hunter_spawn_timer = 0
-        
-        # Spawn novos animais ocasionalmente
-        self.animal_spawn_timer += 1
-        if self.animal_spawn_timer > 600 and len(self.animals) < 10:
-            animal_types = ["onça", "arara", "tamanduá", "boto", "macaco"]
-            x = random.randint(50, self.width - 50)
-            y = random.randint(50, self.height - 50)
-            animal_type = random.choice(animal_types)
-            self.animals.append(Animal(x, y, animal_type))
-            self.animal_spawn_timer = 0
-        
-        # Atualiza efeitos visuais
-        self.update_effects()
+        if self.recorder is not None:
+            self.recorder.step(inputs)
+        else:
+            self.sim.step(inputs)
+        if self.sim.ticks % self.MEMORY_SAMPLE_TICKS == 0:
+            self.memory.sample(self.sim)
+        if self.sim.game_over:
+            self.game_state = "game_over"
+            self.preload_phase(0)  # Para o R reiniciar sem esperar
+        elif self.sim.level_complete and self.level_index + 1 < len(self.levels):
+            self.start_phase(self.level_index + 1, stats=self.sim.stats)
     
     def draw_background(self):
-        """Desenha o fundo da floresta"""
-        self.screen.fill(self.colors['forest_green'])
-        for i in range(15):
-            x, y = (i * 80) % self.width, (i * 60) % self.height
-            pygame.draw.circle(self.screen, self.colors['dark_green'], (x, y), 25)
-            pygame.draw.rect(self.screen, self.colors['brown'], (x-5, y+15, 10, 20))
+        """Desenha o fundo da floresta (a partir do cache)"""
+        self.layers["background"].compose(self.screen, self.layers.view)
+    
+    def paint_background(self, surface, obstacles=None):
+        """Pinta o fundo da floresta com as árvores, repetindo o padrão a cada tela do mundo, e os obstáculos"""
+        surface.fill(self.colors['forest_green'])
+        for left in range(0, surface.get_width(), self.width):
+            for top in range(0, surface.get_height(), self.height):
+                for i in range(15):
+                    x, y = left + (i * 80) % self.width, top + (i * 60) % self.height
+                    pygame.draw.circle(surface, self.colors['dark_green'], (x, y), 25)
+                    pygame.draw.rect(surface, self.colors['brown'], (x-5, y+15, 10, 20))
+        for rect in (obstacles if obstacles is not None else self.obstacles).rects:
+            pygame.draw.rect(surface, (105, 105, 105), rect, border_radius=12)
+            pygame.draw.rect(surface, (60, 60, 60), rect, 3, border_radius=12)
+    
+    def install_assets(self):
+        """Põe no lugar o fundo preparado em segundo plano para a fase atual, se já ficou pronto"""
+        if self.assets is not None and self.preloader.ready(self.assets):
+            self.layers["background"].cache = self.preloader.take(self.assets)
+            self.assets = None
+    
+    def follow_caipora(self):
+        """Centraliza a câmera na Caipora (na posição interpolada, como ela é desenhada)"""
+        center = interpolated_rect(self.sim.caipora, self.timestep.alpha).center
+        self.camera.follow(*center)
+        self.layers.scroll(*self.camera.offset)
+    
+    def draw_entities(self, screen):
+        """Desenha as entidades visíveis, interpoladas entre os dois últimos passos, e devolve suas áreas
+
+        Quem está fora da câmera (com a margem do sprite) nem chega a ser desenhado,
+        então o custo acompanha o que aparece na tela e não a população do mundo.
+        """
+        alpha, camera = self.timestep.alpha, self.camera
+        offset, slack = camera.offset, self.CULL_SLACK
+        rects = [self.sim.caipora.draw(screen, alpha, offset)]
+        for entities in (self.sim.hunters, self.sim.animals):
+            rects.extend(entity.draw(screen, alpha, offset) for entity in entities
+                         if camera.sees(entity.x, entity.y, entity.width, entity.height,
+                                        entity.SPRITE_MARGIN + slack))
+        return rects
     
     def draw_ui(self):
         """Desenha interface do usuário"""
         # Painel de informações
         info_texts = [
-            f"Pontuação: {self.score}",
-            f"Animais Salvos: {self.animals_saved}",
-            f"Caçadores Capturados: {self.hunters_caught}",
-            f"Animais Perdidos: {self.animals_lost}/{self.max_animals_lost}"
+            f"Pontuação: {self.sim.score}",
+            f"Animais Salvos: {self.sim.animals_saved}",
+            f"Caçadores Capturados: {self.sim.hunters_caught}",
+            f"Animais Perdidos: {self.sim.animals_lost}/{self.sim.max_animals_lost}"
         ]
         
         for i, text in enumerate(info_texts):
             color = self.colors['white']
-            if i == 3 and self.animals_lost >= self.max_animals_lost - 1:
+            if i == 3 and self.sim.animals_lost >= self.sim.max_animals_lost - 1:
                 color = self.colors['red']
             
-            rendered_text = self.font.render(text, True, color)
+            rendered_text = render_text(text, 36, color)
             self.screen.blit(rendered_text, (10, 10 + i * 40))
         
         # Controles
@@ -261,41 +702,47 @@ class Game:
             "ESC: Sair"
         ]
         for i, control in enumerate(controls):
-            control_text = self.small_font.render(control, True, self.colors['white'])
+            control_text = render_text(control, 24, self.colors['white'])
             self.screen.blit(control_text, (10, self.height - 60 + i * 25))
     
     def draw_game_over(self):
-        """Desenha tela de game over"""
+        """Desenha tela de game over (fundo escurecido e textos, em cache)
+
+        A chave é o que a tela mostra: a version do placar recomeça a cada
+        partida e não distingue o game over de uma do de outra.
+        """
+        key = (self.sim.score, self.level_index, self.layers.view)
+        self.game_over_panel.draw(self.screen, (0, 0), key)
+    
+    def paint_game_over(self, screen):
+        """Pinta a tela de game over"""
+        self.layers["background"].compose(screen, self.layers.view)
         overlay = pygame.Surface((self.width, self.height))
         overlay.set_alpha(128)
         overlay.fill((0, 0, 0))
-        self.screen.blit(overlay, (0, 0))
+        screen.blit(overlay, (0, 0))
         
         texts = [
-            (self.font.render("GAME OVER", True, self.colors['red']), self.height//2 - 50),
-            (self.font.render(f"Pontuação Final: {self.score}", True, self.colors['white']), self.height//2),
-            (self.small_font.render("Pressione R para reiniciar", True, self.colors['white']), self.height//2 + 50)
+            (render_text("GAME OVER", 36, self.colors['red']), self.height//2 - 50),
+            (render_text(f"Pontuação Final: {self.sim.score}", 36, self.colors['white']), self.height//2),
+            (render_text("Pressione R para reiniciar", 24, self.colors['white']), self.height//2 + 50)
         ]
         
         for text, y in texts:
-            self.screen.blit(text, text.get_rect(center=(self.width//2, y)))
+            screen.blit(text, text.get_rect(center=(self.width//2, y)))
     
     def restart_game(self):
-        """Reinicia o jogo"""
+        """Reinicia o jogo na primeira fase"""
         self.game_state = "playing"
-        self.score = self.animals_saved = self.hunters_caught = self.animals_lost = 0
-        self.caipora = Caipora(self.width // 2, self.height // 2)
-        self.hunters = self.animals = self.effects = []
-        self.hunter_spawn_timer = self.animal_spawn_timer = 0
-        self.spawn_initial_entities()
+        self.start_phase(0)
     
     def draw_menu(self):
         """Desenha tela de menu inicial"""
         self.screen.fill((0, 50, 0))
         
         # Título
-        title = pygame.font.Font(None, 72).render("CAIPORA", True, (255, 255, 0))
-        subtitle = self.font.render("Guardiã da Amazônia", True, (0, 255, 0))
+        title = render_text("CAIPORA", 72, (255, 255, 0))
+        subtitle = render_text("Guardiã da Amazônia", 36, (0, 255, 0))
         self.screen.blit(title, title.get_rect(center=(self.width//2, 100)))
         self.screen.blit(subtitle, subtitle.get_rect(center=(self.width//2, 150)))
         
@@ -311,7 +758,7 @@ class Game:
         
         y = 220
         for text, color in instructions:
-            rendered = self.small_font.render(text, True, color)
+            rendered = render_text(text, 24, color)
             self.screen.blit(rendered, (50, y))
             y += 25
         
@@ -324,100 +771,128 @@ class Game:
         
         for i, (entity, desc) in enumerate(examples):
             entity.draw(self.screen)
-            text = self.small_font.render(desc, True, (255, 255, 255))
+            text = render_text(desc, 24, (255, 255, 255))
             self.screen.blit(text, (200, y + 30 + i * 60))
         
-        # Botão de início
-        if pygame.time.get_ticks() % 1000 < 500:
-            start = self.font.render("Pressione ESPAÇO para começar!", True, (255, 255, 0))
+        # Botão de início, piscando a cada meio segundo (pelo relógio do sistema: sem
+        # pygame.init, o pygame.time.get_ticks pode ficar parado em 0)
+        if time.perf_counter() % 1 < 0.5:
+            start = render_text("Pressione ESPAÇO para começar!", 36, (255, 255, 0))
             self.screen.blit(start, start.get_rect(center=(self.width//2, self.height - 50)))
     
-    def draw_game_ui(self):
-        """Desenha interface do jogo melhorada"""
-        # Painel principal
-        panel = pygame.Surface((300, 120))
-        panel.set_alpha(180)
-        panel.fill((0, 0, 0))
-        self.screen.blit(panel, (10, 10))
+    def draw_game_ui(self, screen):
+        """Desenha interface do jogo a partir dos painéis em cache e devolve as áreas desenhadas"""
+        key = (self.sim.stats.version, self.sim.max_animals_lost)
+        rects = [self.stats_panel.draw(screen, (10, 10), key),
+                 self.controls_panel.draw(screen, (10, self.height - 60))]
         
-        # Info compacta
+        # Título da fase nos primeiros segundos, depois a dica
+        if self.tip_panel is None:
+            tip = render_text("💡 Toque nos caçadores!", 24, (255, 255, 0))
+            self.tip_panel = Panel(tip.get_rect().inflate(20, 10).size, self.paint_tip_panel)
+        if self.sim.ticks < self.banner_until:
+            key = (self.level_index, self.sim.level.title)
+            rects.append(self.banner_panel.draw(screen, self.banner_panel.get_rect(center=(self.width//2, 30)), key))
+        elif self.sim.hunters:
+            rects.append(self.tip_panel.draw(screen, self.tip_panel.get_rect(center=(self.width//2, 30))))
+        return rects
+    
+    def paint_stats_panel(self, panel):
+        """Pinta o painel de pontuação"""
         info = [
-            (f"🏆 Pontos: {self.score}", (255, 255, 0)),
-            (f"💚 Salvos: {self.animals_saved}", (0, 255, 0)),
-            (f"🎯 Expulsos: {self.hunters_caught}", (255, 100, 100)),
-            (f"💔 Perdidos: {self.animals_lost}/{self.max_animals_lost}", 
-             (255, 0, 0) if self.animals_lost >= self.max_animals_lost - 1 else (255, 255, 255))
+            (f"🏆 Pontos: {self.sim.score}", (255, 255, 0)),
+            (f"💚 Salvos: {self.sim.animals_saved}", (0, 255, 0)),
+            (f"🎯 Expulsos: {self.sim.hunters_caught}", (255, 100, 100)),
+            (f"💔 Perdidos: {self.sim.animals_lost}/{self.sim.max_animals_lost}", 
+             (255, 0, 0) if self.sim.animals_lost >= self.sim.max_animals_lost - 1 else (255, 255, 255))
         ]
         
         for i, (text, color) in enumerate(info):
-            self.screen.blit(self.small_font.render(text, True, color), (20, 20 + i * 22))
-        
-        # Controles
-        controls_panel = pygame.Surface((200, 50))
-        controls_panel.set_alpha(150)
-        controls_panel.fill((0, 0, 0))
-        self.screen.blit(controls_panel, (10, self.height - 60))
-        
-        self.screen.blit(self.small_font.render("WASD: Mover | ESC: Menu", True, (255, 255, 255)), (20, self.height - 50))
-        
-        # Dica
-        if self.hunters:
-            tip = self.small_font.render("💡 Toque nos caçadores!", True, (255, 255, 0))
-            tip_rect = tip.get_rect(center=(self.width//2, 30))
-            pygame.draw.rect(self.screen, (0, 0, 0), tip_rect.inflate(20, 10))
-            pygame.draw.rect(self.screen, (255, 255, 0), tip_rect.inflate(20, 10), 2)
-            self.screen.blit(tip, tip_rect)
+            panel.blit(render_text(text, 24, color), (10, 10 + i * 22))
+    
+    def paint_banner_panel(self, panel):
+        """Pinta o título da fase e a meta dela"""
+        level = self.sim.level
+        pygame.draw.rect(panel, (0, 255, 0), panel.get_rect(), 2)
+        goal = f"Expulse {level.goal} caçadores" if level.goal else "Resista o quanto puder"
+        title = render_text(level.title or f"Fase {self.level_index + 1}", 24, (255, 255, 0))
+        panel.blit(title, title.get_rect(midtop=(panel.get_width() // 2, 6)))
+        text = render_text(goal, 20, (255, 255, 255))
+        panel.blit(text, text.get_rect(midbottom=(panel.get_width() // 2, panel.get_height() - 4)))
+    
+    def paint_controls_panel(self, panel):
+        """Pinta o painel de controles (o texto passa um pouco do fundo)"""
+        panel.blit(render_text("WASD: Mover | ESC: Menu", 24, (255, 255, 255)), (10, 10))
+    
+    def paint_tip_panel(self, panel):
+        """Pinta a dica com borda amarela"""
+        pygame.draw.rect(panel, (255, 255, 0), panel.get_rect(), 2)
+        tip = render_text("💡 Toque nos caçadores!", 24, (255, 255, 0))
+        panel.blit(tip, tip.get_rect(center=panel.get_rect().center))
     
     def draw(self):
         """Desenha tudo na tela"""
+        if self.game_state == "playing":
+            # Fundo, entidades, efeitos visuais e UI do jogo, vistos pela câmera
+            self.install_assets()
+            self.follow_caipora()
+            self.layers.present(self.screen)
+            return
+        
         if self.game_state == "menu":
             self.draw_menu()
-        elif self.game_state == "playing":
-            self.draw_background()
-            
-            # Desenha entidades
-            self.caipora.draw(self.screen)
-            
-            for hunter in self.hunters:
-                hunter.draw(self.screen)
-            
-            for animal in self.animals:
-                animal.draw(self.screen)
-            
-            # Efeitos visuais
-            self.draw_effects()
-            
-            # UI do jogo
-            self.draw_game_ui()
         elif self.game_state == "game_over":
-            self.draw_background()
             self.draw_game_over()
         
+        self.layers.reset()
         pygame.display.flip()
     
-    def run(self):
-        """Loop principal do jogo"""
+    def run(self, frames=None):
+        """Loop principal do jogo; com frames, sai depois desse número de quadros (para medições)"""
+        elapsed = 0.0
         while self.running:
-            self.handle_events()
-            self.handle_movement()
-            self.update_entities()
-            self.draw()
-            self.clock.tick(self.fps)
+            with profiler.phase("events"):
+                self.handle_events()
+            with profiler.phase("movement"):
+                inputs = self.handle_movement()
+            with profiler.phase("update"):
+                for _ in range(self.timestep.advance(elapsed)):
+                    self.update_entities(inputs)
+            with profiler.phase("draw"):
+                self.draw()
+            startup.first_frame()
+            with profiler.phase("tick"):
+                elapsed = self.clock.tick(0 if self.timestep.uncapped else self.fps) / 1000
+            profiler.frame()
+            if frames is not None:
+                frames -= 1
+                self.running = frames > 0
         
+        if self.memory_dump:
+            self.memory.dump(self.sim, self.memory_dump)
+        if self.recorder is not None:
+            self.recorder.save(self.record)
+        self.preloader.shutdown()
+        fonts.clear()  # As fontes morrem com o pygame.quit
+        text_cache.clear()
         pygame.quit()
 
 
 class Caipora:
     """Classe que representa a Caipora, protagonista do jogo"""
     
+    __slots__ = ("x", "y", "rect", "prev_x", "prev_y")
+    
+    SPRITE_MARGIN = 60  # Espaço em volta do retângulo para a aura e o rótulo
+    width = height = 45
+    speed = 5
+    protection_radius = 80
+    
     def __init__(self, x, y):
         self.x = x
         self.y = y
-        self.width = 45
-        self.height = 45
-        self.speed = 5
         self.rect = pygame.Rect(self.x, self.y, self.width, self.height)
-        self.protection_radius = 80
+        self.prev_x, self.prev_y = x, y
     
     def move(self, dx, dy):
         """Move a Caipora"""
@@ -429,9 +904,13 @@ class Caipora:
         self.rect.x = self.x
         self.rect.y = self.y
     
-    def draw(self, screen):
-        """Desenha a Caipora na tela"""
-        cx, cy = self.rect.center
+    def draw(self, screen, alpha=1.0, offset=(0, 0)):
+        """Desenha a Caipora na tela (deslocada por offset, a câmera) e devolve a área desenhada"""
+        return atlas.blit(screen, interpolated_rect(self, alpha, offset), ("caipora", self.protection_radius), self.SPRITE_MARGIN, self.paint)
+    
+    def paint(self, screen, rect):
+        """Desenha a Caipora com primitivas, ocupando rect"""
+        cx, cy = rect.center
         
         # Aura de proteção
         pygame.draw.circle(screen, (0, 255, 0), (cx, cy), self.protection_radius, 2)
@@ -451,7 +930,7 @@ class Caipora:
         pygame.draw.polygon(screen, (255, 255, 0), star_points)
         
         # Texto identificador
-        text = pygame.font.Font(None, 20).render("CAIPORA", True, (255, 255, 255))
+        text = render_text("CAIPORA", 20, (255, 255, 255))
         text_rect = text.get_rect(center=(cx, cy - 35))
         pygame.draw.rect(screen, (0, 0, 0), text_rect.inflate(4, 2))
         screen.blit(text, text_rect)
@@ -460,42 +939,79 @@ class Caipora:
 class Hunter:
     """Classe que representa os caçadores ilegais"""
     
-    def __init__(self, x, y):
-        self.x, self.y = x, y
-        self.width = self.height = 35
-        self.speed = random.uniform(1.5, 2.5)
+    __slots__ = ("x", "y", "speed", "rect", "prev_x", "prev_y", "target_animal",
+                 "direction_x", "direction_y", "is_fleeing", "flee_event", "rng", "ai_slot")
+    
+    SPRITE_MARGIN = 40
+    HEADINGS = 32  # Direções pré-renderizadas do rifle e das linhas de fuga
+    SPEED_RANGE = (1.5, 2.5)  # Velocidade sorteada, em pixels por passo
+    FLEE_TICKS = 120  # Passos de fuga depois de tocado pela Caipora
+    width = height = 35
+    
+    def __init__(self, x, y, rng=random, speed_range=None):
         self.rect = pygame.Rect(x, y, 35, 35)
+        self.flee_event = None
+        self.reset(x, y, rng, speed_range)
+    
+    def reset(self, x, y, rng=random, speed_range=None):
+        """(Re)inicia o caçador na posição dada, como recém-criado; rng faz os sorteios dele
+
+        A velocidade é sorteada em speed_range (o da fase), ou em SPEED_RANGE.
+        """
+        self.rng = rng
+        self.x, self.y = x, y
+        self.speed = rng.uniform(*(speed_range or self.SPEED_RANGE))
+        self.rect.update(x, y, 35, 35)
+        self.prev_x, self.prev_y = x, y
         self.target_animal = None
         self.direction_x = self.direction_y = 0
         self.is_fleeing = False
-        self.flee_timer = 0
+        if self.flee_event is not None:
+            self.flee_event.cancel()  # De uma vida anterior, no pool
+        self.flee_event = None  # Fim da fuga agendado na roda de tempo
+        self.ai_slot = 0  # Balde do AIScheduler
     
-    def find_nearest_animal(self, animals):
+    @property
+    def flee_timer(self):
+        """Passos de fuga restantes"""
+        return self.flee_event.remaining if self.flee_event is not None else 0
+    
+    def find_nearest_animal(self, animals, targets=None):
         """Encontra o animal mais próximo"""
+        if targets is not None:
+            return targets.nearest(self.x, self.y)
         valid_animals = [a for a in animals if not a.is_caught and not a.is_saved]
         if not valid_animals:
             return None
-        return min(valid_animals, key=lambda a: ((self.x - a.x) ** 2 + (self.y - a.y) ** 2) ** 0.5)
+        return min(valid_animals, key=lambda a: (self.x - a.x) * (self.x - a.x) + (self.y - a.y) * (self.y - a.y))
+    
+    def has_valid_target(self):
+        """Verifica se o alvo atual ainda pode ser capturado"""
+        return bool(self.target_animal) and not self.target_animal.is_caught and not self.target_animal.is_saved
     
-    def update(self, animals):
-        """Atualiza o caçador"""
+    def update(self, animals, targets=None, paths=None, think=True):
+        """Atualiza o caçador; com paths (FlowFields), contorna os obstáculos a caminho do alvo
+
+        Sem think, não troca de alvo e segue na direção da última decisão (a
+        não ser que esteja parado).
+        """
         if self.is_fleeing:
-            self.flee_timer -= 1
-            if self.flee_timer <= 0:
-                self.is_fleeing = False
             # Move para fora da tela
             self.x += self.direction_x * (self.speed * 2)
             self.y += self.direction_y * (self.speed * 2)
         else:
             # Encontra animal alvo
-            if not self.target_animal or self.target_animal.is_caught or self.target_animal.is_saved:
-                self.target_animal = self.find_nearest_animal(animals)
+            if think and not self.has_valid_target():
+                self.target_animal = self.find_nearest_animal(animals, targets)
             
             # Move em direção ao animal alvo
-            if self.target_animal:
-                dx = self.target_animal.x - self.x
-                dy = self.target_animal.y - self.y
-                distance = (dx ** 2 + dy ** 2) ** 0.5
+            if self.target_animal and (think or (not self.direction_x and not self.direction_y)):
+                waypoint = paths.waypoint(self, self.target_animal) if paths is not None else None
+                if waypoint is None:
+                    waypoint = self.target_animal.x, self.target_animal.y
+                dx = waypoint[0] - self.x
+                dy = waypoint[1] - self.y
+                distance = math.sqrt(dx * dx + dy * dy)
                 
                 if distance > 0:
                     self.direction_x = dx / distance
@@ -508,18 +1024,49 @@ class Hunter:
         self.rect.x = self.x
         self.rect.y = self.y
     
-    def start_fleeing(self):
-        """Caçador começa a fugir"""
+    def start_fleeing(self, timers):
+        """Caçador começa a fugir; o fim da fuga, em FLEE_TICKS passos, fica agendado em timers"""
         self.is_fleeing = True
-        self.flee_timer = 120
-        angle = random.uniform(0, 360)
+        self.flee_event = timers.schedule(self.FLEE_TICKS, "hunters", self.stop_fleeing)
+        angle = self.rng.uniform(0, 360)
         vec = pygame.math.Vector2(1, 0).rotate(angle)
         self.direction_x, self.direction_y = vec.x, vec.y
     
-    def draw(self, screen):
-        """Desenha o caçador na tela"""
-        cx, cy = self.rect.center
-        color = (100, 0, 0) if self.is_fleeing else (200, 0, 0)
+    def stop_fleeing(self):
+        """Fim da fuga: o caçador volta a caçar"""
+        self.is_fleeing = False
+    
+    def heading(self):
+        """Direção atual arredondada para um dos HEADINGS ângulos (None se parado)"""
+        if not self.direction_x and not self.direction_y:
+            return None
+        turn = math.atan2(self.direction_y, self.direction_x) / (2 * math.pi)
+        return round(turn * self.HEADINGS) % self.HEADINGS
+    
+    def draw(self, screen, alpha=1.0, offset=(0, 0)):
+        """Desenha o caçador na tela (deslocado por offset) e devolve a área desenhada"""
+        heading = self.heading()
+        return atlas.blit(screen, interpolated_rect(self, alpha, offset), ("hunter", self.is_fleeing, heading),
+                   self.SPRITE_MARGIN, self.paint, self.is_fleeing, heading)
+    
+    @classmethod
+    def preload(cls):
+        """Pré-renderiza no atlas todas as direções, andando e fugindo"""
+        for is_fleeing in (False, True):
+            for heading in (None, *range(cls.HEADINGS)):
+                atlas.get(("hunter", is_fleeing, heading), (cls.width, cls.height), cls.SPRITE_MARGIN,
+                          cls.paint, is_fleeing, heading)
+    
+    @classmethod
+    def paint(cls, screen, rect, is_fleeing, heading):
+        """Desenha um caçador com primitivas, ocupando rect"""
+        cx, cy = rect.center
+        direction = pygame.math.Vector2()
+        if heading is not None:
+            # Arredonda para que os eixos fiquem exatos (cos 90° não é 0 em ponto flutuante)
+            angle = heading * 2 * math.pi / cls.HEADINGS
+            direction.update(round(math.cos(angle), 12), round(math.sin(angle), 12))
+        color = (100, 0, 0) if is_fleeing else (200, 0, 0)
         
         # Corpo humanoide
         pygame.draw.circle(screen, (255, 220, 177), (cx, cy - 12), 8)  # Cabeça
@@ -531,20 +1078,20 @@ class Hunter:
         pygame.draw.rect(screen, (0, 0, 139), (cx - 6, cy + 15, 5, 12))  # Pernas
         pygame.draw.rect(screen, (0, 0, 139), (cx + 1, cy + 15, 5, 12))
         
-        if self.is_fleeing:
+        if is_fleeing:
             # Linhas de movimento
             for i in range(3):
-                lx = cx - (self.direction_x * (10 + i * 5))
-                ly = cy - (self.direction_y * (10 + i * 5))
+                lx = cx - (direction.x * (10 + i * 5))
+                ly = cy - (direction.y * (10 + i * 5))
                 pygame.draw.line(screen, (255, 255, 0), (lx, ly - 2), (lx, ly + 2), 2)
         else:
             # Rifle
-            gx = cx + self.direction_x * 25
-            gy = cy + self.direction_y * 25
+            gx = cx + direction.x * 25
+            gy = cy + direction.y * 25
             pygame.draw.line(screen, (64, 64, 64), (cx, cy), (gx, gy), 4)
             pygame.draw.circle(screen, (32, 32, 32), (gx, gy), 3)
             # Texto
-            text = pygame.font.Font(None, 16).render("CAÇADOR", True, (255, 255, 255))
+            text = render_text("CAÇADOR", 16, (255, 255, 255))
             text_rect = text.get_rect(center=(cx, cy - 32))
             pygame.draw.rect(screen, (0, 0, 0), text_rect.inflate(2, 1))
             screen.blit(text, text_rect)
@@ -553,70 +1100,102 @@ class Hunter:
 class Animal:
     """Classe que representa os animais da floresta"""
     
-    def __init__(self, x, y, animal_type="genérico"):
+    __slots__ = ("x", "y", "speed", "rect", "prev_x", "prev_y", "animal_type", "is_caught",
+                 "is_saved", "caught_by_hunter", "fear_level", "removal_event",
+                 "direction_x", "direction_y", "wander_event", "rng", "ai_slot", "spots")
+    
+    FEAR_RADIUS = 80  # Distância em que o animal percebe um caçador
+    MAX_FEAR_GAIN = 5  # Medo ganho por passo, no máximo (cresce com a ameaça sentida)
+    WANDER_TICKS = 60  # Passos entre trocas de rumo ao acaso
+    REMOVAL_TICKS = 120  # Passos entre a captura e a saída da floresta
+    SPEED_RANGE = (0.5, 1.5)  # Velocidade sorteada, em pixels por passo
+    SPRITE_MARGIN = 40
+    SPOT_VARIANTS = 4  # Padrões de manchas pré-renderizados para a onça
+    serials = itertools.count()  # Numera os animais criados, para alternar os padrões de manchas
+    width = height = 25
+    
+    # Cores por tipo de animal
+    colors = {
+        "onça": (255, 200, 0),
+        "arara": (0, 150, 255),
+        "tamanduá": (139, 69, 19),
+        "boto": (255, 192, 203),
+        "macaco": (101, 67, 33),
+        "genérico": (100, 255, 100)
+    }
+    
+    def __init__(self, x, y, animal_type="genérico", rng=random, speed_range=None):
+        self.rect = pygame.Rect(x, y, self.width, self.height)
+        self.removal_event = self.wander_event = None
+        self.reset(x, y, animal_type, rng, speed_range)
+    
+    def reset(self, x, y, animal_type="genérico", rng=random, speed_range=None):
+        """(Re)inicia o animal na posição dada, como recém-criado; rng faz os sorteios dele
+
+        A velocidade é sorteada em speed_range (o da fase), ou em SPEED_RANGE.
+        """
+        self.rng = rng
         self.x = x
         self.y = y
-        self.width = 25
-        self.height = 25
-        self.speed = random.uniform(0.5, 1.5)
-        self.rect = pygame.Rect(self.x, self.y, self.width, self.height)
+        self.speed = rng.uniform(*(speed_range or self.SPEED_RANGE))
+        self.rect.update(x, y, self.width, self.height)
+        self.prev_x, self.prev_y = x, y
         
         self.animal_type = animal_type
+        # Padrão de manchas fixo desta vida do animal (fora do rng: não muda a simulação)
+        self.spots = next(self.serials) % self.SPOT_VARIANTS if animal_type == "onça" else None
         self.is_caught = False
         self.is_saved = False
         self.caught_by_hunter = False
         self.fear_level = 0
-        self.removal_timer = 0
         
-        # Movimento aleatório
-        self.direction_x = random.choice([-1, 0, 1])
-        self.direction_y = random.choice([-1, 0, 1])
-        self.move_timer = 0
-        
-        # Cores por tipo de animal
-        self.colors = {
-            "onça": (255, 200, 0),
-            "arara": (0, 150, 255),
-            "tamanduá": (139, 69, 19),
-            "boto": (255, 192, 203),
-            "macaco": (101, 67, 33),
-            "genérico": (100, 255, 100)
-        }
+        # Movimento aleatório (as trocas de rumo e a remoção são agendadas pela Simulation)
+        self.direction_x = rng.choice([-1, 0, 1])
+        self.direction_y = rng.choice([-1, 0, 1])
+        for event in (self.removal_event, self.wander_event):
+            if event is not None:
+                event.cancel()  # De uma vida anterior, no pool
+        self.removal_event = self.wander_event = None
+        self.ai_slot = 0  # Balde do AIScheduler
     
-    def update(self, caipora, hunters):
-        """Atualiza o animal"""
+    @property
+    def removal_timer(self):
+        """Passos desde a captura"""
+        return self.REMOVAL_TICKS - self.removal_event.remaining if self.removal_event is not None else 0
+    
+    def wander(self):
+        """Sorteia um novo rumo ao acaso"""
+        self.direction_x = self.rng.choice([-1, 0, 1])
+        self.direction_y = self.rng.choice([-1, 0, 1])
+    
+    def update(self, caipora, fear_map=None, bounds=(1024, 768), think=True):
+        """Atualiza o animal; fear_map é o InfluenceMap do passo e bounds, o tamanho (largura, altura) do mundo
+
+        Sem think, o animal não olha o mapa de medo neste passo (quem já está
+        com medo deve sempre ser chamado com think).
+        """
         if self.is_caught:
-            self.removal_timer += 1
             return
         
         if self.is_saved:
             # Animal salvo fica próximo da Caipora
             dx = caipora.x - self.x
             dy = caipora.y - self.y
-            distance = (dx ** 2 + dy ** 2) ** 0.5
+            distance = math.sqrt(dx * dx + dy * dy)
             if distance > 60:  # Mantém distância da Caipora
                 self.x += (dx / distance) * self.speed * 0.5
                 self.y += (dy / distance) * self.speed * 0.5
         else:
-            # Movimento natural
-            self.move_timer += 1
-            if self.move_timer > 60:  # Muda direção a cada segundo
-                self.direction_x = random.choice([-1, 0, 1])
-                self.direction_y = random.choice([-1, 0, 1])
-                self.move_timer = 0
-            
-            # Foge de caçadores próximos
-            for hunter in hunters:
-                distance = ((self.x - hunter.x) ** 2 + (self.y - hunter.y) ** 2) ** 0.5
-                if distance < 80:
-                    # Foge do caçador
-                    flee_x = self.x - hunter.x
-                    flee_y = self.y - hunter.y
-                    if distance > 0:
-                        self.direction_x = flee_x / distance
-                        self.direction_y = flee_y / distance
-                    self.fear_level = min(100, self.fear_level + 5)
-                    break
+            # Com ameaça na sua célula, foge descendo o gradiente do mapa de medo
+            threat = gx = gy = 0
+            if think and fear_map is not None:
+                threat, gx, gy = fear_map.sample(self.x + self.width / 2, self.y + self.height / 2)
+            if threat > 0:
+                distance = math.sqrt(gx * gx + gy * gy)
+                if distance > 0:
+                    self.direction_x = -gx / distance
+                    self.direction_y = -gy / distance
+                self.fear_level = min(100, self.fear_level + min(self.MAX_FEAR_GAIN, threat + 1))
             else:
                 self.fear_level = max(0, self.fear_level - 1)
             
@@ -626,58 +1205,78 @@ class Animal:
             self.y += self.direction_y * self.speed * speed_multiplier
         
         # Mantém dentro da tela
-        self.x = max(0, min(1024 - self.width, self.x))
-        self.y = max(0, min(768 - self.height, self.y))
+        self.x = max(0, min(bounds[0] - self.width, self.x))
+        self.y = max(0, min(bounds[1] - self.height, self.y))
         self.rect.x = self.x
         self.rect.y = self.y
     
-    def should_remove(self):
-        """Verifica se o animal deve ser removido"""
-        return self.is_caught and self.removal_timer > 120  # Remove após 2 segundos
-    
-    def draw(self, screen):
-        """Desenha o animal na tela"""
-        cx, cy = self.rect.center
-        color = self.colors.get(self.animal_type, self.colors["genérico"])
+    def draw(self, screen, alpha=1.0, offset=(0, 0)):
+        """Desenha o animal na tela (deslocado por offset) e devolve a área desenhada"""
+        rect = interpolated_rect(self, alpha, offset)
         
         if self.is_caught:
             size = max(5, self.width - self.removal_timer // 10)
-            pygame.draw.ellipse(screen, (100, 0, 0), (self.x, self.y, size, size))
-            return
+            return atlas.blit(screen, rect, ("caught", size), 0, self.paint_caught, size)
+        
+        fear_width = int(20 * (self.fear_level / 100)) if self.fear_level > 20 and not self.is_saved else None
+        alarmed = fear_width is not None and self.fear_level > 70
+        spots = self.spots
+        color = self.colors.get(self.animal_type, self.colors["genérico"])
+        return atlas.blit(screen, rect, ("animal", self.animal_type, spots, self.is_saved, fear_width, alarmed),
+                   self.SPRITE_MARGIN, self.paint, self.animal_type, color, spots, self.is_saved, fear_width, alarmed)
+    
+    @classmethod
+    def preload(cls, animal_type):
+        """Pré-renderiza no atlas os estados sem medo do tipo (solto e salvo, com cada padrão de manchas)"""
+        color = cls.colors.get(animal_type, cls.colors["genérico"])
+        for spots in (range(cls.SPOT_VARIANTS) if animal_type == "onça" else (None,)):
+            for is_saved in (False, True):
+                atlas.get(("animal", animal_type, spots, is_saved, None, False), (cls.width, cls.height),
+                          cls.SPRITE_MARGIN, cls.paint, animal_type, color, spots, is_saved, None, False)
+    
+    @staticmethod
+    def paint_caught(screen, rect, size):
+        """Desenha o animal capturado, encolhendo até sumir"""
+        pygame.draw.ellipse(screen, (100, 0, 0), (rect.x, rect.y, size, size))
+    
+    @staticmethod
+    def paint(screen, rect, animal_type, color, spots, is_saved, fear_width, alarmed):
+        """Desenha um animal com primitivas, ocupando rect"""
+        cx, cy = rect.center
         
         # Desenha forma base
-        pygame.draw.ellipse(screen, color, self.rect)
+        pygame.draw.ellipse(screen, color, rect)
         
         # Detalhes específicos
-        if self.animal_type == "onça":
-            [pygame.draw.circle(screen, (0, 0, 0), (cx + random.randint(-8, 8), cy + random.randint(-8, 8)), 2) for _ in range(4)]
-        elif self.animal_type == "arara":
+        if animal_type == "onça":
+            spot_rng = random.Random(spots)
+            [pygame.draw.circle(screen, (0, 0, 0), (cx + spot_rng.randint(-8, 8), cy + spot_rng.randint(-8, 8)), 2) for _ in range(4)]
+        elif animal_type == "arara":
             pygame.draw.polygon(screen, (255, 200, 0), [(cx + 10, cy - 5), (cx + 15, cy), (cx + 10, cy + 5)])
-        elif self.animal_type == "tamanduá":
+        elif animal_type == "tamanduá":
             pygame.draw.ellipse(screen, (100, 50, 0), (cx + 8, cy - 3, 12, 6))
-        elif self.animal_type == "boto":
+        elif animal_type == "boto":
             pygame.draw.ellipse(screen, (255, 150, 200), (cx + 8, cy - 2, 8, 4))
-        elif self.animal_type == "macaco":
+        elif animal_type == "macaco":
             pygame.draw.circle(screen, color, (cx - 12, cy + 8), 4)
         
         # Estados visuais
-        if self.is_saved:
-            pygame.draw.ellipse(screen, (0, 255, 0), self.rect, 3)
+        if is_saved:
+            pygame.draw.ellipse(screen, (0, 255, 0), rect, 3)
             hx, hy = cx - 15, cy - 10
             pygame.draw.circle(screen, (255, 0, 100), (hx, hy), 3)
             pygame.draw.circle(screen, (255, 0, 100), (hx + 4, hy), 3)
             pygame.draw.polygon(screen, (255, 0, 100), [(hx - 2, hy + 2), (hx + 6, hy + 2), (hx + 2, hy + 6)])
         
-        if self.fear_level > 20 and not self.is_caught and not self.is_saved:
-            fear_width = int(20 * (self.fear_level / 100))
-            pygame.draw.rect(screen, (255, 0, 0), (self.x, self.y - 8, fear_width, 3))
-            if self.fear_level > 70:
+        if fear_width is not None:
+            pygame.draw.rect(screen, (255, 0, 0), (rect.x, rect.y - 8, fear_width, 3))
+            if alarmed:
                 pygame.draw.circle(screen, (255, 255, 0), (cx, cy - 15), 6)
                 pygame.draw.rect(screen, (255, 0, 0), (cx - 1, cy - 18, 2, 8))
                 pygame.draw.circle(screen, (255, 0, 0), (cx, cy - 8), 1)
         
         # Nome
-        text = pygame.font.Font(None, 16).render(self.animal_type.upper(), True, (255, 255, 255))
+        text = render_text(animal_type.upper(), 16, (255, 255, 255))
         text_rect = text.get_rect(center=(cx, cy + 20))
         pygame.draw.rect(screen, (0, 0, 0), text_rect.inflate(2, 1))
-        screen.blit(text, text_rect)
\ No newline at end of file
+        screen.blit(text, text_rect)
@@ -1,65 +1,77 @@
 import pygame
 import sys
+import json
 import random
+import time
 
-class Game:
-    def __init__(self):
-        pygame.init()
-        self.width, self.height = 1024, 768
-        self.screen = pygame.display.set_mode((self.width, self.height))
-        pygame.display.set_caption("Caipora")
-        self.clock = pygame.time.Clock()
-        self.running = True
-        self.game_state = "menu"
+from budget import EntityBudget
+from layers import Layer
+from memory import MemoryMonitor
+from profiler import profiler
+from replay import InputRecorder
+from startup import startup
+from text import fonts, render_text, text_cache
+from timestep import FixedTimestep, interpolated_rect
+
+class Simulation:
+    TICK_RATE = 60  # passos por segundo simulado; velocidades em pixels por passo
+    HUNTER_SPAWN_INTERVAL = 5.0  # segundos simulados
+    
+    def __init__(self, width=1024, height=768, seed=None, rng=None):
+        self.width, self.height = width, height
+        self.ticks = 0
+        if rng is None:  # todos os sorteios saem de rng; a semente permite refazer a partida
+            seed = random.randrange(2 ** 32) if seed is None else seed
+            rng = random.Random(seed)
+        self.seed, self.rng = seed, rng
         self.score = self.animals_saved = self.hunters_caught = self.animals_lost = 0
         self.max_animals_lost = 5
-        self.font = pygame.font.Font(None, 36)
-        self.small_font = pygame.font.Font(None, 24)
+        self.game_over = False
         self.caipora = Caipora(self.width // 2, self.height // 2)
         self.hunters = []
         self.animals = []
         self.effects = []
         self.spawn_timer = 0
+        self.spawn_ticks = round(self.HUNTER_SPAWN_INTERVAL * self.TICK_RATE)
+        self.budget = EntityBudget()
         self.spawn_entities()
     
+    def entity_counts(self):
+        return {'hunters': len(self.hunters), 'animals': len(self.animals), 'effects': len(self.effects)}
+    
+    def snapshot(self):
+        return (self.ticks, self.score, self.animals_saved, self.hunters_caught, self.animals_lost,
+                self.game_over, float(self.caipora.x), float(self.caipora.y),
+                [(float(h.x), float(h.y), h.is_fleeing, h.flee_timer) for h in self.hunters],
+                [(float(a.x), float(a.y), a.is_caught, a.is_saved, a.fear_level) for a in self.animals],
+                [tuple(effect.values()) for effect in self.effects])
+    
     def spawn_entities(self):
+        rng = self.rng
         for i in range(8):
-            x, y = random.randint(50, self.width - 50), random.randint(50, self.height - 50)
+            x, y = rng.randint(50, self.width - 50), rng.randint(50, self.height - 50)
             while abs(x - self.caipora.x) < 100 and abs(y - self.caipora.y) < 100:
-                x, y = random.randint(50, self.width - 50), random.randint(50, self.height - 50)
-            self.animals.append(Animal(x, y, random.choice(["onça", "arara", "tamanduá", "boto", "macaco"])))
+                x, y = rng.randint(50, self.width - 50), rng.randint(50, self.height - 50)
+            self.animals.append(Animal(x, y, rng.choice(["onça", "arara", "tamanduá", "boto", "macaco"]), rng))
         for _ in range(2):
-            positions = [(random.randint(0, self.width), -50), (self.width + 50, random.randint(0, self.height)), 
-                        (random.randint(0, self.width), self.height + 50), (-50, random.randint(0, self.height))]
-            x, y = random.choice(positions)
-            self.hunters.append(Hunter(x, y))
-    
-    def handle_events(self):
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                self.running = False
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_ESCAPE:
-                    self.game_state = "menu" if self.game_state == "playing" else "quit"
-                    if self.game_state == "quit": self.running = False
-                elif event.key == pygame.K_SPACE and self.game_state == "menu":
-                    self.game_state = "playing"
-                elif event.key == pygame.K_r and self.game_state == "game_over":
-                    self.restart()
+            positions = [(rng.randint(0, self.width), -50), (self.width + 50, rng.randint(0, self.height)), 
+                        (rng.randint(0, self.width), self.height + 50), (-50, rng.randint(0, self.height))]
+            x, y = rng.choice(positions)
+            self.hunters.append(Hunter(x, y, rng))
     
-    def handle_movement(self):
-        if self.game_state != "playing": return
-        keys = pygame.key.get_pressed()
-        dx = (keys[pygame.K_RIGHT] or keys[pygame.K_d]) - (keys[pygame.K_LEFT] or keys[pygame.K_a])
-        dy = (keys[pygame.K_DOWN] or keys[pygame.K_s]) - (keys[pygame.K_UP] or keys[pygame.K_w])
+    def step(self, inputs=(0, 0)):
+        if self.game_over: return
+        self.ticks += 1
+        for entity in [self.caipora] + self.hunters + self.animals:
+            entity.prev_x, entity.prev_y = entity.x, entity.y
+        dx, dy = inputs
         self.caipora.move(dx, dy)
         self.caipora.x = max(0, min(self.width - 40, self.caipora.x))
         self.caipora.y = max(0, min(self.height - 40, self.caipora.y))
         self.caipora.rect.x, self.caipora.rect.y = self.caipora.x, self.caipora.y
+        self.update_entities()
     
     def update_entities(self):
-        if self.game_state != "playing": return
-        
         # Update hunters
         for hunter in self.hunters[:]:
             hunter.update(self.animals)
@@ -71,6 +83,9 @@ class Game:
                     self.hunters.remove(hunter)
                     self.hunters_caught += 1
                     self.score += 100
+                elif self.budget.is_stray(hunter.x, hunter.y, self.width, self.height):
+                    self.hunters.remove(hunter)  # Sem alvo, nunca voltaria
+                    self.budget.evict('hunters')
             
             # Check hunter caught animal
             for animal in self.animals:
@@ -78,11 +93,11 @@ class Game:
                     animal.is_caught = True
                     self.animals_lost += 1
                     if self.animals_lost >= self.max_animals_lost:
-                        self.game_state = "game_over"
+                        self.game_over = True
         
         # Update animals
         for animal in self.animals[:]:
-            animal.update(self.caipora, self.hunters)
+            animal.update(self.caipora, self.hunters, (self.width, self.height))
             if (self.caipora.rect.colliderect(animal.rect) and not animal.is_caught and not animal.is_saved):
                 animal.is_saved = True
                 self.animals_saved += 1
@@ -93,11 +108,13 @@ class Game:
         
         # Spawn new hunters
         self.spawn_timer += 1
-        if self.spawn_timer > 300:
-            positions = [(random.randint(0, self.width), -50), (self.width + 50, random.randint(0, self.height)), 
-                        (random.randint(0, self.width), self.height + 50), (-50, random.randint(0, self.height))]
-            x, y = random.choice(positions)
-            self.hunters.append(Hunter(x, y))
+        if self.spawn_timer > self.spawn_ticks:
+            if self.budget.allows('hunters', len(self.hunters)):
+                rng = self.rng
+                positions = [(rng.randint(0, self.width), -50), (self.width + 50, rng.randint(0, self.height)), 
+                            (rng.randint(0, self.width), self.height + 50), (-50, rng.randint(0, self.height))]
+                x, y = rng.choice(positions)
+                self.hunters.append(Hunter(x, y, rng))
             self.spawn_timer = 0
         
         # Update effects
@@ -107,19 +124,73 @@ class Game:
                 self.effects.remove(effect)
             else:
                 effect['radius'] += 2 if effect['type'] == 'expulsion' else 1
+
+class Game:
+    def __init__(self, time_scale=1.0, memory_dump=None, seed=None, record=None, memory_trace=False):
+        with startup.stage("pygame.display.init"):
+            pygame.display.init()  # só vídeo: sem som nem joystick; fontes iniciadas na primeira pedida
+        self.width, self.height = 1024, 768
+        with startup.stage("janela"):
+            self.screen = pygame.display.set_mode((self.width, self.height))
+            pygame.display.set_caption("Caipora")
+        self.clock = pygame.time.Clock()
+        self.timestep = FixedTimestep(Simulation.TICK_RATE, time_scale)
+        self.running = True
+        self.game_state = "menu"
+        self.sim = Simulation(self.width, self.height, seed)
+        self.record = record  # grava semente e entradas da última partida (veja replay.py)
+        self.recorder = InputRecorder(self.sim) if record else None
+        self.background = Layer("background", self.paint_background, static=True)
+        self.memory = MemoryMonitor(memory_trace)  # F3 mostra o relatório; memory_dump o grava ao sair
+        self.memory_dump = memory_dump
     
-    def draw(self):
-        # Background
-        self.screen.fill((34, 139, 34))
+    def handle_events(self):
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                self.running = False
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_ESCAPE:
+                    self.game_state = "menu" if self.game_state == "playing" else "quit"
+                    if self.game_state == "quit": self.running = False
+                elif event.key == pygame.K_SPACE and self.game_state == "menu":
+                    self.game_state = "playing"
+                elif event.key == pygame.K_r and self.game_state == "game_over":
+                    self.restart()
+                elif event.key == pygame.K_F3:
+                    print(json.dumps(self.memory.report(self.sim), ensure_ascii=False, indent=2))
+                elif event.key == pygame.K_F4:
+                    profiler.toggle()
+                elif event.key == pygame.K_F5 and profiler.rows:
+                    profiler.export_csv("perfil.csv")
+                    profiler.export_chrome_trace("perfil_trace.json")
+    
+    def handle_movement(self):
+        keys = pygame.key.get_pressed()
+        dx = (keys[pygame.K_RIGHT] or keys[pygame.K_d]) - (keys[pygame.K_LEFT] or keys[pygame.K_a])
+        dy = (keys[pygame.K_DOWN] or keys[pygame.K_s]) - (keys[pygame.K_UP] or keys[pygame.K_w])
+        return dx, dy
+    
+    def update_entities(self, inputs):
+        if self.game_state != "playing": return
+        (self.recorder or self.sim).step(inputs)
+        if self.sim.ticks % 3600 == 0: self.memory.sample(self.sim)
+        if self.sim.game_over: self.game_state = "game_over"
+    
+    def paint_background(self, screen):
+        screen.fill((34, 139, 34))
         for i in range(15):
             x, y = (i * 80) % self.width, (i * 60) % self.height
-            pygame.draw.circle(self.screen, (0, 100, 0), (x, y), 25)
-            pygame.draw.rect(self.screen, (139, 69, 19), (x-5, y+15, 10, 20))
+            pygame.draw.circle(screen, (0, 100, 0), (x, y), 25)
+            pygame.draw.rect(screen, (139, 69, 19), (x-5, y+15, 10, 20))
+    
+    def draw(self):
+        # Background (em cache)
+        self.background.compose(self.screen)
         
         if self.game_state == "menu":
             self.screen.fill((0, 50, 0))
-            title = pygame.font.Font(None, 72).render("CAIPORA", True, (255, 255, 0))
-            subtitle = self.font.render("Guardiã da Amazônia", True, (0, 255, 0))
+            title = render_text("CAIPORA", 72, (255, 255, 0))
+            subtitle = render_text("Guardiã da Amazônia", 36, (0, 255, 0))
             self.screen.blit(title, title.get_rect(center=(self.width//2, 100)))
             self.screen.blit(subtitle, subtitle.get_rect(center=(self.width//2, 150)))
             
@@ -131,24 +202,25 @@ class Game:
             
             y = 220
             for text, color in instructions:
-                rendered = self.small_font.render(text, True, color)
+                rendered = render_text(text, 24, color)
                 self.screen.blit(rendered, (50, y))
                 y += 30
             
-            if pygame.time.get_ticks() % 1000 < 500:
-                start = self.font.render("Pressione ESPAÇO para começar!", True, (255, 255, 0))
+            if time.perf_counter() % 1 < 0.5:  # pisca; get_ticks fica em 0 sem pygame.init
+                start = render_text("Pressione ESPAÇO para começar!", 36, (255, 255, 0))
                 self.screen.blit(start, start.get_rect(center=(self.width//2, self.height - 50)))
         
         elif self.game_state == "playing":
             # Draw entities
-            self.caipora.draw(self.screen)
-            for hunter in self.hunters:
-                hunter.draw(self.screen)
-            for animal in self.animals:
-                animal.draw(self.screen)
+            alpha = self.timestep.alpha
+            self.sim.caipora.draw(self.screen, alpha)
+            for hunter in self.sim.hunters:
+                hunter.draw(self.screen, alpha)
+            for animal in self.sim.animals:
+                animal.draw(self.screen, alpha)
             
             # Draw effects
-            for effect in self.effects:
+            for effect in self.sim.effects:
                 x, y = int(effect['x']), int(effect['y'])
                 if effect['type'] == 'expulsion':
                     for i in range(3):
@@ -163,15 +235,16 @@ class Game:
             self.screen.blit(panel, (10, 10))
             
             info = [
-                f"🏆 Pontos: {self.score}",
-                f"💚 Salvos: {self.animals_saved}",
-                f"🎯 Expulsos: {self.hunters_caught}",
-                f"💔 Perdidos: {self.animals_lost}/{self.max_animals_lost}"
+                f"🏆 Pontos: {self.sim.score}",
+                f"💚 Salvos: {self.sim.animals_saved}",
+                f"🎯 Expulsos: {self.sim.hunters_caught}",
+                f"💔 Perdidos: {self.sim.animals_lost}/{self.sim.max_animals_lost}"
             ]
             
             for i, text in enumerate(info):
-                color = (255, 0, 0) if i == 3 and self.animals_lost >= 4 else (255, 255, 255)
-                self.screen.blit(self.small_font.render(text, True, color), (20, 20 + i * 20))
+                color = (255, 0, 0) if i == 3 and self.sim.animals_lost >= 4 else (255, 255, 255)
+                self.screen.blit(render_text(text, 24, color), (20, 20 + i * 20))
+            profiler.draw_overlay(self.screen)  # F4
         
         elif self.game_state == "game_over":
             overlay = pygame.Surface((self.width, self.height))
@@ -180,9 +253,9 @@ class Game:
             self.screen.blit(overlay, (0, 0))
             
             texts = [
-                (self.font.render("GAME OVER", True, (255, 0, 0)), self.height//2 - 50),
-                (self.font.render(f"Pontuação: {self.score}", True, (255, 255, 255)), self.height//2),
-                (self.small_font.render("Pressione R para reiniciar", True, (255, 255, 255)), self.height//2 + 50)
+                (render_text("GAME OVER", 36, (255, 0, 0)), self.height//2 - 50),
+                (render_text(f"Pontuação: {self.sim.score}", 36, (255, 255, 255)), self.height//2),
+                (render_text("Pressione R para reiniciar", 24, (255, 255, 255)), self.height//2 + 50)
             ]
             
             for text, y in texts:
@@ -192,46 +265,58 @@ class Game:
     
     def restart(self):
         self.game_state = "playing"
-        self.score = self.animals_saved = self.hunters_caught = self.animals_lost = 0
-        self.caipora = Caipora(self.width // 2, self.height // 2)
-        self.hunters = self.animals = self.effects = []
-        self.spawn_timer = 0
-        self.spawn_entities()
+        self.sim = Simulation(self.width, self.height)
+        if self.recorder: self.recorder = InputRecorder(self.sim)
     
-    def run(self):
+    def run(self, frames=None):  # frames: sai depois desse número de quadros (medições)
+        elapsed = 0.0
         while self.running:
-            self.handle_events()
-            self.handle_movement()
-            self.update_entities()
-            self.draw()
-            self.clock.tick(60)
+            with profiler.phase("events"): self.handle_events()
+            with profiler.phase("movement"): inputs = self.handle_movement()
+            with profiler.phase("update"):
+                for _ in range(self.timestep.advance(elapsed)):
+                    self.update_entities(inputs)
+            with profiler.phase("draw"): self.draw()
+            startup.first_frame()
+            with profiler.phase("tick"): elapsed = self.clock.tick(0 if self.timestep.uncapped else 60) / 1000
+            profiler.frame()
+            if frames is not None:
+                frames -= 1
+                self.running = frames > 0
+        if self.memory_dump: self.memory.dump(self.sim, self.memory_dump)
+        if self.recorder: self.recorder.save(self.record)
+        fonts.clear()  # As fontes morrem com o pygame.quit
+        text_cache.clear()
         pygame.quit()
 
 class Caipora:
     def __init__(self, x, y):
         self.x, self.y = x, y
         self.rect = pygame.Rect(x, y, 40, 40)
+        self.prev_x, self.prev_y = x, y
         self.speed = 5
     
     def move(self, dx, dy):
         self.x += dx * self.speed
         self.y += dy * self.speed
     
-    def draw(self, screen):
-        cx, cy = self.rect.center
+    def draw(self, screen, alpha=1.0):
+        cx, cy = interpolated_rect(self, alpha).center
         pygame.draw.circle(screen, (0, 255, 0), (cx, cy), 50, 2)  # Aura
         pygame.draw.circle(screen, (101, 67, 33), (cx, cy - 15), 12)  # Cabeça
         pygame.draw.circle(screen, (34, 139, 34), (cx, cy - 15), 15, 3)  # Cabelo
         pygame.draw.ellipse(screen, (0, 100, 0), (cx - 10, cy - 5, 20, 25))  # Corpo
         pygame.draw.polygon(screen, (255, 255, 0), [(cx + 8, cy), (cx, cy - 8), (cx - 8, cy), (cx, cy + 8)])  # Estrela
-        text = pygame.font.Font(None, 20).render("CAIPORA", True, (255, 255, 255))
+        text = render_text("CAIPORA", 20, (255, 255, 255))
         screen.blit(text, text.get_rect(center=(cx, cy - 35)))
 
 class Hunter:
-    def __init__(self, x, y):
+    def __init__(self, x, y, rng=random):
         self.x, self.y = x, y
         self.rect = pygame.Rect(x, y, 35, 35)
-        self.speed = random.uniform(1.5, 2.5)
+        self.prev_x, self.prev_y = x, y
+        self.rng = rng
+        self.speed = rng.uniform(1.5, 2.5)
         self.target_animal = None
         self.direction_x = self.direction_y = 0
         self.is_fleeing = False
@@ -265,36 +350,38 @@ class Hunter:
     def start_fleeing(self):
         self.is_fleeing = True
         self.flee_timer = 120
-        angle = random.uniform(0, 360)
+        angle = self.rng.uniform(0, 360)
         vec = pygame.math.Vector2(1, 0).rotate(angle)
         self.direction_x, self.direction_y = vec.x, vec.y
     
-    def draw(self, screen):
-        cx, cy = self.rect.center
+    def draw(self, screen, alpha=1.0):
+        cx, cy = interpolated_rect(self, alpha).center
         color = (100, 0, 0) if self.is_fleeing else (200, 0, 0)
         pygame.draw.circle(screen, (255, 220, 177), (cx, cy - 12), 8)  # Cabeça
         pygame.draw.ellipse(screen, (139, 69, 19), (cx - 10, cy - 20, 20, 8))  # Chapéu
         pygame.draw.rect(screen, color, (cx - 8, cy - 5, 16, 20))  # Corpo
         if not self.is_fleeing:
-            text = pygame.font.Font(None, 16).render("CAÇADOR", True, (255, 255, 255))
+            text = render_text("CAÇADOR", 16, (255, 255, 255))
             screen.blit(text, text.get_rect(center=(cx, cy - 32)))
 
 class Animal:
-    def __init__(self, x, y, animal_type):
+    def __init__(self, x, y, animal_type, rng=random):
         self.x, self.y = x, y
         self.rect = pygame.Rect(x, y, 25, 25)
+        self.prev_x, self.prev_y = x, y
         self.animal_type = animal_type
-        self.speed = random.uniform(0.5, 1.5)
+        self.rng = rng
+        self.speed = rng.uniform(0.5, 1.5)
         self.is_caught = self.is_saved = False
         self.fear_level = 0
         self.removal_timer = 0
-        self.direction_x = random.choice([-1, 0, 1])
-        self.direction_y = random.choice([-1, 0, 1])
+        self.direction_x = rng.choice([-1, 0, 1])
+        self.direction_y = rng.choice([-1, 0, 1])
         self.move_timer = 0
         self.colors = {"onça": (255, 200, 0), "arara": (0, 150, 255), "tamanduá": (139, 69, 19), 
                       "boto": (255, 192, 203), "macaco": (101, 67, 33), "genérico": (100, 255, 100)}
     
-    def update(self, caipora, hunters):
+    def update(self, caipora, hunters, bounds=(1024, 768)):
         if self.is_caught:
             self.removal_timer += 1
             return
@@ -309,8 +396,8 @@ class Animal:
         else:
             self.move_timer += 1
             if self.move_timer > 60:
-                self.direction_x = random.choice([-1, 0, 1])
-                self.direction_y = random.choice([-1, 0, 1])
+                self.direction_x = self.rng.choice([-1, 0, 1])
+                self.direction_y = self.rng.choice([-1, 0, 1])
                 self.move_timer = 0
             
             for hunter in hunters:
@@ -330,25 +417,26 @@ class Animal:
             self.x += self.direction_x * self.speed * speed_multiplier
             self.y += self.direction_y * self.speed * speed_multiplier
         
-        self.x = max(0, min(1024 - 25, self.x))
-        self.y = max(0, min(768 - 25, self.y))
+        self.x = max(0, min(bounds[0] - 25, self.x))
+        self.y = max(0, min(bounds[1] - 25, self.y))
         self.rect.x, self.rect.y = self.x, self.y
     
-    def draw(self, screen):
+    def draw(self, screen, alpha=1.0):
+        rect = interpolated_rect(self, alpha)
         if self.is_caught:
             size = max(5, 25 - self.removal_timer // 10)
-            pygame.draw.ellipse(screen, (100, 0, 0), (self.x, self.y, size, size))
+            pygame.draw.ellipse(screen, (100, 0, 0), (rect.x, rect.y, size, size))
             return
         
-        cx, cy = self.rect.center
+        cx, cy = rect.center
         color = self.colors.get(self.animal_type, (100, 255, 100))
-        pygame.draw.ellipse(screen, color, self.rect)
+        pygame.draw.ellipse(screen, color, rect)
         
         if self.is_saved:
-            pygame.draw.ellipse(screen, (0, 255, 0), self.rect, 3)
+            pygame.draw.ellipse(screen, (0, 255, 0), rect, 3)
             pygame.draw.circle(screen, (255, 0, 100), (cx - 15, cy - 10), 3)  # Coração
         
-        text = pygame.font.Font(None, 16).render(self.animal_type.upper(), True, (255, 255, 255))
+        text = render_text(self.animal_type.upper(), 16, (255, 255, 255))
         screen.blit(text, text.get_rect(center=(cx, cy + 20)))
 
 if __name__ == "__main__":
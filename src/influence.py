@@ -0,0 +1,131 @@
+"""
+Mapa de influência: ameaça dos caçadores e proteção da Caipora numa grade grossa
+"""
+
+import math
+
+import pygame
+
+
+class InfluenceMap:
+    """Grade de inteiros atualizada a cada passo e lida pelos animais em O(1)
+
+    Cada caçador soma sua ameaça às células em volta (o peso cai uma unidade
+    por célula de distância, até o raio de medo) e a Caipora subtrai sua
+    proteção do mesmo jeito. Um animal numa célula positiva está com medo e
+    foge descendo o gradiente: para longe da soma dos caçadores e na direção
+    da Caipora. Os valores são inteiros, então a soma não depende da ordem dos
+    caçadores e pode ser mantida aos poucos: a cada passo, só quem mudou de
+    célula tem o núcleo retirado da célula antiga e somado na nova.
+    """
+
+    CELL = 32
+    THREAT = 1  # Peso de cada caçador
+    PROTECTION = 2  # Peso da Caipora: ao lado de um caçador, ela anula a ameaça dele
+
+    def __init__(self, width, height, cell=CELL):
+        self.cell = cell
+        self.cols = -(-width // cell)
+        self.rows = -(-height // cell)
+        self.zeros = [0] * (self.cols * self.rows)
+        self.values = list(self.zeros)
+        self.kernels = {}
+        self.radius = None  # Raio de medo com que as ameaças atuais foram somadas
+        self.sources = {}  # Caçador -> célula (coluna, linha) em que a ameaça dele está somada
+        self.guard = None  # Célula em que a proteção da Caipora está somada
+        self.overlay = None
+        self.overlay_version = None
+        self.version = 0  # Muda quando a grade muda, para a sobreposição saber que precisa ser refeita
+
+    def kernel(self, radius):
+        """Células (dc, dr, peso) alcançadas a partir da célula central, para o raio dado"""
+        cells = self.kernels.get(radius)
+        if cells is None:
+            reach = math.ceil(radius / self.cell)
+            cells = []
+            for dr in range(-reach, reach + 1):
+                for dc in range(-reach, reach + 1):
+                    distance = round(math.hypot(dc, dr))
+                    if distance <= reach:
+                        cells.append((dc, dr, reach + 1 - distance))
+            self.kernels[radius] = cells
+        return cells
+
+    def cell_of(self, entity):
+        """Célula (coluna, linha) do centro da entidade"""
+        cell = self.cell
+        return int((entity.x + entity.width / 2) // cell), int((entity.y + entity.height / 2) // cell)
+
+    def splat(self, col, row, radius, weight):
+        """Soma weight vezes o núcleo de radius em volta da célula (col, row)"""
+        cols, rows, values = self.cols, self.rows, self.values
+        for dc, dr, w in self.kernel(radius):
+            c, r = col + dc, row + dr
+            if 0 <= c < cols and 0 <= r < rows:
+                values[r * cols + c] += w * weight
+
+    def rebuild(self, hunters, caipora, fear_radius):
+        """Põe a grade em dia com os caçadores e a Caipora nas posições atuais (pelos centros)
+
+        O resultado é o mesmo de zerar e somar tudo de novo; com outro raio de
+        medo, a grade é refeita do zero.
+        """
+        guard_radius = caipora.protection_radius
+        if fear_radius != self.radius:
+            self.values[:] = self.zeros
+            self.sources, self.guard, self.radius = {}, None, fear_radius
+        sources, cell_of = self.sources, self.cell_of
+        current = {hunter: cell_of(hunter) for hunter in hunters}
+        changed = False
+        for hunter, (col, row) in sources.items():
+            if current.get(hunter) != (col, row):
+                self.splat(col, row, fear_radius, -self.THREAT)
+                changed = True
+        for hunter, where in current.items():
+            if sources.get(hunter) != where:
+                self.splat(*where, fear_radius, self.THREAT)
+                changed = True
+        self.sources = current
+
+        where = cell_of(caipora)
+        if where != self.guard:
+            if self.guard is not None:
+                self.splat(*self.guard, guard_radius, self.PROTECTION)
+            self.splat(*where, guard_radius, -self.PROTECTION)
+            self.guard = where
+            changed = True
+        if changed:
+            self.version += 1
+
+    def sample(self, x, y):
+        """(valor, gradiente x, gradiente y) na célula do ponto; nas bordas, o gradiente usa a própria célula"""
+        cols, values = self.cols, self.values
+        col = min(max(int(x // self.cell), 0), cols - 1)
+        row = min(max(int(y // self.cell), 0), self.rows - 1)
+        i = row * cols + col
+        gx = values[i + 1 if col + 1 < cols else i] - values[i - 1 if col > 0 else i]
+        gy = values[i + cols if row + 1 < self.rows else i] - values[i - cols if row > 0 else i]
+        return values[i], gx, gy
+
+    def draw(self, screen, view):
+        """Sobrepõe a grade na área view do mundo: vermelho onde há ameaça, azul onde há proteção"""
+        if self.overlay is None or self.overlay_version != self.version:
+            self.overlay = self.render()
+            self.overlay_version = self.version
+        cell = self.cell
+        first_col, first_row = view.x // cell, view.y // cell
+        area = pygame.Rect(first_col, first_row, view.width // cell + 2, view.height // cell + 2)
+        area = area.clip(self.overlay.get_rect())
+        scaled = pygame.transform.scale(self.overlay.subsurface(area), (area.width * cell, area.height * cell))
+        return [screen.blit(scaled, (area.x * cell - view.x, area.y * cell - view.y))]
+
+    def render(self):
+        """Uma célula por pixel, com opacidade proporcional ao valor"""
+        surface = pygame.Surface((self.cols, self.rows), pygame.SRCALPHA)
+        cols = self.cols
+        for i, value in enumerate(self.values):
+            if value:
+                alpha = min(200, 40 * abs(value))
+                color = (255, 0, 0, alpha) if value > 0 else (0, 120, 255, alpha)
+                surface.set_at((i % cols, i // cols), color)
+        return surface
@@ -0,0 +1,207 @@
+"""
+Compositor de camadas: fundo, entidades, efeitos e interface
+"""
+
+import pygame
+
+from profiler import profiler
+
+
+class Layer:
+    """Camada desenhada por paint(surface)
+
+    Camadas estáticas são desenhadas uma vez numa superfície opaca em cache e
+    depois custam só uma cópia por quadro; o cache é refeito quando o tamanho
+    da tela muda ou quando invalidate() é chamado (por exemplo, ao trocar de fase).
+    Com size, o cache tem esse tamanho (o do mundo, maior que a tela) e cada
+    quadro copia só a parte sob a câmera (view, o canto superior esquerdo).
+    Camadas dinâmicas são redesenhadas a cada quadro e o paint delas devolve a
+    lista de retângulos que pintou (None se não souber).
+    """
+
+    def __init__(self, name, paint, static=False, size=None):
+        self.name = name
+        self.paint = paint
+        self.static = static
+        self.size = size
+        self.visible = True
+        self.cache = None
+
+    def invalidate(self):
+        """Descarta o cache; a camada é redesenhada no próximo quadro"""
+        self.cache = None
+
+    def render(self, size):
+        """Desenha a camada numa superfície nova no formato da tela"""
+        surface = pygame.Surface(size)
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert()
+        self.paint(surface)
+        return surface
+
+    def refresh(self, size):
+        """Refaz o cache de uma camada estática se necessário; indica se refez"""
+        size = self.size or size
+        if self.cache is not None and self.cache.get_size() == size:
+            return False
+        self.cache = self.render(size)
+        return True
+
+    def restore(self, screen, rects, view=(0, 0)):
+        """Copia do cache de uma camada estática só as áreas dadas (em coordenadas da tela)"""
+        for rect in rects:
+            screen.blit(self.cache, rect, rect.move(view))
+
+    def compose(self, screen, view=(0, 0)):
+        """Desenha a camada sobre a tela e devolve as áreas pintadas (None = desconhecidas)"""
+        if not self.visible:
+            return []
+        if not self.static:
+            return self.paint(screen)
+        self.refresh(screen.get_size())
+        screen.blit(self.cache, (0, 0), pygame.Rect(view, screen.get_size()))
+        return [screen.get_rect()]
+
+
+class Compositor:
+    """Lista ordenada de camadas, desenhadas de baixo para cima
+
+    Com dirty_rects ligado, present() não redesenha a tela toda: restaura as
+    camadas estáticas só sob o que foi desenhado no quadro anterior, redesenha
+    as dinâmicas e envia ao display apenas as áreas que mudaram. As camadas
+    estáticas precisam ficar abaixo das dinâmicas.
+
+    view é a posição da câmera no mundo; quando ela muda (scroll), a tela toda
+    se move e o quadro seguinte é completo.
+    """
+
+    def __init__(self, dirty_rects=False, full_threshold=0.5):
+        self.layers = []
+        self.dirty_rects = dirty_rects
+        self.full_threshold = full_threshold  # Fração da tela acima da qual volta ao flip
+        self.previous = None  # Áreas desenhadas no último quadro (None = tela toda)
+        self.view = (0, 0)
+        self.full_frames = 0
+        self.dirty_frames = 0
+
+    def __getitem__(self, name):
+        for layer in self.layers:
+            if layer.name == name:
+                return layer
+        raise KeyError(name)
+
+    def add(self, name, paint, static=False, size=None):
+        """Acrescenta uma camada por cima das existentes"""
+        layer = Layer(name, paint, static, size)
+        self.layers.append(layer)
+        return layer
+
+    def invalidate(self, name=None):
+        """Descarta o cache de uma camada (ou de todas)"""
+        for layer in self.layers:
+            if name is None or layer.name == name:
+                layer.invalidate()
+
+    def reset(self):
+        """Esquece o quadro anterior (outra tela foi desenhada por cima)"""
+        self.previous = None
+
+    def scroll(self, x, y):
+        """Move a câmera para (x, y) do mundo; se ela andou, o próximo quadro é completo"""
+        if (x, y) != self.view:
+            self.view = (x, y)
+            self.previous = None
+
+    def compose(self, screen, names=None):
+        """Desenha as camadas (ou só as de names) na ordem em que foram adicionadas
+
+        Devolve as áreas pintadas pelas camadas dinâmicas, ou None se alguma
+        não souber dizer.
+        """
+        rects = []
+        for layer in self.layers:
+            if names is None or layer.name in names:
+                with profiler.phase(layer.name):
+                    painted = layer.compose(screen, self.view)
+                if layer.static:
+                    continue
+                if painted is None or rects is None:
+                    rects = None
+                else:
+                    rects.extend(painted)
+        return rects
+
+    def present(self, screen):
+        """Desenha o quadro e o envia ao display (flip ou só retângulos sujos)"""
+        static = [layer for layer in self.layers if layer.static and layer.visible]
+        rebuilt = any([layer.refresh(screen.get_size()) for layer in static])
+        if not self.dirty_rects or self.previous is None or rebuilt:
+            self.previous = self.compose(screen)
+            self.flip()
+            return
+
+        for layer in static:
+            with profiler.phase(layer.name):
+                layer.restore(screen, self.previous, self.view)
+        rects = self.compose(screen, [layer.name for layer in self.layers if not layer.static])
+        if rects is None:
+            self.previous = None
+            self.flip()
+            return
+
+        changed = self.previous + rects
+        self.previous = rects
+        area = sum(rect.width * rect.height for rect in changed)
+        if area > self.full_threshold * screen.get_width() * screen.get_height():
+            self.flip()
+        else:
+            with profiler.phase("flip"):
+                pygame.display.update(changed)
+            self.dirty_frames += 1
+
+    def flip(self):
+        """Envia a tela inteira ao display"""
+        with profiler.phase("flip"):
+            pygame.display.flip()
+        self.full_frames += 1
+
+
+class Panel:
+    """Painel da interface pré-renderizado, refeito só quando a chave muda
+
+    O fundo preto com opacidade alpha cobre a área background (por padrão, o
+    painel inteiro) e paint(surface) desenha o conteúdo por cima.
+    """
+
+    def __init__(self, size, paint, alpha=255, background=None):
+        self.size = size
+        self.paint = paint
+        self.alpha = alpha
+        self.background = pygame.Rect((0, 0), background or size)
+        self.surface = None
+        self.key = None
+        self.builds = 0
+
+    def get_rect(self, **position):
+        """Retângulo do painel, posicionado como em Surface.get_rect"""
+        rect = pygame.Rect((0, 0), self.size)
+        for name, value in position.items():
+            setattr(rect, name, value)
+        return rect
+
+    def render(self):
+        """Desenha o painel numa superfície nova"""
+        surface = pygame.Surface(self.size, pygame.SRCALPHA)
+        surface.fill((0, 0, 0, self.alpha), self.background)
+        self.paint(surface)
+        self.builds += 1
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert_alpha()
+        return surface
+
+    def draw(self, screen, position, key=None):
+        """Desenha o painel em position, refazendo-o se key mudou; devolve a área"""
+        if self.surface is None or key != self.key:
+            self.surface = self.render()
+            self.key = key
+        return screen.blit(self.surface, position)
@@ -0,0 +1,218 @@
+"""
+Fases do jogo: arquivos JSON compilados e validados, e pré-carregamento da próxima fase
+
+Cada fase é um arquivo em src/fases (fase1.json, fase2.json, ...), jogadas na
+ordem dos números. Os campos são os de Level.FIELDS; obstáculos, meta e
+título são opcionais. Uso: python src/levels.py (valida todas as fases)
+"""
+
+import functools
+import json
+import os
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from pathfinding import ObstacleMap
+
+LEVELS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fases")
+ANIMAL_TYPES = ("onça", "arara", "tamanduá", "boto", "macaco")
+
+
+class Level:
+    """Fase compilada: quantidades, cadências de spawn, velocidades e obstáculos
+
+    Os valores já vêm validados e em tipos imutáveis (tuplas); o mapa de
+    obstáculos de cada tamanho de mundo, com os vizinhos dos ladrilhos já
+    calculados para os campos de fluxo, fica guardado na própria fase.
+    """
+
+    # Campo -> (obrigatório, descrição usada nas mensagens de erro)
+    FIELDS = {
+        'title': (False, "texto"),
+        'hunters': (True, "inteiro >= 0 (caçadores iniciais)"),
+        'animals': (True, "inteiro >= 0 (animais iniciais)"),
+        'max_animals': (True, "inteiro >= 1 (animais vivos a partir do qual o spawn espera)"),
+        'hunter_spawn_interval': (True, "número > 0 (segundos entre caçadores)"),
+        'animal_spawn_interval': (True, "número > 0 (segundos entre animais)"),
+        'hunter_speed': (True, "[mínima, máxima] com 0 < mínima <= máxima"),
+        'animal_speed': (True, "[mínima, máxima] com 0 < mínima <= máxima"),
+        'animal_types': (True, "lista não vazia de tipos de animal (os de ANIMAL_TYPES)"),
+        'obstacles': (False, "lista de [x, y, largura, altura] inteiros, com largura e altura > 0"),
+        'goal': (False, "inteiro >= 1 (caçadores expulsos para vencer a fase) ou null (fase sem fim)"),
+    }
+
+    __slots__ = ("name", "title", "hunters", "animals", "max_animals", "hunter_spawn_interval",
+                 "animal_spawn_interval", "hunter_speed", "animal_speed", "animal_types",
+                 "obstacles", "goal", "maps")
+
+    def __init__(self, name=None, *, hunters, animals, max_animals, hunter_spawn_interval, animal_spawn_interval,
+                 hunter_speed, animal_speed, animal_types=ANIMAL_TYPES, title="", obstacles=(), goal=None):
+        self.name = name  # Nome do arquivo, sem extensão (None para fases criadas no código)
+        self.title = title
+        self.hunters = hunters
+        self.animals = animals
+        self.max_animals = max_animals
+        self.hunter_spawn_interval = hunter_spawn_interval
+        self.animal_spawn_interval = animal_spawn_interval
+        self.hunter_speed = tuple(hunter_speed)
+        self.animal_speed = tuple(animal_speed)
+        self.animal_types = tuple(animal_types)
+        self.obstacles = tuple(tuple(rect) for rect in obstacles)
+        self.goal = goal
+        self.maps = {}
+
+    def __repr__(self):
+        return f"Level({self.name!r})"
+
+    def obstacle_map(self, width, height):
+        """ObstacleMap desta fase num mundo width x height, com os vizinhos para os campos de fluxo prontos"""
+        obstacles = self.maps.get((width, height))
+        if obstacles is None:
+            obstacles = ObstacleMap(width, height, self.obstacles)
+            if obstacles:
+                obstacles.flow_fields()
+            self.maps[(width, height)] = obstacles
+        return obstacles
+
+
+def is_number(value):
+    """Indica se value é um número do JSON (bool não conta)"""
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def is_integer(value):
+    """Indica se value é um inteiro do JSON (bool não conta)"""
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def valid_field(field, value):
+    """Indica se value serve para o campo field de uma fase"""
+    if field == 'title':
+        return isinstance(value, str)
+    if field in ('hunters', 'animals'):
+        return is_integer(value) and value >= 0
+    if field == 'max_animals':
+        return is_integer(value) and value >= 1
+    if field in ('hunter_spawn_interval', 'animal_spawn_interval'):
+        return is_number(value) and value > 0
+    if field in ('hunter_speed', 'animal_speed'):
+        return (isinstance(value, list) and len(value) == 2 and all(is_number(v) for v in value)
+                and 0 < value[0] <= value[1])
+    if field == 'animal_types':
+        return isinstance(value, list) and value and all(isinstance(v, str) and v for v in value)
+    if field == 'obstacles':
+        return isinstance(value, list) and all(
+            isinstance(rect, list) and len(rect) == 4 and all(is_integer(v) for v in rect)
+            and rect[2] > 0 and rect[3] > 0 for rect in value)
+    if field == 'goal':
+        return value is None or (is_integer(value) and value >= 1)
+    return False
+
+
+def compile_level(data, name=None):
+    """Level a partir do conteúdo de um arquivo de fase; ValueError apontando todos os campos inválidos"""
+    label = name or "fase"
+    if not isinstance(data, dict):
+        raise ValueError(f"{label}: a fase deve ser um objeto JSON")
+    errors = [f"campo desconhecido: {field}" for field in data if field not in Level.FIELDS]
+    for field, (required, description) in Level.FIELDS.items():
+        if field not in data:
+            if required:
+                errors.append(f"falta o campo {field}: {description}")
+        elif not valid_field(field, data[field]):
+            errors.append(f"{field} deve ser {description}: {data[field]!r}")
+        elif field == 'animal_types':
+            errors.extend(f"animal_types tem um tipo desconhecido: {kind!r} (tipos: {', '.join(ANIMAL_TYPES)})"
+                          for kind in data[field] if kind not in ANIMAL_TYPES)
+    if errors:
+        raise ValueError(f"{label}: " + "; ".join(errors))
+    return Level(name, **data)
+
+
+@functools.lru_cache(maxsize=None)
+def compiled(path, mtime):
+    """Fase compilada do arquivo path (mtime entra na chave: um arquivo editado é lido de novo)"""
+    with open(path, encoding="utf-8") as source:
+        try:
+            data = json.load(source)
+        except json.JSONDecodeError as error:
+            raise ValueError(f"{path}: JSON inválido: {error}") from None
+    return compile_level(data, os.path.splitext(os.path.basename(path))[0])
+
+
+def load_level(name, directory=LEVELS_DIR):
+    """Fase name (o arquivo name.json em directory), compilada uma única vez"""
+    path = os.path.join(directory, name + ".json")
+    return compiled(path, os.stat(path).st_mtime_ns)
+
+
+def level_names(directory=LEVELS_DIR):
+    """Nomes das fases em directory, na ordem de jogo (pelo número no nome: fase2 antes de fase10)"""
+    names = [os.path.splitext(entry)[0] for entry in os.listdir(directory) if entry.endswith(".json")]
+    return sorted(names, key=lambda name: [int(part) if part.isdigit() else part
+                                           for part in re.split(r"(\d+)", name)])
+
+
+class Preloader:
+    """Carrega o que uma fase precisa numa thread de fundo, enquanto outra é jogada
+
+    request(key, load, *args) põe load(*args) na fila da thread (uma carga de
+    cada vez, na ordem dos pedidos) e take(key, load, *args) devolve o
+    resultado, esperando só se ele ainda não ficou pronto; sem pedido
+    anterior, take carrega ali mesmo. Erros da carga aparecem no take.
+    """
+
+    def __init__(self):
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="fases")
+        self.pending = {}
+
+    def request(self, key, load, *args):
+        """Começa a carregar key em segundo plano (nada acontece se já foi pedido)"""
+        if key not in self.pending:
+            self.pending[key] = self.executor.submit(load, *args)
+
+    def ready(self, key):
+        """Indica se key foi pedido e já está carregado"""
+        future = self.pending.get(key)
+        return future is not None and future.done()
+
+    def take(self, key, load=None, *args):
+        """Resultado da carga de key, feito agora se não foi pedido antes"""
+        future = self.pending.pop(key, None)
+        return future.result() if future is not None else load(*args)
+
+    def discard(self, key):
+        """Esquece a carga de key (cancelada, se ainda não começou)"""
+        future = self.pending.pop(key, None)
+        if future is not None:
+            future.cancel()
+
+    def shutdown(self):
+        """Descarta as cargas que nem começaram e espera a que está em andamento
+
+        A carga usa os caches de fontes e sprites, então ela tem de terminar
+        antes que eles sejam esvaziados e o pygame seja encerrado.
+        """
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        self.pending.clear()
+
+
+def main(argv):
+    directory = argv[0] if argv else LEVELS_DIR
+    failed = 0
+    for name in level_names(directory):
+        try:
+            level = load_level(name, directory)
+        except ValueError as error:
+            print(f"❌ {error}")
+            failed += 1
+            continue
+        goal = f"meta {level.goal} caçadores" if level.goal else "sem fim"
+        print(f"✅ {name}: {level.title or '(sem título)'} - {level.hunters} caçadores, {level.animals} animais, "
+              f"{len(level.obstacles)} obstáculos, {goal}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -2,14 +2,43 @@
 """
 Caipora: Guardiã da Amazônia
 Jogo educativo sobre preservação ambiental e ODS 15
+
+Uso: python src/main.py [--no-wait] [--frames N] [--startup-report [ARQUIVO.json]]
+                        [--memory [ARQUIVO.json]]
 """
 
+from startup import startup  # Antes de tudo: o relógio da inicialização começa aqui
+
+import argparse
+import json
 import sys
 
-def main():
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Caipora: Guardiã da Amazônia")
+    parser.add_argument("--no-wait", "-y", action="store_true",
+                        help="abre o jogo direto, sem esperar uma tecla no terminal")
+    parser.add_argument("--frames", type=int, help="sai depois de N quadros (para medir a inicialização)")
+    parser.add_argument("--startup-report", nargs="?", const="-", metavar="ARQUIVO",
+                        help="mostra os tempos da inicialização ao sair (ou os grava em JSON no ARQUIVO)")
+    parser.add_argument("--memory", nargs="?", const="memoria.json", metavar="ARQUIVO",
+                        help="liga o tracemalloc (o relatório do F3 passa a mostrar as linhas que mais "
+                             "alocaram) e grava o relatório de memória em JSON ao sair (padrão: memoria.json)")
+    return parser.parse_args(argv)
+
+
+def report_startup(destination):
+    """Mostra os tempos da inicialização ("-") ou os grava em JSON"""
+    if destination == "-":
+        print(startup.format())
+    else:
+        with open(destination, "w", encoding="utf-8") as output:
+            json.dump(startup.report(), output, indent=2)
+
+
+def main(argv=()):
+    args = parse_args(argv)
     try:
-        from game_compact import Game
-        
         print("═" * 55)
         print("🌳 CAIPORA: GUARDIÃ DA AMAZÔNIA 🐆")
         print("═" * 55)
@@ -17,14 +46,23 @@ def main():
         print("🎯 Objetivo: Proteja os animais dos caçadores!")
         print("🌱 Missão: Preservar a biodiversidade amazônica")
         print("═" * 55)
-        print("✨ Pressione qualquer tecla para começar...")
-        input()
+        # Sem terminal interativo (ou com --no-wait), não há tecla para esperar
+        if not args.no_wait and sys.stdin.isatty():
+            print("✨ Pressione Enter para começar...")
+            with startup.stage("espera no terminal"):
+                input()
         print("🎮 Iniciando jogo...")
-        
+
+        with startup.stage("import pygame"):
+            import pygame  # noqa: F401 (medido à parte: é a maior parte das importações)
+        with startup.stage("import game_compact"):
+            from game_compact import Game
+
         # Inicializa e executa o jogo
-        game = Game()
-        game.run()
-        
+        with startup.stage("Game()"):
+            game = Game(memory_dump=args.memory, memory_trace=args.memory is not None)
+        game.run(args.frames)
+
     except ImportError as e:
         print(f"❌ Erro ao importar o jogo: {e}")
         print("📋 Certifique-se de que o Pygame está instalado:")
@@ -33,8 +71,10 @@ def main():
     except Exception as e:
         print(f"❌ Erro inesperado: {e}")
         return 1
-    
+
+    if args.startup_report:
+        report_startup(args.startup_report)
     return 0
 
 if __name__ == "__main__":
-    sys.exit(main())
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,69 @@
+"""
+Instrumentação de memória: contagem de entidades, tracemalloc e pico de RSS
+"""
+
+import json
+import sys
+import time
+import tracemalloc
+from collections import deque
+
+try:
+    import resource
+except ImportError:  # Windows não tem o módulo resource
+    resource = None
+
+
+def peak_rss_kb():
+    """Pico de memória residente do processo em KB (None se não disponível)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak  # macOS informa em bytes
+
+
+class MemoryMonitor:
+    """Amostras periódicas de memória e entidades de uma simulação
+
+    O histórico tem tamanho fixo, para que o próprio monitor não cresça em
+    sessões longas. Com trace=True o tracemalloc é ligado e os relatórios
+    incluem as linhas que mais alocaram.
+    """
+
+    def __init__(self, trace=False, history=1440, top=10):
+        if trace and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        self.top = top
+        self.samples = deque(maxlen=history)
+        self.started = time.perf_counter()
+
+    def sample(self, sim):
+        """Guarda uma amostra resumida do estado atual e a devolve"""
+        sample = {
+            'ticks': sim.ticks,
+            'wall_s': round(time.perf_counter() - self.started, 3),
+            'entities': sim.entity_counts(),
+            'peak_rss_kb': peak_rss_kb(),
+        }
+        if tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            sample['traced_kb'] = current // 1024
+            sample['traced_peak_kb'] = peak // 1024
+        self.samples.append(sample)
+        return sample
+
+    def report(self, sim):
+        """Amostra atual, orçamento e (com tracemalloc) as linhas que mais alocaram"""
+        report = dict(self.sample(sim), budget=sim.budget.report())
+        if tracemalloc.is_tracing():
+            stats = tracemalloc.take_snapshot().statistics("lineno")[:self.top]
+            report['top_allocations'] = [
+                {'where': str(stat.traceback), 'size_kb': stat.size // 1024, 'count': stat.count}
+                for stat in stats]
+        return report
+
+    def dump(self, sim, path):
+        """Grava em JSON o relatório final e o histórico de amostras"""
+        with open(path, "w", encoding="utf-8") as output:
+            json.dump({'final': self.report(sim), 'samples': list(self.samples)}, output,
+                      ensure_ascii=False, indent=2)
@@ -0,0 +1,189 @@
+"""
+Mapa de obstáculos em ladrilhos e campos de fluxo compartilhados para os caçadores
+"""
+
+from array import array
+from collections import OrderedDict, deque
+
+# Vizinhos de um ladrilho: os quatro retos primeiro, depois as diagonais
+NEIGHBORS = ((1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (1, -1), (-1, 1), (-1, -1))
+NO_TILE = -1
+
+
+class ObstacleMap:
+    """Grade de ladrilhos livres ou bloqueados cobrindo o mundo
+
+    Os obstáculos são dados como retângulos em coordenadas do mundo; todo
+    ladrilho tocado por um deles fica bloqueado. O ladrilho é maior que
+    qualquer entidade, então quem vai de centro em centro de ladrilhos livres
+    passa sem raspar nos obstáculos.
+    """
+
+    TILE = 48
+
+    def __init__(self, width, height, rects=(), tile=TILE):
+        self.width, self.height = width, height
+        self.tile = tile
+        self.cols = -(-width // tile)
+        self.rows = -(-height // tile)
+        self.blocked = bytearray(self.cols * self.rows)
+        self.rects = []
+        self.paths = None
+        for rect in rects:
+            self.add(*rect)
+
+    def __bool__(self):
+        return bool(self.rects)
+
+    def add(self, x, y, width, height):
+        """Bloqueia os ladrilhos sob o retângulo (x, y, width, height)"""
+        self.rects.append((x, y, width, height))
+        self.paths = None
+        tile = self.tile
+        for row in range(max(0, y // tile), min(self.rows, (y + height - 1) // tile + 1)):
+            for col in range(max(0, x // tile), min(self.cols, (x + width - 1) // tile + 1)):
+                self.blocked[row * self.cols + col] = 1
+
+    def tile_at(self, x, y):
+        """Índice do ladrilho que contém o ponto (x, y), ou NO_TILE fora do mapa"""
+        col, row = int(x // self.tile), int(y // self.tile)
+        if 0 <= col < self.cols and 0 <= row < self.rows:
+            return row * self.cols + col
+        return NO_TILE
+
+    def tile_center(self, index):
+        """Centro do ladrilho, em coordenadas do mundo"""
+        row, col = divmod(index, self.cols)
+        return (col + 0.5) * self.tile, (row + 0.5) * self.tile
+
+    def blocks(self, x, y, width, height):
+        """Indica se o retângulo toca algum ladrilho bloqueado (fora do mapa nada bloqueia)"""
+        tile, cols, rows, blocked = self.tile, self.cols, self.rows, self.blocked
+        left, right = int(x // tile), int((x + width - 1) // tile)
+        top, bottom = int(y // tile), int((y + height - 1) // tile)
+        if left < 0:
+            left = 0
+        if right >= cols:
+            right = cols - 1
+        if left > right:
+            return False
+        for row in range(top if top > 0 else 0, bottom + 1 if bottom < rows else rows):
+            start = row * cols
+            if blocked[start + left] or blocked[start + right]:
+                return True
+            for col in range(left + 1, right):  # Só retângulos maiores que um ladrilho
+                if blocked[start + col]:
+                    return True
+        return False
+
+    def flow_fields(self):
+        """Campos de fluxo deste mapa, compartilhados por todas as simulações que o usam"""
+        if self.paths is None:
+            self.paths = FlowFields(self)
+        return self.paths
+
+    def links(self):
+        """Para cada ladrilho, (vizinhos retos, todos os vizinhos) livres e alcançáveis num passo
+
+        Diagonais só valem com os dois ladrilhos retos ao lado livres, para
+        não cortar o canto de um obstáculo. Ladrilhos bloqueados não têm vizinhos.
+        """
+        cols, rows, blocked = self.cols, self.rows, self.blocked
+        links = []
+        for index in range(cols * rows):
+            row, col = divmod(index, cols)
+            straight, near = [], []
+            if not blocked[index]:
+                for dc, dr in NEIGHBORS:
+                    c, r = col + dc, row + dr
+                    if not (0 <= c < cols and 0 <= r < rows) or blocked[r * cols + c]:
+                        continue
+                    if dc and dr:
+                        if blocked[row * cols + c] or blocked[r * cols + col]:
+                            continue
+                    else:
+                        straight.append(r * cols + c)
+                    near.append(r * cols + c)
+            links.append((tuple(straight), tuple(near)))
+        return links
+
+
+class FlowField:
+    """Próximo ladrilho rumo a um ladrilho de destino, para qualquer ladrilho de partida
+
+    Uma busca em largura a partir do destino, só pelos vizinhos retos, visita
+    os ladrilhos em ordem de distância. O próximo passo de cada ladrilho é o
+    primeiro vizinho dele (diagonais incluídas) a ser visitado, ou seja, o
+    mais perto do destino: os caminhos andam na diagonal sempre que podem e
+    tudo sai numa passada só. Destino, bloqueados e ladrilhos sem caminho
+    ficam com NO_TILE.
+    """
+
+    __slots__ = ("goal", "next")
+
+    def __init__(self, links, goal):
+        self.goal = goal
+        seen = bytearray(len(links))
+        seen[goal] = 1
+        next_tile = array('i', [NO_TILE]) * len(links)
+        next_tile[goal] = goal  # Marca provisória: o destino não aponta para ninguém
+        queue = deque([goal])
+        while queue:
+            index = queue.popleft()
+            straight, near = links[index]
+            for tile in near:
+                if next_tile[tile] == NO_TILE:
+                    next_tile[tile] = index
+            for tile in straight:
+                if not seen[tile]:
+                    seen[tile] = 1
+                    queue.append(tile)
+        next_tile[goal] = NO_TILE
+        self.next = next_tile
+
+
+class FlowFields:
+    """Campos de fluxo em cache por ladrilho de destino, compartilhados por todos os caçadores
+
+    O mapa não muda durante a partida, então o campo de um destino vale até
+    ser descartado: ele só é calculado quando um alvo entra num ladrilho que
+    ainda não está no cache, e caçadores atrás do mesmo alvo (ou de alvos no
+    mesmo ladrilho) usam o mesmo campo. Cada caçador paga só uma consulta por
+    passo. Guarda até capacity campos, descartando o usado há mais tempo.
+    """
+
+    def __init__(self, obstacles, capacity=256):
+        self.obstacles = obstacles
+        self.capacity = capacity
+        self.links = obstacles.links()
+        self.fields = OrderedDict()
+        self.builds = 0
+
+    def field(self, goal):
+        """Campo de fluxo rumo ao ladrilho goal"""
+        field = self.fields.get(goal)
+        if field is None:
+            field = self.fields[goal] = FlowField(self.links, goal)
+            self.builds += 1
+            if len(self.fields) > self.capacity:
+                self.fields.popitem(last=False)
+        else:
+            self.fields.move_to_end(goal)
+        return field
+
+    def waypoint(self, entity, target):
+        """Posição (canto superior esquerdo) para onde entity deve andar atrás de target
+
+        None quando basta ir reto: mesmo ladrilho, fora do mapa ou sem caminho.
+        """
+        obstacles = self.obstacles
+        half_w, half_h = entity.width / 2, entity.height / 2
+        start = obstacles.tile_at(entity.x + half_w, entity.y + half_h)
+        goal = obstacles.tile_at(target.x + target.width / 2, target.y + target.height / 2)
+        if start == goal or start == NO_TILE or goal == NO_TILE:
+            return None
+        step = self.field(goal).next[start]
+        if step == NO_TILE:
+            return None
+        x, y = obstacles.tile_center(step)
+        return x - half_w, y - half_h
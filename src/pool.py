@@ -0,0 +1,59 @@
+"""
+Reaproveitamento de entidades removidas e remoção em lote das listas da simulação
+"""
+
+
+class EntityPool:
+    """Lista livre de entidades removidas, reaproveitadas nos próximos spawns
+
+    A classe precisa de um método reset com os mesmos argumentos do construtor,
+    que deixe a entidade como recém-criada (inclusive nos sorteios de random).
+    """
+
+    def __init__(self, cls, limit=256):
+        self.cls = cls
+        self.limit = limit  # Máximo de entidades guardadas (0 desliga o reaproveitamento)
+        self.free = []
+        self.created = 0
+        self.reused = 0
+
+    def __len__(self):
+        return len(self.free)
+
+    def acquire(self, *args):
+        """Entidade nova ou reaproveitada, inicializada com args"""
+        if self.free:
+            entity = self.free.pop()
+            entity.reset(*args)
+            self.reused += 1
+            return entity
+        self.created += 1
+        return self.cls(*args)
+
+    def release(self, entity):
+        """Devolve uma entidade que saiu do jogo"""
+        if len(self.free) < self.limit:
+            self.free.append(entity)
+
+
+def remove_where(entities, predicate, pool=None):
+    """Remove, numa única passada e sem criar outra lista, as entidades em que predicate é verdadeiro
+
+    A ordem das restantes é preservada: as colisões e a escolha de alvo
+    desempatam pela posição na lista. Devolve as entidades removidas,
+    que também voltam ao pool, se houver.
+    """
+    removed = []
+    write = 0
+    for entity in entities:
+        if predicate(entity):
+            removed.append(entity)
+        else:
+            entities[write] = entity
+            write += 1
+    if removed:
+        del entities[write:]
+        if pool is not None:
+            for entity in removed:
+                pool.release(entity)
+    return removed
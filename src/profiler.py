@@ -0,0 +1,194 @@
+"""
+Perfilador de quadros: tempo de cada fase do loop, sobreposição na tela e exportação
+
+As fases são medidas com "with profiler.phase(nome):". Desligado, phase()
+devolve sempre o mesmo contexto vazio, sem ler o relógio nem guardar nada.
+Ligado, cada quadro (fechado por frame()) vira uma linha com o tempo total e
+o de cada fase; as últimas history linhas formam a janela usada nos
+percentis, no gráfico da sobreposição e na exportação em CSV. Os eventos
+individuais, com início e duração, vão para o formato de trace do Chrome
+(chrome://tracing ou Perfetto).
+"""
+
+import csv
+import json
+from collections import deque
+from time import perf_counter
+
+import pygame
+
+from text import render_text
+
+
+class NullPhase:
+    """Contexto que não faz nada, usado com o perfilador desligado"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_PHASE = NullPhase()
+
+
+class Phase:
+    """Contexto que mede uma fase e a registra no perfilador ao sair"""
+
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.record(self.name, self.start, perf_counter())
+        return False
+
+
+class Profiler:
+    """Tempos por fase e por quadro numa janela dos últimos history quadros"""
+
+    GRAPH_FRAMES = 120  # Quadros mostrados no gráfico da sobreposição
+    GRAPH_SCALE_MS = 33.3  # Altura do gráfico (dois quadros de 60 Hz)
+    OVERLAY_REFRESH = 15  # A sobreposição é refeita a cada tantos quadros
+    OVERLAY_WIDTH = 300
+
+    def __init__(self, history=600, max_events=20000):
+        self.enabled = False
+        self.rows = deque(maxlen=history)  # (quadro, total em s, {fase: s})
+        self.events = deque(maxlen=max_events)  # (fase, início, duração) em s
+        self.phases = []  # Nomes na ordem em que apareceram
+        self.current = {}
+        self.frames = 0
+        self.origin = self.frame_start = perf_counter()
+        self.overlay = None
+        self.overlay_key = None
+
+    def toggle(self):
+        """Liga ou desliga; ao ligar, começa uma janela nova"""
+        self.enabled = not self.enabled
+        if self.enabled:
+            self.clear()
+        return self.enabled
+
+    def clear(self):
+        """Descarta os quadros e eventos guardados"""
+        self.rows.clear()
+        self.events.clear()
+        self.current = {}
+        self.origin = self.frame_start = perf_counter()
+        self.overlay_key = None
+
+    def phase(self, name):
+        """Contexto que mede a fase name (vazio se o perfilador estiver desligado)"""
+        if not self.enabled:
+            return NULL_PHASE
+        return Phase(self, name)
+
+    def record(self, name, start, end):
+        """Soma a duração de uma fase ao quadro atual e guarda o evento"""
+        duration = end - start
+        if name not in self.current:
+            self.current[name] = 0.0
+            if name not in self.phases:
+                self.phases.append(name)
+        self.current[name] += duration
+        self.events.append((name, start, duration))
+
+    def frame(self):
+        """Fecha o quadro atual"""
+        if not self.enabled:
+            return
+        now = perf_counter()
+        self.rows.append((self.frames, now - self.frame_start, self.current))
+        self.current = {}
+        self.frame_start = now
+        self.frames += 1
+
+    def samples(self, name=None):
+        """Tempos (s) da fase name em cada quadro da janela; None = tempo total do quadro"""
+        if name is None:
+            return [total for _, total, _ in self.rows]
+        return [phases.get(name, 0.0) for _, _, phases in self.rows]
+
+    def percentiles(self, name=None, points=(50, 95, 99)):
+        """Percentis, em ms, da fase name (ou do quadro) na janela"""
+        ordered = sorted(self.samples(name))
+        if not ordered:
+            return [0.0] * len(points)
+        last = len(ordered) - 1
+        return [ordered[round(point / 100 * last)] * 1000 for point in points]
+
+    def export_csv(self, path):
+        """Grava um quadro por linha: número, total e cada fase, em ms"""
+        with open(path, "w", newline="", encoding="utf-8") as output:
+            writer = csv.writer(output)
+            writer.writerow(["frame", "total_ms"] + [f"{name}_ms" for name in self.phases])
+            for frame, total, phases in self.rows:
+                writer.writerow([frame, round(total * 1000, 4)] +
+                                [round(phases.get(name, 0.0) * 1000, 4) for name in self.phases])
+
+    def export_chrome_trace(self, path):
+        """Grava os eventos no formato JSON de trace do Chrome (tempos em µs)"""
+        events = [{'name': name, 'ph': 'X', 'pid': 0, 'tid': 0,
+                   'ts': round((start - self.origin) * 1e6, 1), 'dur': round(duration * 1e6, 1)}
+                  for name, start, duration in self.events]
+        with open(path, "w", encoding="utf-8") as output:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, output)
+
+    def draw_overlay(self, screen, position=None):
+        """Desenha o gráfico de quadros e os percentis por fase; devolve a área (ou None, se desligado)"""
+        if not self.enabled:
+            return None
+        key = (self.frames // self.OVERLAY_REFRESH, len(self.phases))
+        if self.overlay is None or key != self.overlay_key:
+            self.overlay = self.render_overlay()
+            self.overlay_key = key
+        if position is None:
+            position = (screen.get_width() - self.OVERLAY_WIDTH - 10, 10)
+        return screen.blit(self.overlay, position)
+
+    def render_overlay(self):
+        """Superfície da sobreposição com os dados atuais"""
+        graph_height = 60
+        rows = [("quadro", self.percentiles())] + [(name, self.percentiles(name)) for name in self.phases]
+        surface = pygame.Surface((self.OVERLAY_WIDTH, graph_height + 30 + 16 * len(rows)), pygame.SRCALPHA)
+        surface.fill((0, 0, 0, 190))
+
+        # Gráfico: uma barra por quadro e a linha de 16,7 ms (60 quadros/s)
+        totals = self.samples()[-self.GRAPH_FRAMES:]
+        bar = (self.OVERLAY_WIDTH - 20) / self.GRAPH_FRAMES
+        for i, total in enumerate(totals):
+            ms = total * 1000
+            height = min(graph_height, round(ms / self.GRAPH_SCALE_MS * graph_height))
+            color = (0, 200, 0) if ms <= 16.7 else (255, 200, 0) if ms <= 33.3 else (255, 60, 60)
+            pygame.draw.line(surface, color, (10 + i * bar, 10 + graph_height),
+                             (10 + i * bar, 10 + graph_height - height))
+        limit = 10 + graph_height - round(16.7 / self.GRAPH_SCALE_MS * graph_height)
+        pygame.draw.line(surface, (255, 255, 255), (10, limit), (self.OVERLAY_WIDTH - 10, limit))
+
+        # Tabela de percentis, com os números alinhados à direita de cada coluna
+        y = graph_height + 16
+        columns = (160, 220, 280)
+        surface.blit(render_text("fase (ms)", 18, (200, 200, 200)), (10, y))
+        for x, label in zip(columns, ("p50", "p95", "p99")):
+            text = render_text(label, 18, (200, 200, 200))
+            surface.blit(text, text.get_rect(topright=(x, y)))
+        for name, values in rows:
+            y += 16
+            surface.blit(render_text(name, 18, (255, 255, 255)), (10, y))
+            for x, value in zip(columns, values):
+                text = render_text(f"{value:.2f}", 18, (255, 255, 255))
+                surface.blit(text, text.get_rect(topright=(x, y)))
+        return surface
+
+
+profiler = Profiler()
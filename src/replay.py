@@ -0,0 +1,237 @@
+"""
+Gravação e reprodução de partidas: a semente da simulação e a entrada de cada passo
+
+Como todos os sorteios saem do rng da Simulation, a semente e a sequência de
+entradas bastam para refazer a partida inteira, sem janela e sem limite de
+velocidade. A cada CHECKPOINT_TICKS passos a gravação guarda um resumo do
+estado, para apontar o primeiro trecho em que uma reprodução divergiu. A
+gravação também diz qual simulação a produziu (as regras do game.py e do
+game_compact.py não são as mesmas), e é essa que a reprodução usa.
+
+Uso: python src/replay.py partida.json [--array] [--until PASSO]
+"""
+
+import hashlib
+import importlib
+import json
+import os
+import sys
+import time
+
+from levels import load_level
+from pathfinding import ObstacleMap
+
+FORMAT_VERSION = 1
+CHECKPOINT_TICKS = 600  # Um resumo do estado a cada 10 segundos simulados
+# Simulações que uma gravação pode pedir ("módulo.Classe"); gravações sem o campo são da primeira
+SIMULATIONS = ("game.Simulation", "game_compact.Simulation", "array_simulation.ArraySimulation")
+
+
+def encode_input(dx, dy):
+    """Direção (dx, dy), com cada eixo em -1, 0 ou 1, como um código de 0 a 8"""
+    return (dx + 1) * 3 + (dy + 1)
+
+
+def decode_input(code):
+    """Inverso de encode_input"""
+    return code // 3 - 1, code % 3 - 1
+
+
+def state_digest(sim):
+    """Resumo (SHA-1) do snapshot da simulação"""
+    return hashlib.sha1(repr(sim.snapshot()).encode()).hexdigest()
+
+
+def simulation_name(cls):
+    """Nome "módulo.Classe" de uma classe de simulação, como gravado"""
+    module = cls.__module__
+    if module == "__main__":  # game_compact.py executado direto
+        module = os.path.splitext(os.path.basename(sys.modules[module].__file__))[0]
+    return f"{module}.{cls.__qualname__}"
+
+
+def simulation_class(name):
+    """Classe de simulação a partir do nome gravado (só as de SIMULATIONS)"""
+    if name not in SIMULATIONS:
+        raise ValueError(f"simulação desconhecida na gravação: {name!r}")
+    module, _, attr = name.rpartition(".")
+    return getattr(importlib.import_module(module), attr)
+
+
+def run_lengths(codes):
+    """Comprime a sequência de códigos em "código:repetições", separados por vírgula"""
+    runs = []
+    start = 0
+    for i in range(1, len(codes) + 1):
+        if i == len(codes) or codes[i] != codes[start]:
+            runs.append(f"{codes[start]}:{i - start}")
+            start = i
+    return ",".join(runs)
+
+
+def expand_runs(text):
+    """Inverso de run_lengths"""
+    codes = bytearray()
+    for run in filter(None, text.split(",")):
+        code, count = run.split(":")
+        codes += bytes([int(code)]) * int(count)
+    return codes
+
+
+class InputRecorder:
+    """Grava a entrada de cada passo de uma simulação, um byte por passo"""
+
+    def __init__(self, sim):
+        if sim.seed is None:
+            raise ValueError("só partidas criadas com semente podem ser gravadas")
+        self.sim = sim
+        self.inputs = bytearray()
+        self.checkpoints = {}
+        # Placar herdado das fases anteriores, para a reprodução começar dele
+        stats = getattr(sim, 'stats', None)
+        self.stats = {field: getattr(stats, field) for field in stats.FIELDS} if stats else {}
+
+    def __len__(self):
+        return len(self.inputs)
+
+    def step(self, inputs):
+        """Avança a simulação um passo com inputs, gravando a entrada"""
+        if self.sim.game_over:
+            return
+        self.inputs.append(encode_input(*inputs))
+        self.sim.step(inputs)
+        if self.sim.ticks % CHECKPOINT_TICKS == 0:
+            self.checkpoints[self.sim.ticks] = state_digest(self.sim)
+
+    def to_dict(self):
+        """Gravação em tipos JSON"""
+        obstacles = getattr(self.sim, 'obstacles', None)  # A simulação compacta não tem obstáculos nem fases
+        level = getattr(self.sim, 'level', None)
+        return {
+            'version': FORMAT_VERSION,
+            'simulation': simulation_name(type(self.sim)),
+            'seed': self.sim.seed,
+            'size': [self.sim.width, self.sim.height],
+            'obstacles': [list(rect) for rect in obstacles.rects] if obstacles else [],
+            'level': level.name if level is not None else None,
+            'stats': self.stats,
+            'ticks': len(self.inputs),
+            'inputs': run_lengths(self.inputs),
+            'checkpoints': {str(tick): digest for tick, digest in self.checkpoints.items()},
+            'digest': state_digest(self.sim),
+        }
+
+    def save(self, path):
+        """Grava a partida em JSON"""
+        with open(path, "w", encoding="utf-8") as output:
+            json.dump(self.to_dict(), output)
+
+
+class Replay:
+    """Partida gravada, reproduzível em qualquer backend da Simulation"""
+
+    def __init__(self, seed, size, inputs, checkpoints=None, digest=None, obstacles=(), level=None, stats=None,
+                 simulation=SIMULATIONS[0]):
+        self.simulation_name = simulation  # Classe que gravou a partida ("módulo.Classe")
+        self.seed = seed
+        self.size = tuple(size)
+        self.obstacles = [tuple(rect) for rect in obstacles]
+        self.level = level  # Nome do arquivo da fase (None: as constantes das classes)
+        self.stats = stats or {}
+        self.inputs = inputs
+        self.checkpoints = checkpoints or {}
+        self.digest = digest
+
+    def __len__(self):
+        return len(self.inputs)
+
+    @classmethod
+    def from_dict(cls, data):
+        if data.get('version') != FORMAT_VERSION:
+            raise ValueError(f"versão de gravação não suportada: {data.get('version')}")
+        checkpoints = {int(tick): digest for tick, digest in data.get('checkpoints', {}).items()}
+        simulation = data.get('simulation', SIMULATIONS[0])
+        if simulation not in SIMULATIONS:
+            raise ValueError(f"simulação desconhecida na gravação: {simulation!r}")
+        return cls(data['seed'], data['size'], expand_runs(data['inputs']), checkpoints, data.get('digest'),
+                   data.get('obstacles', ()), data.get('level'), data.get('stats'), simulation)
+
+    @classmethod
+    def load(cls, path):
+        """Lê uma gravação feita por InputRecorder.save"""
+        with open(path, encoding="utf-8") as source:
+            return cls.from_dict(json.load(source))
+
+    def simulation(self, cls=None):
+        """Simulação nova (de cls, por padrão a que gravou a partida) no estado inicial da gravação"""
+        if cls is None:
+            cls = simulation_class(self.simulation_name)
+        options = {}
+        if self.obstacles:
+            options['obstacles'] = ObstacleMap(*self.size, self.obstacles)
+        if self.level:
+            options['level'] = load_level(self.level)
+        if any(self.stats.values()):
+            from game import Stats
+            options['stats'] = stats = Stats()
+            for field, value in self.stats.items():
+                setattr(stats, field, value)
+        return cls(*self.size, seed=self.seed, **options)
+
+    def play(self, sim, until=None):
+        """Aplica as entradas gravadas a sim até o passo until (ou até o fim)
+
+        Devolve o primeiro passo de checkpoint cujo resumo não confere, ou None.
+        """
+        mismatch = None
+        for code in self.inputs[sim.ticks:until]:
+            sim.step(decode_input(code))
+            expected = self.checkpoints.get(sim.ticks)
+            if mismatch is None and expected is not None and expected != state_digest(sim):
+                mismatch = sim.ticks
+        return mismatch
+
+    def verify(self, cls=None):
+        """Reproduz a partida inteira e indica se o estado final confere com o gravado"""
+        sim = self.simulation(cls)
+        mismatch = self.play(sim)
+        return mismatch is None and (self.digest is None or state_digest(sim) == self.digest)
+
+
+def main(argv):
+    if not argv:
+        print(__doc__.strip().splitlines()[-1])
+        return 2
+    replay = Replay.load(argv[0])
+    until = int(argv[argv.index("--until") + 1]) if "--until" in argv else None
+    if "--array" in argv:
+        if replay.simulation_name != "game.Simulation":
+            print(f"❌ a ArraySimulation segue as regras da game.Simulation; esta partida foi gravada "
+                  f"pela {replay.simulation_name}")
+            return 1
+        if replay.obstacles:  # Toda partida gravada pelo Game tem os obstáculos da fase
+            print(f"❌ a ArraySimulation ainda não trata obstáculos e esta partida tem {len(replay.obstacles)}; "
+                  "reproduza sem --array")
+            return 1
+        from array_simulation import ArraySimulation as cls
+    else:
+        cls = simulation_class(replay.simulation_name)
+
+    sim = replay.simulation(cls)
+    start = time.perf_counter()
+    mismatch = replay.play(sim, until)
+    elapsed = time.perf_counter() - start
+    print(f"{sim.ticks} passos em {elapsed:.2f} s ({sim.ticks / max(elapsed, 1e-9):.0f} passos/s), "
+          f"semente {replay.seed}, pontuação {sim.score}")
+    if mismatch is not None:
+        print(f"DIVERGIU no checkpoint do passo {mismatch}")
+        return 1
+    if until is None and replay.digest is not None:
+        ok = state_digest(sim) == replay.digest
+        print("estado final confere" if ok else "estado final DIVERGIU")
+        return 0 if ok else 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,49 @@
+"""
+Escalonador da IA: decisões caras distribuídas entre os passos, com nível de detalhe por distância
+"""
+
+
+class AIScheduler:
+    """Baldes em rodízio para as decisões de caçadores e animais
+
+    Decisões são a troca de alvo e o rumo (com a consulta ao campo de fluxo)
+    dos caçadores e a leitura do mapa de medo pelos animais. Cada entidade
+    recebe um balde (ai_slot) ao entrar na partida, em rodízio entre period
+    baldes; a cada passo um balde está ativo. Quem está perto da Caipora
+    (dentro de um quadrado de lado 2 * near) decide todo passo; quem está
+    longe só decide quando o seu balde está ativo, ou seja, a cada period
+    passos, e até lá segue com a última decisão. O movimento continua sendo
+    integrado todo passo, então o número de decisões por passo fica perto de
+    (perto + longe / period) em vez de crescer com a população inteira.
+    """
+
+    PERIOD = 4
+    NEAR = 512  # Meia largura do quadrado em volta da Caipora (meia tela, com folga)
+
+    def __init__(self, period=PERIOD, near=NEAR):
+        self.period = period
+        self.near = near
+        self.next_slot = 0
+        self.active = 0
+
+    def assign(self, entity):
+        """Põe a entidade no próximo balde do rodízio"""
+        entity.ai_slot = self.next_slot
+        self.next_slot = (self.next_slot + 1) % self.period
+
+    def bucket(self, tick):
+        """Balde ativo no passo tick"""
+        return tick % self.period
+
+    def begin(self, tick):
+        """Ativa o balde do passo tick"""
+        self.active = self.bucket(tick)
+
+    def window(self, caipora):
+        """(esquerda, topo, direita, base) da área, aberta, em que todos decidem todo passo
+
+        Uma entidade decide num passo se o balde dela é o ativo ou se (x, y)
+        está dentro dessa área; os laços fazem a conta em linha.
+        """
+        near = self.near
+        return caipora.x - near, caipora.y - near, caipora.x + near, caipora.y + near
@@ -0,0 +1,191 @@
+"""
+Grade espacial uniforme para consultas de colisão e proximidade
+"""
+
+
+class SpatialHash:
+    """Grade de células que guarda índices de entidades pelos seus retângulos
+
+    As consultas devolvem candidatos em ordem crescente de índice, para que o
+    resultado seja o mesmo de percorrer a lista original de entidades. Com
+    menos de linear_limit entidades a grade nem é montada: as consultas
+    devolvem todos os índices, o que sai mais barato que calcular células
+    (quem consulta sempre confere a colisão ou a distância exata).
+    """
+
+    def __init__(self, cell_size=80, linear_limit=128):
+        self.cell_size = cell_size
+        self.linear_limit = linear_limit
+        self.cells = {}
+        self.linear = None  # range de todos os índices, se a grade não foi montada
+
+    def clear(self):
+        """Esvazia a grade"""
+        self.cells.clear()
+        self.linear = None
+
+    def cell_range(self, left, top, right, bottom):
+        """Intervalos de células (colunas, linhas) que cobrem a área dada"""
+        size = self.cell_size
+        return (range(int(left // size), int(right // size) + 1),
+                range(int(top // size), int(bottom // size) + 1))
+
+    def insert(self, index, rect):
+        """Insere o índice em todas as células tocadas pelo retângulo"""
+        cols, rows = self.cell_range(rect.left, rect.top, rect.right - 1, rect.bottom - 1)
+        cells = self.cells
+        for cx in cols:
+            for cy in rows:
+                cell = cells.get((cx, cy))
+                if cell is None:
+                    cells[(cx, cy)] = [index]
+                else:
+                    cell.append(index)
+
+    def build(self, entities):
+        """Reconstrói a grade a partir de uma lista de entidades com .rect"""
+        self.clear()
+        if len(entities) < self.linear_limit:
+            self.linear = range(len(entities))
+            return
+        for index, entity in enumerate(entities):
+            self.insert(index, entity.rect)
+
+    def query_area(self, left, top, right, bottom):
+        """Índices (ordenados) das entidades nas células que cobrem a área"""
+        if self.linear is not None:
+            return self.linear
+        cols, rows = self.cell_range(left, top, right, bottom)
+        cells = self.cells
+        found = set()
+        for cx in cols:
+            for cy in rows:
+                cell = cells.get((cx, cy))
+                if cell:
+                    found.update(cell)
+        return sorted(found)
+
+    def query_rect(self, rect):
+        """Candidatos a colidir com o retângulo"""
+        return self.query_area(rect.left, rect.top, rect.right - 1, rect.bottom - 1)
+
+    def query_radius(self, x, y, radius):
+        """Candidatos a estar a até radius pixels do ponto (x, y)
+
+        A área é alargada em 1 pixel porque os retângulos guardam posições
+        inteiras, enquanto as entidades se movem em coordenadas reais.
+        """
+        reach = radius + 1
+        return self.query_area(x - reach, y - reach, x + reach, y + reach)
+
+
+class NearestIndex:
+    """Índice de vizinho mais próximo sobre pontos, com busca em anéis de células
+
+    Cada item tem uma ordem de desempate; entre itens à mesma distância vence
+    o de menor ordem, como o min() sobre a lista original.
+    """
+
+    def __init__(self, cell_size=128):
+        self.cell_size = cell_size
+        self.cells = {}
+        self.entries = {}  # item -> (x, y, célula, ordem)
+        self.bounds = None  # Colunas/linhas extremas ocupadas (recalculadas sob demanda)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, item):
+        return item in self.entries
+
+    def cell_of(self, x, y):
+        """Célula que contém o ponto"""
+        return int(x // self.cell_size), int(y // self.cell_size)
+
+    def add(self, item, x, y, order):
+        """Insere um item na posição (x, y)"""
+        cell = self.cell_of(x, y)
+        self.entries[item] = (x, y, cell, order)
+        self.put(item, cell)
+
+    def discard(self, item):
+        """Remove o item, se presente"""
+        entry = self.entries.pop(item, None)
+        if entry is not None:
+            self.take(item, entry[2])
+
+    def move(self, item, x, y):
+        """Atualiza a posição de um item já indexado"""
+        _, _, old_cell, order = self.entries[item]
+        cell = self.cell_of(x, y)
+        self.entries[item] = (x, y, cell, order)
+        if cell != old_cell:
+            self.take(item, old_cell)
+            self.put(item, cell)
+
+    def put(self, item, cell):
+        bucket = self.cells.get(cell)
+        if bucket is None:
+            self.cells[cell] = [item]
+            self.bounds = None
+        else:
+            bucket.append(item)
+
+    def take(self, item, cell):
+        bucket = self.cells[cell]
+        bucket.remove(item)
+        if not bucket:
+            del self.cells[cell]
+            self.bounds = None
+
+    def occupied_bounds(self):
+        """Menor e maior coluna/linha com itens"""
+        if self.bounds is None:
+            cols = [cx for cx, _ in self.cells]
+            rows = [cy for _, cy in self.cells]
+            self.bounds = (min(cols), min(rows), max(cols), max(rows))
+        return self.bounds
+
+    def nearest(self, x, y):
+        """Item mais próximo de (x, y), ou None se o índice estiver vazio"""
+        if not self.entries:
+            return None
+
+        qx, qy = self.cell_of(x, y)
+        min_cx, min_cy, max_cx, max_cy = self.occupied_bounds()
+        last_ring = max(qx - min_cx, max_cx - qx, qy - min_cy, max_cy - qy)
+        cells, entries, size = self.cells, self.entries, self.cell_size
+        best, best_key = None, None
+
+        for ring in range(last_ring + 1):
+            # Itens em anéis mais externos estão a pelo menos ring * size de distância
+            if best_key is not None and best_key[0] < ((ring - 1) * size) ** 2:
+                break
+            for cell in self.ring_cells(qx, qy, ring):
+                bucket = cells.get(cell)
+                if not bucket:
+                    continue
+                for item in bucket:
+                    ix, iy, _, order = entries[item]
+                    dx, dy = x - ix, y - iy
+                    key = (dx * dx + dy * dy, order)
+                    if best_key is None or key < best_key:
+                        best, best_key = item, key
+        return best
+
+    def nearest_many(self, points):
+        """Consulta em lote: o item mais próximo de cada ponto (x, y)"""
+        return [self.nearest(x, y) for x, y in points]
+
+    @staticmethod
+    def ring_cells(qx, qy, ring):
+        """Células à distância de Chebyshev exata ring da célula (qx, qy)"""
+        if ring == 0:
+            yield qx, qy
+            return
+        for cx in range(qx - ring, qx + ring + 1):
+            yield cx, qy - ring
+            yield cx, qy + ring
+        for cy in range(qy - ring + 1, qy + ring):
+            yield qx - ring, cy
+            yield qx + ring, cy
@@ -0,0 +1,63 @@
+"""
+Atlas de sprites: cada estado visual das entidades é desenhado uma única vez
+"""
+
+import threading
+
+import pygame
+
+
+class SpriteAtlas:
+    """Superfícies pré-renderizadas por estado visual
+
+    O estado é desenhado sobre o retângulo da entidade com uma margem em volta
+    (para aura, rótulo e detalhes que saem do retângulo) e depois recortado
+    ao que foi realmente pintado. Como as primitivas não usam transparência
+    parcial, o fundo vira colorkey com RLE, que é bem mais rápido de copiar
+    que alfa por pixel. A thread que pré-carrega a próxima fase também pinta
+    estados novos; a trava só é tomada quando o estado ainda não existe.
+    """
+
+    COLORKEY = (255, 0, 255)  # Cor que nenhum desenho do jogo usa
+
+    def __init__(self):
+        self.sprites = {}
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.sprites)
+
+    def get(self, key, size, margin, paint, *args):
+        """(superfície, deslocamento) do estado key; paint(surface, rect, *args) o desenha na primeira vez"""
+        sprite = self.sprites.get(key)
+        if sprite is not None:
+            return sprite
+        with self.lock:
+            sprite = self.sprites.get(key)  # Outra thread pode ter pintado enquanto esta esperava
+            if sprite is not None:
+                return sprite
+            width, height = size
+            canvas = pygame.Surface((width + 2 * margin, height + 2 * margin))
+            canvas.fill(self.COLORKEY)
+            canvas.set_colorkey(self.COLORKEY)
+            paint(canvas, pygame.Rect(margin, margin, width, height), *args)
+            bounds = canvas.get_bounding_rect()
+            surface = canvas.subsurface(bounds).copy()
+            surface.set_colorkey(self.COLORKEY, pygame.RLEACCEL)
+            if pygame.display.get_surface() is not None:
+                surface = surface.convert()
+            sprite = self.sprites[key] = (surface, (bounds.x - margin, bounds.y - margin))
+            return sprite
+
+    def blit(self, screen, rect, key, margin, paint, *args):
+        """Desenha o sprite do estado key com a entidade ocupando rect"""
+        surface, (dx, dy) = self.get(key, rect.size, margin, paint, *args)
+        return screen.blit(surface, (rect.x + dx, rect.y + dy))
+
+    def clear(self):
+        """Descarta os sprites (por exemplo, depois de trocar o modo de vídeo)"""
+        with self.lock:
+            self.sprites.clear()
+
+
+atlas = SpriteAtlas()
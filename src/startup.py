@@ -0,0 +1,78 @@
+"""
+Medição da inicialização: importações, subsistemas do pygame e tempo até o primeiro quadro
+
+O relógio começa quando este módulo é importado, então o main.py o importa
+antes de tudo. Cada etapa é medida com "with startup.stage(nome):" e o
+primeiro quadro apresentado é marcado por first_frame(), chamado pelo loop
+do jogo a cada quadro (só o primeiro conta).
+"""
+
+import sys
+import time
+from contextlib import contextmanager
+
+
+class StartupTimer:
+    """Duração das etapas da inicialização e tempo até o primeiro quadro, em ms desde origin"""
+
+    def __init__(self, origin=None):
+        self.origin = time.perf_counter() if origin is None else origin
+        self.stages = []  # (nome, início, fim), em ms desde origin
+        self.first_frame_ms = None
+        self.modules = []  # Subsistemas do pygame ligados no primeiro quadro
+
+    def now(self):
+        """Milissegundos desde origin"""
+        return (time.perf_counter() - self.origin) * 1000
+
+    @contextmanager
+    def stage(self, name):
+        """Mede o bloco como a etapa name"""
+        start = self.now()
+        try:
+            yield
+        finally:
+            self.stages.append((name, start, self.now()))
+
+    def first_frame(self):
+        """Marca o primeiro quadro apresentado (chamadas seguintes não mudam nada)"""
+        if self.first_frame_ms is None:
+            self.first_frame_ms = self.now()
+            self.modules = pygame_modules()
+
+    def report(self):
+        """Etapas (duração e fim, na ordem em que começaram), tempo até o primeiro quadro e subsistemas do pygame"""
+        return {
+            'stages': [{'name': name, 'ms': end - start, 'end_ms': end} for name, start, end in sorted(
+                self.stages, key=lambda stage: stage[1])],
+            'first_frame_ms': self.first_frame_ms,
+            'pygame_modules': self.modules,
+        }
+
+    def format(self):
+        """Relatório em texto, uma etapa por linha"""
+        report = self.report()
+        lines = [f"{stage['name']:<28} {stage['ms']:>8.1f} ms  (até {stage['end_ms']:.1f} ms)"
+                 for stage in report['stages']]
+        if self.first_frame_ms is not None:
+            lines.append(f"{'primeiro quadro':<28} {self.first_frame_ms:>8.1f} ms")
+            lines.append("subsistemas do pygame no primeiro quadro: " + (", ".join(self.modules) or "nenhum"))
+        return "\n".join(lines)
+
+
+def pygame_modules():
+    """Subsistemas do pygame inicializados (sem importar o pygame, se ele ainda não foi importado)"""
+    pygame = sys.modules.get("pygame")
+    if pygame is None:
+        return []
+    names = []
+    for name in ("display", "font", "mixer", "joystick"):
+        try:
+            if getattr(pygame, name).get_init():
+                names.append(name)
+        except (AttributeError, NotImplementedError):  # Módulo ausente nesta instalação do pygame
+            pass
+    return names
+
+
+startup = StartupTimer()
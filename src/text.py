@@ -0,0 +1,92 @@
+"""
+Registro de fontes e cache de textos renderizados
+
+Os dois são usados também pela thread que pré-carrega a próxima fase, por
+isso cada um tem uma trava em volta do que muda.
+"""
+
+import threading
+from collections import OrderedDict
+
+import pygame
+
+
+class FontRegistry:
+    """Fontes compartilhadas pelo processo, criadas uma única vez por (face, tamanho)"""
+
+    def __init__(self):
+        self.fonts = {}
+        self.lock = threading.Lock()
+
+    def get(self, size, face=None):
+        """Fonte com a face (None = padrão do pygame) e o tamanho pedidos"""
+        with self.lock:
+            if not pygame.font.get_init():
+                self.fonts.clear()  # Fontes de antes de um pygame.quit não servem mais
+                pygame.font.init()  # Só quando a primeira fonte é pedida
+            key = (face, size)
+            font = self.fonts.get(key)
+            if font is None:
+                font = self.fonts[key] = pygame.font.Font(face, size)
+            return font
+
+    def clear(self):
+        """Descarta as fontes (necessário depois de pygame.quit)"""
+        with self.lock:
+            self.fonts.clear()
+
+
+class TextCache:
+    """Cache LRU de superfícies de texto por (texto, tamanho, cor, antialias, face)
+
+    As superfícies devolvidas são compartilhadas: quem as recebe só deve
+    desenhá-las, nunca alterá-las.
+    """
+
+    def __init__(self, fonts, capacity=256):
+        self.fonts = fonts
+        self.capacity = capacity
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()  # A ordem do LRU muda até nos acertos
+
+    def __len__(self):
+        return len(self.surfaces)
+
+    def render(self, text, size, color, antialias=True, face=None):
+        """Superfície do texto, renderizada só na primeira vez que é pedida"""
+        key = (text, size, tuple(color), antialias, face)
+        with self.lock:
+            surface = self.surfaces.get(key)
+            if surface is not None:
+                self.hits += 1
+                self.surfaces.move_to_end(key)
+                return surface
+
+            self.misses += 1
+            surface = self.fonts.get(size, face).render(text, antialias, color)
+            self.surfaces[key] = surface
+            if len(self.surfaces) > self.capacity:
+                self.surfaces.popitem(last=False)
+            return surface
+
+    def stats(self):
+        """Contadores de acertos e falhas do cache"""
+        return {'hits': self.hits, 'misses': self.misses,
+                'size': len(self.surfaces), 'capacity': self.capacity}
+
+    def clear(self):
+        """Esvazia o cache e zera os contadores"""
+        with self.lock:
+            self.surfaces.clear()
+            self.hits = self.misses = 0
+
+
+fonts = FontRegistry()
+text_cache = TextCache(fonts)
+
+
+def render_text(text, size, color, antialias=True, face=None):
+    """Renderiza o texto usando o registro de fontes e o cache global"""
+    return text_cache.render(text, size, color, antialias, face)
@@ -0,0 +1,68 @@
+"""
+Agenda central de temporizadores da simulação, em passos
+"""
+
+
+class Timer:
+    """Um agendamento pendente; cancelado ou disparado, callback vira None"""
+
+    __slots__ = ("wheel", "due", "callback", "args")
+
+    def __init__(self, wheel, due, callback, args):
+        self.wheel = wheel
+        self.due = due
+        self.callback = callback
+        self.args = args
+
+    def cancel(self):
+        """Desiste do agendamento (nada acontece se ele já disparou)"""
+        self.callback = None
+
+    @property
+    def remaining(self):
+        """Passos até disparar (0 se já disparou ou foi cancelado)"""
+        return self.due - self.wheel.now if self.callback is not None else 0
+
+
+class TimerWheel:
+    """Roda de tempo com um balde por passo e fase, no lugar de contadores por entidade
+
+    Quem precisa de algo daqui a n passos agenda uma função, que é chamada
+    na fase dada (as mesmas do perfilador: "hunters", "animals", ...) do
+    passo now + n. Cada fase de cada passo custa uma busca num dicionário,
+    mais as funções que vencem nela: entidades paradas não custam nada e
+    milhares de agendamentos pendentes não pesam no passo. Os agendamentos
+    de um mesmo balde disparam na ordem em que foram feitos.
+    """
+
+    def __init__(self):
+        self.now = 0
+        self.buckets = {}  # (passo, fase) -> [Timer]
+
+    def schedule(self, delay, phase, callback, *args):
+        """Chama callback(*args) na fase phase do passo now + delay (delay >= 1); devolve o Timer"""
+        if delay < 1:
+            raise ValueError("delay deve ser de pelo menos um passo: %r" % delay)
+        timer = Timer(self, self.now + delay, callback, args)
+        key = (timer.due, phase)
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            self.buckets[key] = [timer]
+        else:
+            bucket.append(timer)
+        return timer
+
+    def advance(self):
+        """Passa para o próximo passo"""
+        self.now += 1
+
+    def fire(self, phase):
+        """Dispara os agendamentos da fase phase do passo atual"""
+        bucket = self.buckets.pop((self.now, phase), None)
+        if bucket is None:
+            return
+        for timer in bucket:
+            callback = timer.callback
+            if callback is not None:
+                timer.callback = None
+                callback(*timer.args)
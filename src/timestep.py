@@ -0,0 +1,48 @@
+"""
+Passo fixo da simulação com acumulador e interpolação para desenho
+"""
+
+import math
+
+
+class FixedTimestep:
+    """Converte tempo real em passos de simulação de duração fixa"""
+
+    def __init__(self, tick_rate=60, time_scale=1.0, max_steps=5):
+        self.tick_rate = tick_rate
+        self.dt = 1.0 / tick_rate
+        self.time_scale = time_scale  # None = simulação sem limite de velocidade
+        self.max_steps = max_steps  # Evita a "espiral da morte" em quadros lentos
+        self.accumulator = 0.0
+        self.alpha = 1.0  # Fração do próximo passo já decorrida (para interpolar)
+
+    @property
+    def uncapped(self):
+        """Indica se a simulação roda o mais rápido possível"""
+        return self.time_scale is None
+
+    def advance(self, elapsed):
+        """Recebe o tempo real decorrido (s) e devolve quantos passos executar"""
+        if self.uncapped:
+            self.alpha = 1.0
+            return self.max_steps
+
+        self.accumulator += elapsed * self.time_scale
+        limit = self.max_steps * max(1, math.ceil(self.time_scale))
+        steps = min(int(self.accumulator * self.tick_rate), limit)
+        self.accumulator -= steps * self.dt
+
+        # Descarta o atraso que não cabe no limite de passos
+        if self.accumulator > self.dt:
+            self.accumulator = self.accumulator % self.dt
+
+        self.alpha = self.accumulator / self.dt
+        return steps
+
+
+def interpolated_rect(entity, alpha, offset=(0, 0)):
+    """Retângulo da entidade entre a posição do passo anterior e a atual, menos offset (a câmera)"""
+    rect = entity.rect.copy()
+    rect.x = entity.prev_x + (entity.x - entity.prev_x) * alpha - offset[0]
+    rect.y = entity.prev_y + (entity.y - entity.prev_y) * alpha - offset[1]
+    return rect